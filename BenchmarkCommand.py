@@ -0,0 +1,158 @@
+import adsk.core
+import adsk.fusion
+
+import time
+
+from .Fusion360Utilities.Fusion360Utilities import scoped_app_objects, AppObjectsScope
+from .Fusion360Utilities.Fusion360CommandBase import Fusion360CommandBase, write_text_commands
+from .Fusion360Utilities.Fusion360CommandTiming import record_command_timing
+from .Fusion360Utilities.Fusion360CallCounter import cast
+from .SaveViewCommand import encode_current_display_state, set_display_state, build_appearances, \
+    build_appearance_tokens, set_appearances, build_parameter_object, set_parameters
+from .OccurrenceIndex import get_occurrence_index, clear_occurrence_indexes
+
+# Fusion 360 Appearance Library
+APPEARANCE_LIBRARY_ID = 'BA5EE55E-9982-449B-9D66-9F036540E140'
+
+# Leaf occurrences in each sub assembly of a synthetic design
+BRANCHING = 9
+
+BENCHMARK_VIEW_NAME = 'displayer_benchmark'
+
+
+# Builds a synthetic assembly of about occurrence_count occurrences in a new document
+# Sub assemblies of BRANCHING leaf occurrences are repeated under the root, so only two components are created
+# Every appearance_stride-th sub assembly gets one of appearance_count appearances,
+# every other user parameter depends on the one before it
+def build_synthetic_design(occurrence_count, appearance_count=10, appearance_stride=2, parameter_count=10):
+    ao = scoped_app_objects()
+
+    document = ao.app.documents.add(adsk.core.DocumentTypes.FusionDesignDocumentType)
+    design = cast(adsk.fusion.Design, ao.app.activeProduct)
+    root_comp = design.rootComponent
+    transform = adsk.core.Matrix3D.create()
+
+    sub_occurrence = root_comp.occurrences.addNewComponent(transform)
+    sub_comp = sub_occurrence.component
+    sub_comp.name = 'Benchmark Sub Assembly'
+
+    leaf_occurrence = sub_comp.occurrences.addNewComponent(transform)
+    leaf_occurrence.component.name = 'Benchmark Part'
+
+    for i in range(BRANCHING - 1):
+        sub_comp.occurrences.addExistingComponent(leaf_occurrence.component, transform)
+
+    for i in range(max(1, occurrence_count // (BRANCHING + 1)) - 1):
+        root_comp.occurrences.addExistingComponent(sub_comp, transform)
+
+    library = ao.app.materialLibraries.itemById(APPEARANCE_LIBRARY_ID)
+    appearances = []
+
+    if library is not None:
+        for i in range(min(appearance_count, library.appearances.count)):
+            library_appearance = library.appearances.item(i)
+            appearances.append(design.appearances.addByCopy(library_appearance, library_appearance.name))
+
+    if len(appearances) > 0:
+        for i, occurrence in enumerate(root_comp.occurrences):
+            if i % appearance_stride == 0:
+                occurrence.appearance = appearances[(i // appearance_stride) % len(appearances)]
+
+    for i in range(parameter_count):
+        if i % 2 == 1:
+            expression = 'benchmark_{} + 1 mm'.format(i - 1)
+        else:
+            expression = '{} mm'.format(i + 1)
+
+        design.userParameters.add('benchmark_{}'.format(i), adsk.core.ValueInput.createByString(expression), 'mm', '')
+
+    return document
+
+
+# Times each hot path of a capture and restore once against the active design
+# Returns [(function name, seconds)]
+def run_benchmarks():
+    ao = scoped_app_objects()
+    timings = []
+
+    def timed(name, function, *args):
+        start_time = time.perf_counter()
+        result = function(*args)
+        timings.append((name, time.perf_counter() - start_time))
+        return result
+
+    # Captured and restored the way views are, restoring after every light bulb is flipped writes every occurrence
+    display_state_object = timed('encode_current_display_state', encode_current_display_state)
+    for occurrence in get_occurrence_index().occurrences:
+        occurrence.isLightBulbOn = not occurrence.isLightBulbOn
+    timed('set_display_state', set_display_state, display_state_object, True)
+
+    timed('build_appearances', build_appearances, BENCHMARK_VIEW_NAME)
+    appearance_tokens = build_appearance_tokens()
+
+    # Restoring after clearing the top level appearances writes every saved appearance
+    for occurrence in ao.root_comp.occurrences:
+        occurrence.appearance = None
+    timed('set_appearances', set_appearances, appearance_tokens)
+
+    parameter_object = timed('build_parameter_object', build_parameter_object, False)
+
+    # Every parameter is changed, half of them depend on another changed parameter
+    changed_parameter_object = {name: dict(parameter, expression=parameter['expression'] + ' + 1 mm')
+                                for name, parameter in parameter_object.items()}
+    timed('set_parameters', set_parameters, changed_parameter_object, True)
+
+    return timings
+
+
+def format_benchmark_results(results):
+    lines = ['{:>8}  {:<28} {:>10}'.format('scale', 'function', 'ms')]
+
+    for scale, timings in results:
+        for name, elapsed in timings:
+            lines.append('{:>8}  {:<28} {:>10.1f}'.format(scale, name, elapsed * 1000))
+
+    return '\n'.join(lines)
+
+
+# Benchmark the capture and restore hot paths on synthetic assemblies of increasing size
+# Each size is built in a new document that is closed without saving afterwards
+class BenchmarkCommand(Fusion360CommandBase):
+    def on_execute(self, command: adsk.core.Command, inputs: adsk.core.CommandInputs, args, input_values):
+        ao = scoped_app_objects()
+
+        try:
+            scales = [int(scale) for scale in input_values['scales_input'].replace(',', ' ').split()]
+        except ValueError:
+            ao.ui.messageBox('Sizes must be whole numbers of occurrences, for example: 100, 1000, 10000')
+            return
+
+        results = []
+
+        for scale in scales:
+            document = build_synthetic_design(scale, parameter_count=max(2, scale // 10))
+
+            try:
+                # The new document is active, so its design is resolved in a new scope
+                with AppObjectsScope():
+                    timings = run_benchmarks()
+            finally:
+                document.close(False)
+                clear_occurrence_indexes()
+
+            for name, elapsed in timings:
+                record_command_timing(self.cmd_id, '{} {}'.format(name, scale), elapsed)
+
+            results.append((scale, timings))
+
+        write_text_commands(format_benchmark_results(results))
+        ao.ui.messageBox('Benchmarked {} functions at {} sizes\n'
+                         'See the Text Commands palette for the results'.format(
+                            len(results[0][1]) if len(results) > 0 else 0, len(results)))
+
+    def on_create(self, command: adsk.core.Command, inputs: adsk.core.CommandInputs):
+        inputs.addTextBoxCommandInput('benchmark_text_input', '',
+                                      'Builds a synthetic assembly in a new document for each size, '
+                                      'times saving and restoring a view, then closes it without saving.',
+                                      3, True)
+        inputs.addStringValueInput('scales_input', 'Sizes (occurrences)', '100, 1000, 10000')
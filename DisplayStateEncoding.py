@@ -0,0 +1,231 @@
+# Compact encoding for saved display states
+# Pure python, no Fusion 360 API access, so it can be used outside of Fusion as well
+import base64
+import hashlib
+import json
+import zlib
+
+# Version 1 is the original {fullPathName: isLightBulbOn} dictionary
+# Version 2 stores only the occurrences that differ from the most common state
+# The exception paths are compressed into a prefix table of path segments
+# Optionally the entity token of each exception is stored as well, so renamed occurrences can still be found
+# A display state captured for part of the assembly lists the root occurrences it covers as its scope,
+# the default state only applies to the occurrences in the scope
+SPARSE_FORMAT = 'sparse'
+SPARSE_VERSION = 2
+
+# Separator Fusion 360 uses between occurrence names in fullPathName
+PATH_SEPARATOR = '+'
+
+
+def is_sparse_display_state(display_state_object) -> bool:
+    return isinstance(display_state_object, dict) and display_state_object.get('format') == SPARSE_FORMAT
+
+
+# The most common of a list of states, only the occurrences with the other state are stored
+def get_default_state(states) -> bool:
+    on_count = sum(1 for state in states if state)
+    return on_count * 2 >= len(states)
+
+
+# Encodes a {fullPathName: bool} dictionary into the sparse format
+# get_token(path) returns the entity token to store for an occurrence, or None
+def encode_display_state(display_state_object: dict, get_token=None) -> dict:
+    default = get_default_state(list(display_state_object.values()))
+
+    nodes = []
+    node_index = {}
+    exceptions = []
+    tokens = []
+
+    for path, state in display_state_object.items():
+        if bool(state) == default:
+            continue
+
+        parent = -1
+        for segment in path.split(PATH_SEPARATOR):
+            key = (parent, segment)
+            index = node_index.get(key)
+
+            if index is None:
+                index = len(nodes)
+                node_index[key] = index
+                nodes.append([parent, segment])
+
+            parent = index
+
+        exceptions.append(parent)
+
+        if get_token is not None:
+            tokens.append(get_token(path))
+
+    sparse_object = {
+        'format': SPARSE_FORMAT,
+        'version': SPARSE_VERSION,
+        'default': default,
+        'nodes': nodes,
+        'exceptions': exceptions
+    }
+
+    if get_token is not None:
+        sparse_object['tokens'] = tokens
+
+    return sparse_object
+
+
+def get_node_paths(nodes) -> list:
+    paths = [None] * len(nodes)
+    for index, (parent, segment) in enumerate(nodes):
+        if parent < 0:
+            paths[index] = segment
+        else:
+            paths[index] = paths[parent] + PATH_SEPARATOR + segment
+
+    return paths
+
+
+# Decodes either format
+# Returns the default state (None for version 1, where unlisted occurrences are left alone)
+# and a dictionary of the explicitly stored states
+def decode_display_state(display_state_object):
+    if not is_sparse_display_state(display_state_object):
+        return None, display_state_object
+
+    version = display_state_object.get('version', SPARSE_VERSION)
+    if version > SPARSE_VERSION:
+        raise ValueError('Unsupported display state version: {}'.format(version))
+
+    default = display_state_object['default']
+    nodes = display_state_object['nodes']
+
+    paths = get_node_paths(nodes)
+
+    exception_state = not default
+    states = {paths[index]: exception_state for index in display_state_object['exceptions']}
+
+    return default, states
+
+
+def set_display_state_scope(display_state_object: dict, scope_paths, scope_tokens=None):
+    if scope_tokens is None:
+        scope_tokens = [None] * len(scope_paths)
+
+    display_state_object['scope'] = [[path, token] for path, token in zip(scope_paths, scope_tokens)]
+
+
+# Returns the (fullPathName, entity token) of each root occurrence of a scoped display state,
+# or None if the display state covers the whole assembly
+def decode_display_state_scope(display_state_object):
+    if not is_sparse_display_state(display_state_object) or 'scope' not in display_state_object:
+        return None
+
+    return [(path, token) for path, token in display_state_object['scope']]
+
+
+# True if the occurrence at path is one of the scope paths or one of their descendants
+def is_path_in_scope(path, scope_paths) -> bool:
+    for scope_path in scope_paths:
+        if path == scope_path or path.startswith(scope_path + PATH_SEPARATOR):
+            return True
+
+    return False
+
+
+# Entity tokens stored with the explicitly stored states, as {fullPathName: token}
+def decode_display_state_tokens(display_state_object) -> dict:
+    if not is_sparse_display_state(display_state_object) or 'tokens' not in display_state_object:
+        return {}
+
+    paths = get_node_paths(display_state_object['nodes'])
+    exceptions = display_state_object['exceptions']
+
+    return {paths[index]: token for index, token in zip(exceptions, display_state_object['tokens'])
+            if token is not None}
+
+
+# Light bulb states as a bitset, a python int with bit i set when occurrence i of an ordering is on
+# The ordering fingerprint identifies the occurrence ordering the bits refer to, bits are only valid
+# for a design whose ordering has the same fingerprint
+# Saved display states keep the bitset next to the sparse encoding, which is used when the ordering has drifted
+BITSET_VERSION = 1
+
+
+def get_ordering_fingerprint(paths) -> str:
+    ordering_hash = hashlib.sha1()
+    for path in paths:
+        ordering_hash.update(path.encode('utf-8'))
+        ordering_hash.update(b'\n')
+
+    return ordering_hash.hexdigest()
+
+
+def bits_from_states(states) -> int:
+    bit_text = ''.join(['1' if state else '0' for state in states])
+
+    if len(bit_text) == 0:
+        return 0
+
+    return int(bit_text[::-1], 2)
+
+
+# Positions of the set bits in ascending order, used on the XOR of two bitsets to find the differences
+def iter_set_bits(bits: int):
+    while bits:
+        lowest_bit = bits & -bits
+        yield lowest_bit.bit_length() - 1
+        bits ^= lowest_bit
+
+
+def encode_display_state_bits(fingerprint: str, count: int, bits: int) -> dict:
+    bitset_object = {
+        'version': BITSET_VERSION,
+        'fingerprint': fingerprint,
+        'count': count,
+        'bits': base64.b64encode(bits.to_bytes((count + 7) // 8, 'little')).decode('ascii')
+    }
+    return bitset_object
+
+
+# Returns the (fingerprint, count, bits) stored with a display state, or None if it has no bitset
+def decode_display_state_bits(display_state_object):
+    if not is_sparse_display_state(display_state_object) or 'bitset' not in display_state_object:
+        return None
+
+    bitset_object = display_state_object['bitset']
+
+    version = bitset_object.get('version', BITSET_VERSION)
+    if version > BITSET_VERSION:
+        return None
+
+    bits = int.from_bytes(base64.b64decode(bitset_object['bits']), 'little')
+    return bitset_object['fingerprint'], bitset_object['count'], bits
+
+
+# Appearances saved as a single compressed {entity token: appearance id} mapping
+APPEARANCE_TOKENS_BACKEND = 'tokens'
+APPEARANCE_TOKENS_VERSION = 1
+
+
+def is_appearance_tokens(appearances_object) -> bool:
+    return isinstance(appearances_object, dict) and appearances_object.get('backend') == APPEARANCE_TOKENS_BACKEND
+
+
+def encode_appearance_tokens(appearance_tokens: dict) -> dict:
+    json_bytes = json.dumps(appearance_tokens, separators=(',', ':')).encode('utf-8')
+
+    appearances_object = {
+        'backend': APPEARANCE_TOKENS_BACKEND,
+        'version': APPEARANCE_TOKENS_VERSION,
+        'count': len(appearance_tokens),
+        'data': base64.b64encode(zlib.compress(json_bytes)).decode('ascii')
+    }
+    return appearances_object
+
+
+def decode_appearance_tokens(appearances_object) -> dict:
+    version = appearances_object.get('version', APPEARANCE_TOKENS_VERSION)
+    if version > APPEARANCE_TOKENS_VERSION:
+        raise ValueError('Unsupported appearances version: {}'.format(version))
+
+    json_bytes = zlib.decompress(base64.b64decode(appearances_object['data']))
+    return json.loads(json_bytes.decode('utf-8'))
@@ -0,0 +1,216 @@
+# Opt-in counting and timing of every Fusion 360 API property read, property write and method call
+# Pure python, no Fusion 360 API access, so it can be tested against a stand-in adsk module
+#
+# When enabled AppObjects wraps the application in a transparent proxy
+# Every object read through the proxy is wrapped in turn, so all API use that starts from AppObjects is counted
+# Calls are grouped by the type of the API object and the member used, see format_call_report
+#
+# A proxy is not an adsk object, use cast(adsk.fusion.Occurrence, entity) instead of adsk.fusion.Occurrence.cast
+import time
+
+# Values returned as they are instead of being wrapped
+_plain_types = (bool, int, float, str, bytes, type(None))
+
+_call_counter = {
+    'enabled': False,
+
+    # {(type name, member): [count, total ns]}
+    'stats': {}
+}
+
+
+def enable_call_counting():
+    _call_counter['enabled'] = True
+
+
+def disable_call_counting():
+    _call_counter['enabled'] = False
+
+
+def is_call_counting_enabled() -> bool:
+    return _call_counter['enabled']
+
+
+def reset_call_counts():
+    _call_counter['stats'] = {}
+
+
+def record_call(type_name, member, duration_ns):
+    key = (type_name, member)
+    member_stats = _call_counter['stats'].get(key, None)
+
+    if member_stats is None:
+        _call_counter['stats'][key] = [1, duration_ns]
+    else:
+        member_stats[0] += 1
+        member_stats[1] += duration_ns
+
+
+def wrap(value):
+    if isinstance(value, _plain_types) or isinstance(value, CountingProxy):
+        return value
+
+    if type(value) is list:
+        return [wrap(item) for item in value]
+
+    if type(value) is tuple:
+        return tuple(wrap(item) for item in value)
+
+    return CountingProxy(value)
+
+
+def unwrap(value):
+    if isinstance(value, CountingProxy):
+        return object.__getattribute__(value, '_target')
+
+    if type(value) is list:
+        return [unwrap(item) for item in value]
+
+    if type(value) is tuple:
+        return tuple(unwrap(item) for item in value)
+
+    return value
+
+
+# Wraps an object in a proxy only while call counting is enabled
+def wrap_if_enabled(value):
+    if not _call_counter['enabled']:
+        return value
+
+    return wrap(value)
+
+
+# Replacement for <adsk class>.cast(value) that accepts proxies and returns a proxy for them
+def cast(adsk_class, value):
+    if not isinstance(value, CountingProxy):
+        return adsk_class.cast(value)
+
+    cast_value = adsk_class.cast(unwrap(value))
+
+    if cast_value is None:
+        return None
+
+    return wrap(cast_value)
+
+
+def get_type_name(target) -> str:
+    return type(target).__name__
+
+
+# Transparent proxy counting and timing every use of the API object it wraps
+class CountingProxy(object):
+    __slots__ = ('_target',)
+
+    def __init__(self, target):
+        object.__setattr__(self, '_target', target)
+
+    def __getattr__(self, name):
+        target = object.__getattribute__(self, '_target')
+
+        start_ns = time.perf_counter_ns()
+        value = getattr(target, name)
+        duration_ns = time.perf_counter_ns() - start_ns
+
+        # Methods are counted when they are called
+        if callable(value) and not isinstance(value, type):
+            return CountingMethod(get_type_name(target), name, value)
+
+        record_call(get_type_name(target), name, duration_ns)
+        return wrap(value)
+
+    def __setattr__(self, name, value):
+        target = object.__getattribute__(self, '_target')
+
+        start_ns = time.perf_counter_ns()
+        setattr(target, name, unwrap(value))
+        record_call(get_type_name(target), name + ' =', time.perf_counter_ns() - start_ns)
+
+    def __iter__(self):
+        target = object.__getattribute__(self, '_target')
+        type_name = get_type_name(target)
+        iterator = iter(target)
+
+        while True:
+            start_ns = time.perf_counter_ns()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            record_call(type_name, '__iter__', time.perf_counter_ns() - start_ns)
+
+            yield wrap(item)
+
+    def __len__(self):
+        return len(object.__getattribute__(self, '_target'))
+
+    def __getitem__(self, key):
+        target = object.__getattribute__(self, '_target')
+
+        start_ns = time.perf_counter_ns()
+        value = target[key]
+        record_call(get_type_name(target), '__getitem__', time.perf_counter_ns() - start_ns)
+
+        return wrap(value)
+
+    def __bool__(self):
+        return bool(object.__getattribute__(self, '_target'))
+
+    def __eq__(self, other):
+        return object.__getattribute__(self, '_target') == unwrap(other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(object.__getattribute__(self, '_target'))
+
+    def __repr__(self):
+        return 'CountingProxy({!r})'.format(object.__getattribute__(self, '_target'))
+
+
+class CountingMethod(object):
+    __slots__ = ('type_name', 'name', 'method')
+
+    def __init__(self, type_name, name, method):
+        self.type_name = type_name
+        self.name = name
+        self.method = method
+
+    def __call__(self, *args, **kwargs):
+        args = [unwrap(arg) for arg in args]
+        kwargs = {key: unwrap(value) for key, value in kwargs.items()}
+
+        start_ns = time.perf_counter_ns()
+        try:
+            value = self.method(*args, **kwargs)
+        finally:
+            record_call(self.type_name, self.name + '()', time.perf_counter_ns() - start_ns)
+
+        return wrap(value)
+
+
+# Returns [(type name, member, count, total ms)] sorted by total time
+def get_call_counts() -> list:
+    call_counts = []
+
+    for (type_name, member), (count, total_ns) in _call_counter['stats'].items():
+        call_counts.append((type_name, member, count, total_ns / 1e6))
+
+    call_counts.sort(key=lambda call_count: call_count[3], reverse=True)
+    return call_counts
+
+
+# Ranked text report of the API members with the largest total time
+def format_call_report(limit=30) -> str:
+    call_counts = get_call_counts()
+
+    lines = ['{:>10} {:>12} {:>10}  {}'.format('calls', 'total ms', 'avg us', 'member')]
+
+    for type_name, member, count, total_ms in call_counts[:limit]:
+        lines.append('{:>10} {:>12.3f} {:>10.2f}  {}.{}'.format(
+            count, total_ms, total_ms * 1000 / count, type_name, member))
+
+    if len(call_counts) > limit:
+        lines.append('... {} more members'.format(len(call_counts) - limit))
+
+    return '\n'.join(lines)
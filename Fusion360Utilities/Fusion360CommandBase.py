@@ -3,67 +3,153 @@ import traceback
 import adsk.core
 import adsk.fusion
 import json
+import time
+
+from .Fusion360Utilities import AppObjectsScope
+from .Fusion360Profiler import span
+from .Fusion360CallCounter import is_call_counting_enabled, get_call_counts, format_call_report, reset_call_counts
+from .Fusion360CommandTiming import CommandTimer, record_command_timing, get_command_timing_stats
+from .Fusion360PerfHistory import update_model_size
 
 handlers = []
 
 
-# Returns a dictionary for all inputs. Very useful for creating quick Fusion 360 Add-ins
-def get_inputs(command_inputs):
-    value_types = [adsk.core.BoolValueCommandInput.classType(), adsk.core.DistanceValueCommandInput.classType(),
-                   adsk.core.FloatSliderCommandInput.classType(), adsk.core.FloatSpinnerCommandInput.classType(),
-                   adsk.core.IntegerSliderCommandInput.classType(), adsk.core.IntegerSpinnerCommandInput.classType(),
-                   adsk.core.ValueCommandInput.classType(), adsk.core.SliderCommandInput.classType(),
-                   adsk.core.StringValueCommandInput.classType()]
+# Maps command input classType() to how get_inputs reads its value, built on first use
+_input_type_dispatch = {}
 
-    list_types = [adsk.core.ButtonRowCommandInput.classType(), adsk.core.DropDownCommandInput.classType(),
-                  adsk.core.RadioButtonGroupCommandInput.classType()]
 
-    selection_types = [adsk.core.SelectionCommandInput.classType()]
+def get_input_type_dispatch():
+    if len(_input_type_dispatch) == 0:
 
-    input_values = {}
-    input_values.clear()
+        # The value of the input is returned
+        for value_type in [adsk.core.BoolValueCommandInput, adsk.core.DistanceValueCommandInput,
+                           adsk.core.FloatSliderCommandInput, adsk.core.FloatSpinnerCommandInput,
+                           adsk.core.IntegerSliderCommandInput, adsk.core.IntegerSpinnerCommandInput,
+                           adsk.core.ValueCommandInput, adsk.core.SliderCommandInput,
+                           adsk.core.StringValueCommandInput]:
+            _input_type_dispatch[value_type.classType()] = 'value'
 
-    for command_input in command_inputs:
+        # The name of the selected list item is returned, or the list items for a check box drop down
+        _input_type_dispatch[adsk.core.DropDownCommandInput.classType()] = 'drop_down'
+        for list_type in [adsk.core.ButtonRowCommandInput, adsk.core.RadioButtonGroupCommandInput]:
+            _input_type_dispatch[list_type.classType()] = 'list'
 
-        # If the input type is in this list the value of the input is returned
-        if command_input.objectType in value_types:
-            input_values[command_input.id] = command_input.value
-            input_values[command_input.id + '_input'] = command_input
+        # An array of entities is returned
+        _input_type_dispatch[adsk.core.SelectionCommandInput.classType()] = 'selection'
 
-        # TODO need to account for radio and button multi select also
-        # If the input type is in this list the name of the selected list item is returned
-        elif command_input.objectType in list_types:
-            if command_input.objectType == adsk.core.DropDownCommandInput.classType():
-                if command_input.dropDownStyle == adsk.core.DropDownStyles.CheckBoxDropDownStyle:
-                    input_values[command_input.id] = command_input.listItems
-                    input_values[command_input.id + '_input'] = command_input
+        # The name of the input is returned, followed by the inputs in it
+        for group_type in [adsk.core.GroupCommandInput, adsk.core.TabCommandInput]:
+            _input_type_dispatch[group_type.classType()] = 'group'
 
-                else:
-                    if command_input.selectedItem is not None:
-                        input_values[command_input.id] = command_input.selectedItem.name
-                        input_values[command_input.id + '_input'] = command_input
-            else:
-                if command_input.selectedItem is not None:
-                    input_values[command_input.id] = command_input.selectedItem.name
-                    input_values[command_input.id + '_input'] = command_input
-
-        # If the input type is a selection an array of entities is returned
-        elif command_input.objectType in selection_types:
-            if command_input.selectionCount > 0:
-                selections = []
-                for i in range(0, command_input.selectionCount):
-                    selections.append(command_input.selection(i).entity)
-
-                input_values[command_input.id] = selections
-                input_values[command_input.id + '_input'] = command_input
+    return _input_type_dispatch
+
+
+# Adds the value of a single input to an input_values dictionary
+def add_input_value(input_values, command_input, input_type_dispatch):
+    input_kind = input_type_dispatch.get(command_input.objectType, None)
+
+    if input_kind == 'value':
+        input_values[command_input.id] = command_input.value
+        input_values[command_input.id + '_input'] = command_input
+
+    # TODO need to account for radio and button multi select also
+    elif input_kind == 'drop_down':
+        if command_input.dropDownStyle == adsk.core.DropDownStyles.CheckBoxDropDownStyle:
+            input_values[command_input.id] = command_input.listItems
+            input_values[command_input.id + '_input'] = command_input
 
         else:
-            input_values[command_input.id] = command_input.name
+            if command_input.selectedItem is not None:
+                input_values[command_input.id] = command_input.selectedItem.name
+                input_values[command_input.id + '_input'] = command_input
+
+    elif input_kind == 'list':
+        if command_input.selectedItem is not None:
+            input_values[command_input.id] = command_input.selectedItem.name
             input_values[command_input.id + '_input'] = command_input
 
+    elif input_kind == 'selection':
+        if command_input.selectionCount > 0:
+            selections = []
+            for i in range(0, command_input.selectionCount):
+                selections.append(command_input.selection(i).entity)
+
+            input_values[command_input.id] = selections
+            input_values[command_input.id + '_input'] = command_input
+
+    else:
+        input_values[command_input.id] = command_input.name
+        input_values[command_input.id + '_input'] = command_input
+
+
+# Writes a message to the Text Commands palette, which unlike a message box does not block the UI
+def write_text_commands(message):
+    app = adsk.core.Application.cast(adsk.core.Application.get())
+
+    print(message)
+    text_palette = app.userInterface.palettes.itemById('TextCommands')
+    if text_palette is not None:
+        text_palette.writeText(message)
+
+
+# Runs a generator of steps (see Fusion360CommandBase.run_chunked) to the end in one go
+# Returns the value the generator returns
+def run_steps(steps):
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
+
+
+# A long running task split into steps, run a slice at a time by Fusion360CommandBase.run_chunked
+class ChunkedTask(object):
+    def __init__(self, steps, total, message, on_complete):
+        self.steps = steps
+        self.total = total
+        self.message = message
+        self.on_complete = on_complete
+        self.progress = 0
+        self.start_time = None
+
+
+# Returns a dictionary for all inputs. Very useful for creating quick Fusion 360 Add-ins
+# Inputs inside groups and tabs are included, like the inputs at the top level
+def get_inputs(command_inputs):
+    input_values = {}
+    add_input_values(input_values, command_inputs, get_input_type_dispatch())
+
     return input_values
 
 
+def add_input_values(input_values, command_inputs, input_type_dispatch):
+    for command_input in command_inputs:
+        add_input_value(input_values, command_input, input_type_dispatch)
+
+        if input_type_dispatch.get(command_input.objectType, None) == 'group':
+            add_input_values(input_values, command_input.children, input_type_dispatch)
+
+
+# Updates a dictionary from get_inputs for one changed input instead of reading every input again
+def update_inputs(input_values, changed_input):
+    input_values.pop(changed_input.id, None)
+    input_values.pop(changed_input.id + '_input', None)
+
+    add_input_value(input_values, changed_input, get_input_type_dispatch())
+
+    return input_values
+
+
+# Number of event handlers currently referenced, globally and by each command
+def get_handler_counts(command_objects):
+    handler_counts = {'global': len(handlers)}
+
+    for command_object in command_objects:
+        handler_counts[command_object.cmd_id] = command_object.live_handler_count()
+
+    return handler_counts
+
+
 # Finds command definition in active UI
 def command_definition_by_id(cmd_id, ui):
     command_definitions = ui.commandDefinitions
@@ -177,11 +263,37 @@ class Fusion360CommandBase:
 
         self.command_promoted = cmd_def.get('command_promoted', False)
 
+        # The control is added before (or after) the control with this id, at the end if there is none
+        self.control_position_id = cmd_def.get('control_position_id', '')
+        self.control_is_before = cmd_def.get('control_is_before', True)
+
         self.debug = debug
 
+        # When True input changed events update a cached input_values for the changed input only
+        # Previews still read every input, inputs changed from code fire no input changed event
+        # User code must not modify input_values in that mode
+        self.incremental_inputs = cmd_def.get('incremental_inputs', False)
+        self.cached_input_values = None
+        self.cached_input_count = 0
+
         # global set of event handlers to keep them referenced for the duration of the command
         self.handlers = []
 
+        # Event handlers of each open command dialog, released when the dialog is destroyed
+        self.command_handlers = {}
+        self.dialog_count = 0
+
+        # Creation time and number of previews of each open command dialog, see Fusion360CommandTiming
+        self.dialog_timings = {}
+
+        # Tasks of at least chunk_threshold steps run in slices of about chunk_time seconds, see run_chunked
+        self.chunk_threshold = cmd_def.get('chunk_threshold', 2000)
+        self.chunk_time = cmd_def.get('chunk_time', 0.05)
+        self.chunked_tasks = []
+        self.chunked_event = None
+        self.chunked_event_handler = None
+        self.progress_dialog = None
+
     def on_preview(self, command: adsk.core.Command, inputs: adsk.core.CommandInputs, args, input_values):
         pass
 
@@ -202,6 +314,189 @@ class Fusion360CommandBase:
 
         return CommandCreatedEventHandler(self)
 
+    # input_values for input changed and preview events
+    # In incremental mode an input changed event only reads the changed input into the cached input_values
+    # Fusion 360 fires no input changed event for inputs changed from code, such as by on_input_changed,
+    # so a preview reads every input again and refreshes the cache
+    def get_event_inputs(self, command_inputs, changed_input=None):
+        if not self.incremental_inputs:
+            return get_inputs(command_inputs)
+
+        input_count = command_inputs.count
+
+        # Inputs added to a group or tab do not change the count, they are read in full when first changed
+        if self.cached_input_values is None or changed_input is None or input_count != self.cached_input_count \
+                or changed_input.id + '_input' not in self.cached_input_values:
+            self.cached_input_values = get_inputs(command_inputs)
+            self.cached_input_count = input_count
+
+        else:
+            update_inputs(self.cached_input_values, changed_input)
+
+        return self.cached_input_values
+
+    def clear_cached_inputs(self):
+        self.cached_input_values = None
+        self.cached_input_count = 0
+
+    # Returns an id used to keep the event handlers of a new command dialog referenced
+    def start_dialog(self):
+        self.dialog_count += 1
+        self.command_handlers[self.dialog_count] = []
+        self.dialog_timings[self.dialog_count] = {'created': time.perf_counter(), 'previews': 0}
+        update_model_size()
+        return self.dialog_count
+
+    def add_command_handler(self, dialog_id, handler):
+        self.command_handlers.setdefault(dialog_id, []).append(handler)
+
+    def release_command_handlers(self, dialog_id):
+        self.command_handlers.pop(dialog_id, None)
+        self.dialog_timings.pop(dialog_id, None)
+
+    # Times the body of a with statement as a sample of one of this command's metrics
+    def timed(self, metric):
+        return CommandTimer(self.cmd_id, metric)
+
+    def count_preview(self, dialog_id):
+        dialog_timing = self.dialog_timings.get(dialog_id, None)
+        if dialog_timing is not None:
+            dialog_timing['previews'] += 1
+
+    def record_execute_latency(self, dialog_id):
+        dialog_timing = self.dialog_timings.get(dialog_id, None)
+        if dialog_timing is not None:
+            record_command_timing(self.cmd_id, 'create_to_execute', time.perf_counter() - dialog_timing['created'])
+            record_command_timing(self.cmd_id, 'previews', dialog_timing['previews'])
+
+    # Returns {metric: {'count', 'samples', 'p50', 'p95', 'max'}} for this command
+    def get_timing_stats(self):
+        return get_command_timing_stats(self.cmd_id).get(self.cmd_id, {})
+
+    def debug_message(self, message):
+        if self.debug:
+            write_text_commands('***Debug*** ' + message)
+
+    def live_handler_count(self):
+        return sum(len(dialog_handlers) for dialog_handlers in self.command_handlers.values())
+
+    # Runs a long task without blocking Fusion
+    # steps is a generator doing a small piece of work for each next() and yielding the number of steps done,
+    # its return value is passed to on_complete
+    # Each slice runs in a custom event fired from the previous slice, so Fusion handles the UI in between,
+    # with a progress dialog that can cancel the task
+    # Tasks of fewer than chunk_threshold steps run immediately
+    def run_chunked(self, steps, total, message='Working', on_complete=None):
+        if total < self.chunk_threshold:
+            result = run_steps(steps)
+            if on_complete is not None:
+                on_complete(result)
+            return
+
+        self.chunked_tasks.append(ChunkedTask(steps, total, message, on_complete))
+
+        if len(self.chunked_tasks) == 1:
+            self.start_chunked_task()
+
+    def register_chunked_event(self):
+        if self.chunked_event is None:
+            app = adsk.core.Application.cast(adsk.core.Application.get())
+
+            self.chunked_event = app.registerCustomEvent(self.cmd_id + '_chunked')
+            self.chunked_event_handler = ChunkedEventHandler(self)
+            self.chunked_event.add(self.chunked_event_handler)
+
+    def unregister_chunked_event(self):
+        if self.chunked_event is not None:
+            app = adsk.core.Application.cast(adsk.core.Application.get())
+
+            self.chunked_event.remove(self.chunked_event_handler)
+            app.unregisterCustomEvent(self.cmd_id + '_chunked')
+
+            self.chunked_event = None
+            self.chunked_event_handler = None
+
+    def start_chunked_task(self):
+        app = adsk.core.Application.cast(adsk.core.Application.get())
+        task = self.chunked_tasks[0]
+
+        self.register_chunked_event()
+
+        task.start_time = time.perf_counter()
+
+        self.progress_dialog = app.userInterface.createProgressDialog()
+        self.progress_dialog.isCancelButtonShown = True
+        self.progress_dialog.show(self.cmd_name, task.message + ' %p%', 0, task.total, 0)
+
+        app.fireCustomEvent(self.cmd_id + '_chunked', '')
+
+    def finish_chunked_task(self):
+        self.progress_dialog.hide()
+        self.progress_dialog = None
+        task = self.chunked_tasks.pop(0)
+
+        record_command_timing(self.cmd_id, 'chunked_task', time.perf_counter() - task.start_time)
+
+        if len(self.chunked_tasks) > 0:
+            self.start_chunked_task()
+        else:
+            self.report_call_counts()
+
+    def cancel_chunked_tasks(self):
+        for task in self.chunked_tasks:
+            task.steps.close()
+
+        self.chunked_tasks.clear()
+
+        if self.progress_dialog is not None:
+            self.progress_dialog.hide()
+            self.progress_dialog = None
+
+    # Runs steps of the current task for chunk_time seconds, then schedules the next slice
+    def run_chunk(self):
+        if len(self.chunked_tasks) == 0:
+            return
+
+        app = adsk.core.Application.cast(adsk.core.Application.get())
+        task = self.chunked_tasks[0]
+
+        if self.progress_dialog.wasCancelled:
+            task.steps.close()
+            self.finish_chunked_task()
+            return
+
+        end_time = time.perf_counter() + self.chunk_time
+
+        try:
+            with span(self.cmd_id + ' chunk'):
+                while time.perf_counter() < end_time:
+                    task.progress = next(task.steps)
+
+        except StopIteration as stop:
+            try:
+                if task.on_complete is not None:
+                    task.on_complete(stop.value)
+            finally:
+                self.finish_chunked_task()
+            return
+
+        except:
+            self.cancel_chunked_tasks()
+            raise
+
+        self.progress_dialog.progressValue = min(task.progress, task.total)
+        app.fireCustomEvent(self.cmd_id + '_chunked', '')
+
+    # Writes the Fusion API calls counted by Fusion360CallCounter since the last report to the Text Commands palette
+    def report_call_counts(self):
+        if not is_call_counting_enabled() or len(get_call_counts()) == 0:
+            return
+
+        report = '{} Fusion API calls:\n{}'.format(self.cmd_id, format_call_report())
+        reset_call_counts()
+
+        write_text_commands(report)
+
     def add_command(self, this_workspace):
         global handlers
 
@@ -240,7 +535,8 @@ class Fusion360CommandBase:
                     cmd_definition.commandCreated.add(on_command_created_handler)
                     handlers.append(on_command_created_handler)
 
-                new_control = controls_to_add_to.addCommand(cmd_definition)
+                new_control = controls_to_add_to.addCommand(cmd_definition, self.control_position_id,
+                                                             self.control_is_before)
 
                 if self.command_visible:
                     new_control.isVisible = True
@@ -305,6 +601,9 @@ class Fusion360CommandBase:
 
     def on_stop(self):
 
+        self.cancel_chunked_tasks()
+        self.unregister_chunked_event()
+
         if isinstance(self.workspace, str):
             self.remove_command(self.workspace)
         elif all(isinstance(item, str) for item in self.workspace):
@@ -350,9 +649,10 @@ class Fusion360PaletteCommandBase(Fusion360CommandBase):
 
 
 class ExecutePreviewHandler(adsk.core.CommandEventHandler):
-    def __init__(self, cmd_object):
+    def __init__(self, cmd_object, dialog_id=None):
         super().__init__()
         self.cmd_object_ = cmd_object
+        self.dialog_id = dialog_id
         self.args = None
 
     def notify(self, args):
@@ -363,11 +663,16 @@ class ExecutePreviewHandler(adsk.core.CommandEventHandler):
 
             command_ = args.firingEvent.sender
             command_inputs = command_.commandInputs
-            if self.cmd_object_.debug:
-                ui.messageBox('***Debug *** Preview: {} execute preview event triggered'.
-                              format(command_.parentCommandDefinition.id))
-            input_values = get_inputs(command_inputs)
-            self.cmd_object_.on_preview(command_, command_inputs, args, input_values)
+            self.cmd_object_.debug_message('Preview: {} execute preview event triggered'.format(
+                command_.parentCommandDefinition.id))
+
+            self.cmd_object_.count_preview(self.dialog_id)
+
+            with self.cmd_object_.timed('preview_inputs'):
+                input_values = self.cmd_object_.get_event_inputs(command_inputs)
+
+            with AppObjectsScope(), self.cmd_object_.timed('preview'):
+                self.cmd_object_.on_preview(command_, command_inputs, args, input_values)
 
         except:
             if ui:
@@ -375,9 +680,10 @@ class ExecutePreviewHandler(adsk.core.CommandEventHandler):
 
 
 class DestroyHandler(adsk.core.CommandEventHandler):
-    def __init__(self, cmd_object):
+    def __init__(self, cmd_object, dialog_id=None):
         super().__init__()
         self.cmd_object_ = cmd_object
+        self.dialog_id = dialog_id
 
     def notify(self, args):
         app = adsk.core.Application.cast(adsk.core.Application.get())
@@ -388,13 +694,19 @@ class DestroyHandler(adsk.core.CommandEventHandler):
             command_inputs = command_.commandInputs
             reason_ = args.terminationReason
 
-            if self.cmd_object_.debug:
-                ui.messageBox('***Debug ***Command: {} destroyed'.format(command_.parentCommandDefinition.id))
-                ui.messageBox("***Debug ***Reason for termination= " + str(reason_))
+            with self.cmd_object_.timed('destroy_inputs'):
+                input_values = get_inputs(command_inputs)
+            self.cmd_object_.clear_cached_inputs()
+
+            if self.dialog_id is not None:
+                self.cmd_object_.release_command_handlers(self.dialog_id)
 
-            input_values = get_inputs(command_inputs)
+            self.cmd_object_.debug_message('Command: {} destroyed, reason for termination = {}, live handlers: {}'
+                                           .format(command_.parentCommandDefinition.id, reason_,
+                                                   get_handler_counts([self.cmd_object_])))
 
-            self.cmd_object_.on_destroy(command_, command_inputs, reason_, input_values)
+            with AppObjectsScope(), self.cmd_object_.timed('destroy'):
+                self.cmd_object_.on_destroy(command_, command_inputs, reason_, input_values)
 
         except:
             if ui:
@@ -415,13 +727,14 @@ class InputChangedHandler(adsk.core.InputChangedEventHandler):
             command_inputs = command_.commandInputs
             changed_input = args.input
 
-            if self.cmd_object_.debug:
-                ui.messageBox('***Debug Input: {} changed event triggered'.format(command_.parentCommandDefinition.id))
-                ui.messageBox('***Debug The Input: {} was the command'.format(changed_input.id))
+            self.cmd_object_.debug_message('Input: {} changed event triggered, the input {} changed'.format(
+                command_.parentCommandDefinition.id, changed_input.id))
 
-            input_values = get_inputs(command_inputs)
+            with self.cmd_object_.timed('input_changed_inputs'):
+                input_values = self.cmd_object_.get_event_inputs(command_inputs, changed_input)
 
-            self.cmd_object_.on_input_changed(command_, command_inputs, changed_input, input_values)
+            with AppObjectsScope(), self.cmd_object_.timed('input_changed'):
+                self.cmd_object_.on_input_changed(command_, command_inputs, changed_input, input_values)
 
         except:
             if ui:
@@ -429,9 +742,10 @@ class InputChangedHandler(adsk.core.InputChangedEventHandler):
 
 
 class CommandExecuteHandler(adsk.core.CommandEventHandler):
-    def __init__(self, cmd_object):
+    def __init__(self, cmd_object, dialog_id=None):
         super().__init__()
         self.cmd_object_ = cmd_object
+        self.dialog_id = dialog_id
 
     def notify(self, args):
         try:
@@ -440,12 +754,20 @@ class CommandExecuteHandler(adsk.core.CommandEventHandler):
             command_ = args.firingEvent.sender
             command_inputs = command_.commandInputs
 
-            if self.cmd_object_.debug:
-                ui.messageBox('***Debug command: {} executed successfully'.format(command_.parentCommandDefinition.id))
+            self.cmd_object_.record_execute_latency(self.dialog_id)
+
+            with self.cmd_object_.timed('execute_inputs'):
+                input_values = get_inputs(command_inputs)
 
-            input_values = get_inputs(command_inputs)
+            with AppObjectsScope(), span(self.cmd_object_.cmd_id + ' execute'), self.cmd_object_.timed('execute'):
+                self.cmd_object_.on_execute(command_, command_inputs, args, input_values)
 
-            self.cmd_object_.on_execute(command_, command_inputs, args, input_values)
+            self.cmd_object_.debug_message('command: {} executed successfully'.format(
+                command_.parentCommandDefinition.id))
+
+            # Commands that started a chunked task report when it is complete
+            if len(self.cmd_object_.chunked_tasks) == 0:
+                self.cmd_object_.report_call_counts()
 
         except:
             if ui:
@@ -462,31 +784,34 @@ class CommandCreatedEventHandler(adsk.core.CommandCreatedEventHandler):
         ui = app.userInterface
 
         try:
-            global handlers
-
             command_ = args.command
             inputs_ = command_.commandInputs
 
-            on_execute_handler = CommandExecuteHandler(self.cmd_object_)
+            self.cmd_object_.clear_cached_inputs()
+
+            # Handlers are kept by the command object until this dialog is destroyed
+            dialog_id = self.cmd_object_.start_dialog()
+
+            on_execute_handler = CommandExecuteHandler(self.cmd_object_, dialog_id)
             command_.execute.add(on_execute_handler)
-            handlers.append(on_execute_handler)
+            self.cmd_object_.add_command_handler(dialog_id, on_execute_handler)
 
             on_input_changed_handler = InputChangedHandler(self.cmd_object_)
             command_.inputChanged.add(on_input_changed_handler)
-            handlers.append(on_input_changed_handler)
+            self.cmd_object_.add_command_handler(dialog_id, on_input_changed_handler)
 
-            on_destroy_handler = DestroyHandler(self.cmd_object_)
+            on_destroy_handler = DestroyHandler(self.cmd_object_, dialog_id)
             command_.destroy.add(on_destroy_handler)
-            handlers.append(on_destroy_handler)
+            self.cmd_object_.add_command_handler(dialog_id, on_destroy_handler)
 
-            on_execute_preview_handler = ExecutePreviewHandler(self.cmd_object_)
+            on_execute_preview_handler = ExecutePreviewHandler(self.cmd_object_, dialog_id)
             command_.executePreview.add(on_execute_preview_handler)
-            handlers.append(on_execute_preview_handler)
+            self.cmd_object_.add_command_handler(dialog_id, on_execute_preview_handler)
 
-            if self.cmd_object_.debug:
-                ui.messageBox('***Debug ***Panel command created successfully')
+            self.cmd_object_.debug_message('Panel command created successfully')
 
-            self.cmd_object_.on_create(command_, inputs_)
+            with AppObjectsScope(), self.cmd_object_.timed('create'):
+                self.cmd_object_.on_create(command_, inputs_)
 
         except:
             if ui:
@@ -503,19 +828,23 @@ class PaletteCommandCreatedEventHandler(adsk.core.CommandCreatedEventHandler):
         ui = app.userInterface
 
         try:
-            global handlers
-
             command_ = args.command
             inputs_ = command_.commandInputs
 
+            dialog_id = self.cmd_object_.start_dialog()
+
             on_execute_handler = PaletteCommandExecuteHandler(self.cmd_object_)
             command_.execute.add(on_execute_handler)
-            handlers.append(on_execute_handler)
+            self.cmd_object_.add_command_handler(dialog_id, on_execute_handler)
+
+            on_destroy_handler = DestroyHandler(self.cmd_object_, dialog_id)
+            command_.destroy.add(on_destroy_handler)
+            self.cmd_object_.add_command_handler(dialog_id, on_destroy_handler)
 
-            if self.cmd_object_.debug:
-                ui.messageBox('***Debug *** Palette Panel command created successfully')
+            self.cmd_object_.debug_message('Palette Panel command created successfully')
 
-            self.cmd_object_.on_create(command_, inputs_)
+            with AppObjectsScope(), self.cmd_object_.timed('create'):
+                self.cmd_object_.on_create(command_, inputs_)
 
         except:
             if ui:
@@ -532,9 +861,7 @@ class PaletteCommandExecuteHandler(adsk.core.CommandEventHandler):
             app = adsk.core.Application.cast(adsk.core.Application.get())
             ui = app.userInterface
 
-            if self.cmd_object_.debug:
-                ui.messageBox('***Debug command: {} executed successfully'.format(
-                    self.cmd_object_.parentCommandDefinition.id))
+            self.cmd_object_.debug_message('command: {} executed successfully'.format(self.cmd_object_.cmd_id))
 
             # Create and display the palette.
             palette = ui.palettes.itemById(self.cmd_object_.palette_id)
@@ -611,32 +938,65 @@ class CloseEventHandler(adsk.core.UserInterfaceGeneralEventHandler):
             ui.messageBox('Failed:\n{}'.format(traceback.format_exc()))
 
 
-# Event handler for the documentActivated event.
+# Event handler for the custom event that runs the next slice of a command's chunked tasks.
+class ChunkedEventHandler(adsk.core.CustomEventHandler):
+    def __init__(self, cmd_object):
+        super().__init__()
+        self.cmd_object_ = cmd_object
+
+    def notify(self, args):
+        app = adsk.core.Application.cast(adsk.core.Application.get())
+        ui = app.userInterface
+
+        try:
+            with AppObjectsScope():
+                self.cmd_object_.run_chunk()
+
+        except:
+            if ui:
+                ui.messageBox('Chunked task failed: {}'.format(traceback.format_exc()))
+
+
+# Event handler for application document events (documentActivated, documentClosed, documentSaved, etc.)
 class MyDocumentActivatedHandler(adsk.core.DocumentEventHandler):
     def __init__(self, execution_function):
 
         super().__init__()
 
-        # self.execution_function = execution_function
+        self.execution_function = execution_function
 
     def notify(self, args):
         app = adsk.core.Application.cast(adsk.core.Application.get())
         ui = app.userInterface
-        ui.messageBox("here")
-        event_args = adsk.core.DocumentEventArgs.cast(args)
 
-        # self.execution_function(event_args)
+        try:
+            event_args = adsk.core.DocumentEventArgs.cast(args)
 
-        # Code to react to the event.
-        ui.messageBox('In MyDocumentActivatedHandler event handler.')
+            with AppObjectsScope():
+                self.execution_function(event_args)
 
+        except:
+            if ui:
+                ui.messageBox('Document event failed: {}'.format(traceback.format_exc()))
+
+
+# Connects execution_function to an application document event, by default documentActivated
+# Returns the handler so it can be removed with remove_document_event
+def create_document_event(execution_function, event_name='documentActivated'):
+    app = adsk.core.Application.cast(adsk.core.Application.get())
+    on_document_event = MyDocumentActivatedHandler(execution_function)
+    getattr(app, event_name).add(on_document_event)
+    handlers.append(on_document_event)
+
+    return on_document_event
 
-def create_document_event(execution_function):
+
+def remove_document_event(on_document_event, event_name='documentActivated'):
     app = adsk.core.Application.cast(adsk.core.Application.get())
-    # "application_var" is a variable referencing an Application object.
-    on_document_activated = MyDocumentActivatedHandler(execution_function)
-    app.documentActivated.add(on_document_activated)
-    handlers.append(on_document_activated)
+    getattr(app, event_name).remove(on_document_event)
+
+    if on_document_event in handlers:
+        handlers.remove(on_document_event)
 
 # Event handler for the workspaceActivated event.
 class MyWorkspaceActivatedHandler(adsk.core.WorkspaceEventHandler):
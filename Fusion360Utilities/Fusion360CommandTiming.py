@@ -0,0 +1,136 @@
+# Timing of command events, recorded by Fusion360CommandBase for every command
+# Pure python, no Fusion 360 API access, so it can be used outside of Fusion as well
+#
+# Samples are kept per command id and metric in a rolling window of the most recent ROLLING_WINDOW samples
+# Metrics recorded by Fusion360CommandBase, all in seconds unless noted:
+#   <event>_inputs    time reading the command inputs for the event (create, execute, preview, input_changed, destroy)
+#   <event>           time in the user code handling the event
+#   create_to_execute time from the command dialog being created to it being executed
+#   previews          number of preview events before the command was executed (a count)
+#   chunked_task      time from a chunked task being started to it being complete
+import json
+import time
+from collections import deque
+
+ROLLING_WINDOW = 256
+
+# Metrics that are counts, not times in seconds
+COUNT_METRICS = ('previews',)
+
+# {cmd_id: {metric: deque of samples}}
+_command_timings = {}
+
+# {cmd_id: {metric: number of samples ever recorded}}
+_command_sample_counts = {}
+
+# Functions called with (cmd_id, metric, value) for every sample, see Fusion360PerfHistory
+_command_timing_listeners = []
+
+
+def record_command_timing(cmd_id, metric, value):
+    metric_samples = _command_timings.setdefault(cmd_id, {}).get(metric, None)
+
+    if metric_samples is None:
+        metric_samples = deque(maxlen=ROLLING_WINDOW)
+        _command_timings[cmd_id][metric] = metric_samples
+
+    metric_samples.append(value)
+
+    sample_counts = _command_sample_counts.setdefault(cmd_id, {})
+    sample_counts[metric] = sample_counts.get(metric, 0) + 1
+
+    for listener in _command_timing_listeners:
+        listener(cmd_id, metric, value)
+
+
+def add_command_timing_listener(listener):
+    if listener not in _command_timing_listeners:
+        _command_timing_listeners.append(listener)
+
+
+def remove_command_timing_listener(listener):
+    if listener in _command_timing_listeners:
+        _command_timing_listeners.remove(listener)
+
+
+def reset_command_timings():
+    _command_timings.clear()
+    _command_sample_counts.clear()
+
+
+# Times the body of a with statement as one sample of a metric
+class CommandTimer(object):
+    __slots__ = ('cmd_id', 'metric', 'start_time')
+
+    def __init__(self, cmd_id, metric):
+        self.cmd_id = cmd_id
+        self.metric = metric
+        self.start_time = 0.0
+
+    def __enter__(self):
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        record_command_timing(self.cmd_id, self.metric, time.perf_counter() - self.start_time)
+        return False
+
+
+# Nearest rank percentile of a sorted list of samples
+def get_percentile(sorted_samples, percentile):
+    if len(sorted_samples) == 0:
+        return None
+
+    rank = int(round(percentile / 100 * (len(sorted_samples) - 1)))
+    return sorted_samples[rank]
+
+
+# Returns {cmd_id: {metric: {'count', 'samples', 'p50', 'p95', 'max'}}}, for one command if cmd_id is given
+# count is every sample ever recorded, samples the number in the rolling window the percentiles are taken from
+def get_command_timing_stats(cmd_id=None) -> dict:
+    if cmd_id is None:
+        cmd_ids = list(_command_timings)
+    else:
+        cmd_ids = [cmd_id] if cmd_id in _command_timings else []
+
+    command_timing_stats = {}
+
+    for cmd_id_ in cmd_ids:
+        command_timing_stats[cmd_id_] = {}
+
+        for metric, metric_samples in _command_timings[cmd_id_].items():
+            sorted_samples = sorted(metric_samples)
+
+            command_timing_stats[cmd_id_][metric] = {
+                'count': _command_sample_counts[cmd_id_][metric],
+                'samples': len(sorted_samples),
+                'p50': get_percentile(sorted_samples, 50),
+                'p95': get_percentile(sorted_samples, 95),
+                'max': sorted_samples[-1]
+            }
+
+    return command_timing_stats
+
+
+def format_command_timing_stats(cmd_id=None) -> str:
+    lines = []
+
+    for cmd_id_, metrics in sorted(get_command_timing_stats(cmd_id).items()):
+        lines.append(cmd_id_)
+
+        for metric, metric_stats in sorted(metrics.items()):
+            if metric in COUNT_METRICS:
+                lines.append('    {}: {} x, p50 {:g}, p95 {:g}, max {:g}'.format(
+                    metric, metric_stats['count'], metric_stats['p50'], metric_stats['p95'], metric_stats['max']))
+            else:
+                lines.append('    {}: {} x, p50 {:.2f} ms, p95 {:.2f} ms, max {:.2f} ms'.format(
+                    metric, metric_stats['count'], metric_stats['p50'] * 1000, metric_stats['p95'] * 1000,
+                    metric_stats['max'] * 1000))
+
+    return '\n'.join(lines)
+
+
+# Writes get_command_timing_stats to a JSON file
+def dump_command_timings(file_name, cmd_id=None):
+    with open(file_name, 'w') as f:
+        json.dump(get_command_timing_stats(cmd_id), f, indent=2, sort_keys=True)
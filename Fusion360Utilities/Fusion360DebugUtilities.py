@@ -8,6 +8,9 @@ import adsk.core
 import adsk.fusion
 import traceback
 
+from .Fusion360Profiler import format_span_stats, export_chrome_trace
+from .Fusion360PerfHistory import record_perf_sample
+
 
 # Print a list of list of variables
 # Format of variables should be [[Variable name 1, variable value 1], [Variable name 2, variable value 2], ...]
@@ -41,18 +44,19 @@ def variable_message(variable, extra_info=''):
 
 
 # Performance time logging function
+# Uses wall clock time so time spent inside Fusion API calls is included
+# For nested timings use the spans of Fusion360Profiler and profile_message instead
 def perf_log(log, function_reference, command, identifier=''):
-    log.append((function_reference, command, identifier, time.process_time()))
+    log.append((function_reference, command, identifier, time.perf_counter()))
 
 
+# Shows the slowest steps of a perf_log
+# The time of every step is added to the performance history when it is enabled, see Fusion360PerfHistory
 def perf_message(log):
 
     minimum_perf_time = .01
     message_string = ''
 
-    log_file_name = get_log_file_name()
-    log_file = open(log_file_name, 'w')
-
     total_t = log[-1][3] - log[0][3]
 
     message_string += 'Total Time = ' + "%0.6f" % total_t + '\n'
@@ -63,9 +67,24 @@ def perf_message(log):
         if delta_t > minimum_perf_time:
             message_string += entry[0] + ' ' + entry[1] + ' ' + entry[2] + ' = ' + "%0.6f" % delta_t + '\n'
 
-        log_file.write(entry[0] + ',' + entry[1] + ',' + entry[2] + ',' + str(delta_t) + '\n')
+        record_perf_sample(entry[0], (entry[1] + ' ' + entry[2]).strip(), delta_t)
+
+    app = adsk.core.Application.get()
+    ui = app.userInterface
+
+    if ui:
+        ui.messageBox(message_string)
+
 
-    log_file.close()
+# Shows the span paths with the largest total time recorded by Fusion360Profiler
+# and writes every recorded span to a Chrome trace file next to the perf logs
+def profile_message(limit=20):
+
+    trace_file_name = get_log_file_name('Trace', '.json')
+    event_count = export_chrome_trace(trace_file_name)
+
+    message_string = format_span_stats(limit)
+    message_string += '\n\n' + str(event_count) + ' trace events written to:\n' + trace_file_name
 
     app = adsk.core.Application.get()
     ui = app.userInterface
@@ -74,8 +93,8 @@ def perf_message(log):
         ui.messageBox(message_string)
 
 
-# Creates directory and returns file name for log file
-def get_log_file_name():
+# Creates directory and returns the directory log files are written to
+def get_log_directory():
 
     # Get Home directory
     home = expanduser("~")
@@ -85,9 +104,16 @@ def get_log_file_name():
     if not os.path.exists(home):
         os.makedirs(home)
 
+    return home
+
+
+# Creates directory and returns file name for log file
+def get_log_file_name(log_name='PerfLog', extension='.csv'):
+
+    home = get_log_directory()
+
     time_stamp = time.strftime("%Y-%m-%d-%H-%M-%S", time.gmtime())
 
     # Create file name in this path
-    log_file_name = home + 'FusionDebugUtilities-PerfLog-' + time_stamp + '.csv'
+    log_file_name = home + 'FusionDebugUtilities-' + log_name + '-' + time_stamp + extension
     return log_file_name
-
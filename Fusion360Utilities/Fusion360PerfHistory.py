@@ -0,0 +1,315 @@
+# Persistent history of command timings across sessions, with p95 regression reports
+# Pure python, no Fusion 360 API access, so it can be used outside of Fusion as well
+#
+# While enabled every sample recorded by Fusion360CommandTiming is appended to a JSON lines file
+# Samples are keyed by command id, metric, add-in version and model size (the occurrence count of the design)
+# The model size is read when a command dialog is created, see update_model_size
+# Samples are buffered and appended in batches, when the file grows past max_bytes the oldest samples are dropped
+#
+# A baseline is the p95 of every key at one point in time, stored in a JSON file next to the history
+# find_regressions compares the samples of the current add-in version against it
+# Model sizes are compared within the same order of magnitude, see get_size_bucket
+import json
+import os
+import tempfile
+import time
+
+from .Fusion360CommandTiming import add_command_timing_listener, remove_command_timing_listener, get_percentile, \
+    ROLLING_WINDOW, COUNT_METRICS
+
+DEFAULT_MAX_BYTES = 4 << 20
+
+# Buffered samples are appended to the file once there are this many
+FLUSH_SAMPLE_COUNT = 64
+
+_perf_history = {
+    'enabled': False,
+    'file_name': None,
+    'baseline_file_name': None,
+    'max_bytes': DEFAULT_MAX_BYTES,
+    'version': '',
+
+    # Returns the model size samples are recorded against, None if there is no model
+    'get_model_size': None,
+
+    # Model size read by the last update_model_size
+    'model_size': None,
+
+    'pending': []
+}
+
+
+def enable_perf_history(file_name, version, get_model_size=None, max_bytes=DEFAULT_MAX_BYTES,
+                        baseline_file_name=None):
+    if baseline_file_name is None:
+        baseline_file_name = os.path.splitext(file_name)[0] + '-Baseline.json'
+
+    _perf_history['enabled'] = True
+    _perf_history['file_name'] = file_name
+    _perf_history['baseline_file_name'] = baseline_file_name
+    _perf_history['max_bytes'] = max_bytes
+    _perf_history['version'] = version
+    _perf_history['get_model_size'] = get_model_size
+    _perf_history['model_size'] = None
+
+    add_command_timing_listener(record_perf_sample)
+
+
+# Writes any buffered samples and stops recording
+def disable_perf_history():
+    remove_command_timing_listener(record_perf_sample)
+    flush_perf_history()
+    _perf_history['enabled'] = False
+
+
+def is_perf_history_enabled() -> bool:
+    return _perf_history['enabled']
+
+
+def get_model_size():
+    get_model_size_function = _perf_history['get_model_size']
+
+    if get_model_size_function is None:
+        return None
+
+    try:
+        return get_model_size_function()
+    except:
+        return None
+
+
+# Reads the model size once for the samples that follow, called when a command dialog is created
+# Samples do not read it themselves, that would be Fusion 360 API calls in every timed event
+def update_model_size():
+    if _perf_history['enabled']:
+        _perf_history['model_size'] = get_model_size()
+
+
+# Buckets model sizes by order of magnitude: 0, 1, 10, 100, 1000, ...
+def get_size_bucket(size):
+    if size is None or size <= 0:
+        return size
+
+    return 10 ** (len(str(int(size))) - 1)
+
+
+# Adds one sample to the history, does nothing while the history is disabled
+def record_perf_sample(cmd_id, metric, value):
+    if not _perf_history['enabled']:
+        return
+
+    _perf_history['pending'].append({
+        'time': round(time.time(), 3),
+        'cmd': cmd_id,
+        'metric': metric,
+        'version': _perf_history['version'],
+        'size': _perf_history['model_size'],
+        'value': value
+    })
+
+    if len(_perf_history['pending']) >= FLUSH_SAMPLE_COUNT:
+        flush_perf_history()
+
+
+# Appends the buffered samples to the history file, returns the number of samples written
+def flush_perf_history() -> int:
+    pending = _perf_history['pending']
+    file_name = _perf_history['file_name']
+
+    if len(pending) == 0 or file_name is None:
+        return 0
+
+    _perf_history['pending'] = []
+
+    with open(file_name, 'a') as f:
+        f.write(''.join(json.dumps(sample, separators=(',', ':')) + '\n' for sample in pending))
+
+    if os.path.getsize(file_name) > _perf_history['max_bytes']:
+        compact_perf_history(file_name, _perf_history['max_bytes'] // 2)
+
+    return len(pending)
+
+
+# Drops the oldest samples so the file is at most max_bytes, returns the number of samples kept
+def compact_perf_history(file_name, max_bytes) -> int:
+    with open(file_name) as f:
+        lines = f.readlines()
+
+    kept_lines = []
+    kept_bytes = 0
+
+    for line in reversed(lines):
+        kept_bytes += len(line)
+        if kept_bytes > max_bytes:
+            break
+        kept_lines.append(line)
+
+    kept_lines.reverse()
+
+    directory = os.path.dirname(os.path.abspath(file_name))
+    file_handle, temp_file_name = tempfile.mkstemp(dir=directory, suffix='.tmp')
+
+    try:
+        with os.fdopen(file_handle, 'w') as f:
+            f.writelines(kept_lines)
+        os.replace(temp_file_name, file_name)
+    except:
+        if os.path.exists(temp_file_name):
+            os.remove(temp_file_name)
+        raise
+
+    return len(kept_lines)
+
+
+# Every sample in the history file, oldest first
+# Lines that can not be read, such as one cut short when Fusion closed, are skipped
+def iter_perf_samples(file_name=None):
+    if file_name is None:
+        file_name = _perf_history['file_name']
+
+    if file_name is None or not os.path.exists(file_name):
+        return
+
+    with open(file_name) as f:
+        for line in f:
+            try:
+                sample = json.loads(line)
+            except ValueError:
+                continue
+
+            if isinstance(sample, dict) and 'cmd' in sample:
+                yield sample
+
+
+def get_perf_key(sample) -> str:
+    return '{}|{}|{}'.format(sample['cmd'], sample['metric'], get_size_bucket(sample.get('size', None)))
+
+
+# Returns {key: {'cmd', 'metric', 'size_bucket', 'samples', 'p95'}} over the most recent samples of each key
+# Only samples of the given add-in version are used, the current version by default
+def get_perf_p95s(version=None, samples=None) -> dict:
+    if version is None:
+        version = _perf_history['version']
+
+    if samples is None:
+        samples = iter_perf_samples()
+
+    values_by_key = {}
+    first_samples = {}
+
+    for sample in samples:
+        if sample.get('version', None) != version:
+            continue
+
+        key = get_perf_key(sample)
+        values_by_key.setdefault(key, []).append(sample['value'])
+        first_samples.setdefault(key, sample)
+
+    perf_p95s = {}
+
+    for key, values in values_by_key.items():
+        sorted_values = sorted(values[-ROLLING_WINDOW:])
+        first_sample = first_samples[key]
+
+        perf_p95s[key] = {
+            'cmd': first_sample['cmd'],
+            'metric': first_sample['metric'],
+            'size_bucket': get_size_bucket(first_sample.get('size', None)),
+            'samples': len(sorted_values),
+            'p95': get_percentile(sorted_values, 95)
+        }
+
+    return perf_p95s
+
+
+# Stores the p95s of the current add-in version as the baseline, returns the number of keys stored
+def save_perf_baseline() -> int:
+    flush_perf_history()
+    perf_p95s = get_perf_p95s()
+
+    baseline = {
+        'version': _perf_history['version'],
+        'time': round(time.time(), 3),
+        'p95s': perf_p95s
+    }
+
+    with open(_perf_history['baseline_file_name'], 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+
+    return len(perf_p95s)
+
+
+# Returns the stored baseline, None if none has been saved
+def load_perf_baseline():
+    baseline_file_name = _perf_history['baseline_file_name']
+
+    if baseline_file_name is None or not os.path.exists(baseline_file_name):
+        return None
+
+    with open(baseline_file_name) as f:
+        return json.load(f)
+
+
+# Returns [{'cmd', 'metric', 'size_bucket', 'samples', 'baseline_p95', 'p95', 'ratio'}], largest ratio first
+# for the keys of the current version whose p95 is more than threshold times the baseline p95
+# Keys with fewer than min_samples samples, or that got slower by less than min_delta seconds, are ignored as noise
+# Count metrics, such as the number of previews, are not times, they are ignored if they grew by less than min_count_delta
+def find_regressions(baseline, threshold=1.2, min_samples=5, min_delta=0.005, min_count_delta=2) -> list:
+    flush_perf_history()
+    baseline_p95s = baseline.get('p95s', {})
+
+    regressions = []
+
+    for key, perf_p95 in get_perf_p95s().items():
+        baseline_p95 = baseline_p95s.get(key, None)
+
+        if baseline_p95 is None or perf_p95['samples'] < min_samples:
+            continue
+
+        if perf_p95['metric'] in COUNT_METRICS:
+            metric_min_delta = min_count_delta
+        else:
+            metric_min_delta = min_delta
+
+        if perf_p95['p95'] - baseline_p95['p95'] < metric_min_delta:
+            continue
+
+        if baseline_p95['p95'] > 0:
+            ratio = perf_p95['p95'] / baseline_p95['p95']
+        else:
+            ratio = float('inf')
+
+        if ratio > threshold:
+            regression = dict(perf_p95)
+            regression['baseline_p95'] = baseline_p95['p95']
+            regression['ratio'] = ratio
+            regressions.append(regression)
+
+    regressions.sort(key=lambda item: item['ratio'], reverse=True)
+    return regressions
+
+
+def format_perf_report(baseline, regressions) -> str:
+    lines = ['Performance of version {} against the baseline of version {} from {}'.format(
+        _perf_history['version'], baseline.get('version', ''),
+        time.strftime('%Y-%m-%d %H:%M', time.localtime(baseline.get('time', 0))))]
+
+    if len(regressions) == 0:
+        lines.append('No regressions')
+
+    for regression in regressions:
+        if regression['size_bucket'] is None:
+            size_label = 'no model'
+        else:
+            size_label = '{}+ occurrences'.format(regression['size_bucket'])
+
+        if regression['metric'] in COUNT_METRICS:
+            p95_label = '{:g} -> {:g}'.format(regression['baseline_p95'], regression['p95'])
+        else:
+            p95_label = '{:.2f} ms -> {:.2f} ms'.format(regression['baseline_p95'] * 1000, regression['p95'] * 1000)
+
+        lines.append('{} {} ({}): p95 {}, {:.1f} x over {} samples'.format(
+            regression['cmd'], regression['metric'], size_label, p95_label, regression['ratio'],
+            regression['samples']))
+
+    return '\n'.join(lines)
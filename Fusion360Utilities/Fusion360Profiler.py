@@ -0,0 +1,189 @@
+# Hierarchical span profiler
+# Pure python, no Fusion 360 API access, so it can be used outside of Fusion as well
+#
+# with span('restore view'):
+#     with span('set camera'):
+#         ...
+#
+# @profiled()
+# def set_camera(camera_object):
+#     ...
+#
+# Spans are timed with perf_counter_ns, which includes the time spent waiting on Fusion API calls
+# Each span is counted and totalled under its path, the names of the enclosing spans joined with '/'
+# When recording a trace every span is also kept as an event for export_chrome_trace
+# While disabled span() returns a shared object that does nothing and profiled functions are called directly
+import functools
+import json
+import time
+
+
+class Profiler(object):
+
+    def __init__(self):
+        self.enabled = False
+        self.record_trace = False
+
+        # Events past this many are not recorded, stats are still updated
+        self.max_trace_events = 200000
+
+        self.stack = []
+        self.stats = {}
+        self.trace_events = []
+        self.origin_ns = time.perf_counter_ns()
+
+    def reset(self):
+        self.stack = []
+        self.stats = {}
+        self.trace_events = []
+        self.origin_ns = time.perf_counter_ns()
+
+    def start_span(self, name):
+        self.stack.append(name)
+        return time.perf_counter_ns()
+
+    def end_span(self, start_ns):
+        end_ns = time.perf_counter_ns()
+        duration_ns = end_ns - start_ns
+
+        path = '/'.join(self.stack)
+        name = self.stack.pop()
+
+        span_stats = self.stats.get(path, None)
+        if span_stats is None:
+            self.stats[path] = [1, duration_ns, duration_ns]
+        else:
+            span_stats[0] += 1
+            span_stats[1] += duration_ns
+            if duration_ns > span_stats[2]:
+                span_stats[2] = duration_ns
+
+        if self.record_trace and len(self.trace_events) < self.max_trace_events:
+            self.trace_events.append((name, start_ns, duration_ns, len(self.stack)))
+
+
+class Span(object):
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start_ns = 0
+
+    def __enter__(self):
+        self.start_ns = self.profiler.start_span(self.name)
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.profiler.end_span(self.start_ns)
+        return False
+
+
+class NullSpan(object):
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        return False
+
+
+_profiler = Profiler()
+_null_span = NullSpan()
+
+
+def get_profiler() -> Profiler:
+    return _profiler
+
+
+def enable(record_trace=False):
+    _profiler.enabled = True
+    _profiler.record_trace = record_trace
+
+
+def disable():
+    _profiler.enabled = False
+
+
+def is_enabled() -> bool:
+    return _profiler.enabled
+
+
+def reset():
+    _profiler.reset()
+
+
+def span(name):
+    if not _profiler.enabled:
+        return _null_span
+
+    return Span(_profiler, name)
+
+
+# Decorator timing every call of a function as a span, named after the function by default
+def profiled(name=None):
+
+    def decorator(function):
+        span_name = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _profiler.enabled:
+                return function(*args, **kwargs)
+
+            start_ns = _profiler.start_span(span_name)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                _profiler.end_span(start_ns)
+
+        return wrapper
+
+    return decorator
+
+
+# Returns {path: {'count', 'total_ms', 'max_ms'}} for every span path recorded since the last reset
+def get_span_stats() -> dict:
+    span_stats = {}
+
+    for path, (count, total_ns, max_ns) in _profiler.stats.items():
+        span_stats[path] = {
+            'count': count,
+            'total_ms': total_ns / 1e6,
+            'max_ms': max_ns / 1e6
+        }
+
+    return span_stats
+
+
+# Text report of the span paths with the largest total time
+def format_span_stats(limit=20) -> str:
+    span_stats = sorted(get_span_stats().items(), key=lambda item: item[1]['total_ms'], reverse=True)
+
+    lines = []
+    for path, path_stats in span_stats[:limit]:
+        lines.append('{}: {} x, {:.3f} ms total, {:.3f} ms max'.format(
+            path, path_stats['count'], path_stats['total_ms'], path_stats['max_ms']))
+
+    return '\n'.join(lines)
+
+
+# Writes the recorded spans in the Chrome trace event format, for chrome://tracing or https://ui.perfetto.dev
+# Returns the number of events written
+def export_chrome_trace(file_name) -> int:
+    trace_events = []
+
+    for name, start_ns, duration_ns, depth in _profiler.trace_events:
+        trace_events.append({
+            'name': name,
+            'ph': 'X',
+            'ts': (start_ns - _profiler.origin_ns) / 1000,
+            'dur': duration_ns / 1000,
+            'pid': 1,
+            'tid': 1,
+            'args': {'depth': depth}
+        })
+
+    with open(file_name, 'w') as f:
+        json.dump({'traceEvents': trace_events, 'displayTimeUnit': 'ms'}, f)
+
+    return len(trace_events)
@@ -8,30 +8,74 @@ from typing import Optional, List
 import os
 from os.path import expanduser
 import json
+import tempfile
+
+from .Fusion360CallCounter import wrap_if_enabled
+
+
+# Marks an application object that has not been looked up yet
+_NOT_RESOLVED = object()
 
 
 # Class to quickly access Fusion Application Objects
 class AppObjects(object):
-    """The AppObjects class wraps many common application objects required when writing a Fusion 360 Addin."""
-
-    def __init__(self):
+    """The AppObjects class wraps many common application objects required when writing a Fusion 360 Addin.
 
-        self.app = adsk.core.Application.cast(adsk.core.Application.get())
+    Objects are looked up the first time they are used and then kept for the life of the instance.
+    Use scoped_app_objects() to share one instance between all the functions called by a command.
+    """
 
-        # Get import manager
-        self.import_manager = self.app.importManager
+    def __init__(self):
 
-        # Get User Interface
-        self.ui = self.app.userInterface
+        # Wrapped in a call counting proxy when Fusion360CallCounter is enabled
+        self.app = wrap_if_enabled(adsk.core.Application.cast(adsk.core.Application.get()))
 
-        self._document = self.document
-        self._product = self.product
-        self._design = self.design
+        self._import_manager = _NOT_RESOLVED
+        self._ui = _NOT_RESOLVED
+        self._document = _NOT_RESOLVED
+        self._product = _NOT_RESOLVED
+        self._design = _NOT_RESOLVED
+        self._viewport = _NOT_RESOLVED
+        self._root_comp = _NOT_RESOLVED
+        self._time_line = _NOT_RESOLVED
 
     def print_msg(self, message):
         print(message)
         self.ui.palettes.itemById('TextCommands').writeText(message)
 
+    @property
+    def import_manager(self) -> adsk.core.ImportManager:
+        """adsk.core.ImportManager from the application
+
+        Returns: adsk.core.ImportManager from the application
+
+        """
+        if self._import_manager is _NOT_RESOLVED:
+            self._import_manager = self.app.importManager
+        return self._import_manager
+
+    @property
+    def ui(self) -> adsk.core.UserInterface:
+        """adsk.core.UserInterface from the application
+
+        Returns: adsk.core.UserInterface from the application
+
+        """
+        if self._ui is _NOT_RESOLVED:
+            self._ui = self.app.userInterface
+        return self._ui
+
+    @property
+    def viewport(self) -> Optional[adsk.core.Viewport]:
+        """adsk.core.Viewport that is active in the application
+
+        Returns: adsk.core.Viewport that is active in the application
+
+        """
+        if self._viewport is _NOT_RESOLVED:
+            self._viewport = self.app.activeViewport
+        return self._viewport
+
     @property
     def document(self) -> Optional[adsk.core.Document]:
         """adsk.fusion.Design from the active document
@@ -39,16 +83,16 @@ class AppObjects(object):
         Returns: adsk.fusion.Design from the active document
 
         """
-        document = None
-        try:
-            document = self.app.activeDocument
-        except:
-            pass
-
-        if document is not None:
-            return document
-        else:
-            return None
+        if self._document is _NOT_RESOLVED:
+            document = None
+            try:
+                document = self.app.activeDocument
+            except:
+                pass
+
+            self._document = document
+
+        return self._document
 
     @property
     def product(self) -> Optional[adsk.core.Product]:
@@ -57,16 +101,16 @@ class AppObjects(object):
         Returns: adsk.fusion.Design from the active document
 
         """
-        product = None
-        try:
-            product = self.app.activeProduct
-        except:
-            pass
-
-        if product is not None:
-            return product
-        else:
-            return None
+        if self._product is _NOT_RESOLVED:
+            product = None
+            try:
+                product = self.app.activeProduct
+            except:
+                pass
+
+            self._product = product
+
+        return self._product
 
     @property
     def design(self) -> Optional[adsk.fusion.Design]:
@@ -75,14 +119,15 @@ class AppObjects(object):
         Returns: adsk.fusion.Design from the active document
 
         """
-        design_ = None
-        if self.document is not None:
-            design_ = self.document.products.itemByProductType('DesignProductType')
+        if self._design is _NOT_RESOLVED:
+            design_ = None
+            document = self.document
+            if document is not None:
+                design_ = document.products.itemByProductType('DesignProductType')
 
-        if design_ is not None:
-            return design_
-        else:
-            return None
+            self._design = design_
+
+        return self._design
 
     @property
     def cam(self) -> Optional[adsk.cam.CAM]:
@@ -112,7 +157,7 @@ class AppObjects(object):
         units_manager_ = None
         if self.product is not None:
             if self.product.productType == 'DesignProductType':
-                units_manager_ = self._design.fusionUnitsManager
+                units_manager_ = self.design.fusionUnitsManager
             else:
                 try:
                     units_manager_ = self.product.unitsManager
@@ -134,7 +179,7 @@ class AppObjects(object):
         units_manager = None
         if self.product is not None:
             if self.product.productType == 'DesignProductType':
-                units_manager = self._design.fusionUnitsManager
+                units_manager = self.design.fusionUnitsManager
             else:
                 units_manager = None
 
@@ -150,8 +195,8 @@ class AppObjects(object):
         Returns: adsk.fusion.ExportManager from the active document
 
         """
-        if self._design is not None:
-            export_manager_ = self._design.exportManager
+        if self.design is not None:
+            export_manager_ = self.design.exportManager
             return export_manager_
         else:
             return None
@@ -165,15 +210,15 @@ class AppObjects(object):
         Returns: The Root Component of the adsk.fusion.Design
 
         """
-        root_comp_ = None
-        if self.product is not None:
-            if self.product.productType == 'DesignProductType':
-                root_comp_ = self.design.rootComponent
+        if self._root_comp is _NOT_RESOLVED:
+            root_comp_ = None
+            if self.product is not None:
+                if self.product.productType == 'DesignProductType':
+                    root_comp_ = self.design.rootComponent
 
-            if root_comp_ is not None:
-                return root_comp_
-            else:
-                return None
+            self._root_comp = root_comp_
+
+        return self._root_comp
 
     @property
     def time_line(self) -> Optional[adsk.fusion.Timeline]:
@@ -182,16 +227,49 @@ class AppObjects(object):
         Returns: adsk.fusion.Timeline from the active adsk.fusion.Design
 
         """
-        time_line_ = None
-        if self.product is not None:
-            if self.product.productType == 'DesignProductType':
-                if self._design.designType == adsk.fusion.DesignTypes.ParametricDesignType:
-                    time_line_ = self.product.timeline
+        if self._time_line is _NOT_RESOLVED:
+            time_line_ = None
+            if self.product is not None:
+                if self.product.productType == 'DesignProductType':
+                    if self.design.designType == adsk.fusion.DesignTypes.ParametricDesignType:
+                        time_line_ = self.product.timeline
 
-        if time_line_ is not None:
-            return time_line_
-        else:
-            return None
+            self._time_line = time_line_
+
+        return self._time_line
+
+
+# AppObjects instances shared by the code running inside an AppObjectsScope, innermost last
+_app_objects_scopes = []
+
+
+class AppObjectsScope(object):
+    """Shares a single AppObjects instance with every scoped_app_objects() call made inside the with block.
+
+    Fusion360CommandBase opens a scope around each command event,
+    so helper functions resolve the document, product and design once per event instead of once per call.
+    """
+
+    def __enter__(self) -> AppObjects:
+        app_objects = AppObjects()
+        _app_objects_scopes.append(app_objects)
+        return app_objects
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        _app_objects_scopes.pop()
+        return False
+
+
+def scoped_app_objects() -> AppObjects:
+    """AppObjects for the current scope
+
+    Returns: The AppObjects of the innermost AppObjectsScope, or a new AppObjects if there is no scope
+
+    """
+    if len(_app_objects_scopes) > 0:
+        return _app_objects_scopes[-1]
+
+    return AppObjects()
 
 
 # Externally usable function to get all relevant application objects easily in a dictionary
@@ -481,3 +559,116 @@ def read_settings(app_name):
         settings = {}
 
     return settings
+
+
+# The umask of the process, it can only be read by setting it
+def get_umask() -> int:
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+# Write an iterable of JSON records to a file, one record per line, as they are produced
+# The records are written to a temporary file in the same directory that replaces file_name when complete,
+# so a failure part way through leaves any previous file untouched
+# Returns the number of records and bytes written
+def write_json_lines(file_name, records):
+    directory = os.path.dirname(os.path.abspath(file_name))
+    file_descriptor, temp_file_name = tempfile.mkstemp(prefix='.', suffix='.tmp', dir=directory)
+
+    record_count = 0
+    byte_count = 0
+
+    try:
+        with os.fdopen(file_descriptor, 'wb') as f:
+            for record in records:
+                line = (json.dumps(record, separators=(',', ':')) + '\n').encode('utf-8')
+                f.write(line)
+                record_count += 1
+                byte_count += len(line)
+
+            f.flush()
+            os.fsync(f.fileno())
+
+        # mkstemp makes the file readable by its owner only, give it the mode open() would have
+        os.chmod(temp_file_name, 0o666 & ~get_umask())
+        os.replace(temp_file_name, file_name)
+
+    except:
+        if os.path.exists(temp_file_name):
+            os.remove(temp_file_name)
+        raise
+
+    return record_count, byte_count
+
+
+# Read the records of a file written with write_json_lines one at a time, blank lines are ignored
+def iter_json_lines(f):
+    for line in f:
+        if line.strip():
+            yield json.loads(line)
+
+
+# Read the members of a file holding a single JSON object one at a time, as (key, value) pairs
+# Only the member being parsed is kept in memory, so large files can be read without loading them completely
+def iter_json_object_items(f, chunk_size=1 << 16):
+    decoder = json.JSONDecoder()
+    reader = {'buffer': '', 'position': 0, 'eof': False}
+
+    # Drops parsed text and reads at least as much again, so a large value needs only a few attempts to parse
+    def read_more():
+        buffer = reader['buffer'][reader['position']:]
+        chunk = f.read(max(chunk_size, len(buffer)))
+        reader['eof'] = len(chunk) == 0
+        reader['buffer'] = buffer + chunk
+        reader['position'] = 0
+
+    def next_character():
+        while True:
+            buffer = reader['buffer']
+            position = reader['position']
+            while position < len(buffer) and buffer[position].isspace():
+                position += 1
+            reader['position'] = position
+
+            if position < len(buffer):
+                return buffer[position]
+
+            if reader['eof']:
+                raise ValueError('Unexpected end of JSON object')
+            read_more()
+
+    def expect(characters):
+        character = next_character()
+        if character not in characters:
+            raise ValueError('Expected {} but found {!r}'.format(' or '.join(characters), character))
+        reader['position'] += 1
+        return character
+
+    def next_value():
+        next_character()
+        while True:
+            try:
+                value, end = decoder.raw_decode(reader['buffer'], reader['position'])
+            except json.JSONDecodeError:
+                if reader['eof']:
+                    raise
+            else:
+                # A number at the end of the buffer may continue in the next chunk
+                if end < len(reader['buffer']) or reader['eof']:
+                    reader['position'] = end
+                    return value
+            read_more()
+
+    expect('{')
+
+    if next_character() == '}':
+        return
+
+    while True:
+        key = next_value()
+        expect(':')
+        yield key, next_value()
+
+        if expect(',}') == '}':
+            return
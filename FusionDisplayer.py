@@ -3,8 +3,16 @@
 from .Demo1Command import Demo1Command
 from .SaveViewCommand import SetViewCommand, CaptureViewCommand, ManageViewsCommand, \
     DeleteAllViewsCommand, ImportViewsCommand, ExportAllViewsCommand, RefreshViewsCommand, \
-    NormalToCommand, NormalToSketchCommand
+    NormalToCommand, NormalToSketchCommand, PerfReportCommand
+from .SaveViewCommand import refresh_custom_views, start_document_events, stop_document_events, \
+    configure_set_view_commands, stop_set_view_commands, get_model_size
 from .DemoPaletteCommand import DemoPaletteShowCommand, DemoPaletteSendCommand
+from .BenchmarkCommand import BenchmarkCommand
+from .Fusion360Utilities import Fusion360Profiler, Fusion360CallCounter, Fusion360PerfHistory
+from .Fusion360Utilities.Fusion360DebugUtilities import get_log_directory
+
+import json
+import os
 
 commands = []
 command_definitions = []
@@ -13,6 +21,9 @@ command_in_nav_bar = False
 workspaces = ['FusionSolidEnvironment', "CAMEnvironment"]
 panel = 'Displayer'
 
+# How captured appearances are stored: 'tokens' (one compressed mapping per view) or 'attributes' (legacy)
+appearance_backend = 'tokens'
+
 # Define parameters for 1st command
 cmd = {
     'cmd_name': 'Save View',
@@ -23,6 +34,7 @@ cmd = {
     'toolbar_panel_id': panel,
     'command_promoted': True,
     'command_in_nav_bar': command_in_nav_bar,
+    'appearance_backend': appearance_backend,
     'class': CaptureViewCommand
 }
 command_definitions.append(cmd)
@@ -37,6 +49,7 @@ cmd = {
     'toolbar_panel_id': panel,
     'command_promoted': False,
     'command_in_nav_bar': command_in_nav_bar,
+    'appearance_backend': appearance_backend,
     'class': ManageViewsCommand
 }
 command_definitions.append(cmd)
@@ -59,25 +72,46 @@ cmd = {
 }
 command_definitions.append(cmd)
 
-for view_number in range(0, 10):
-    # Define parameters for 2nd command
-    cmd = {
-        'cmd_name': 'Custom View ' + str(view_number),
-        'cmd_description': SetViewCommand.get_tooltip(view_number),
-        'cmd_id': 'cmdID_SetViewCommand_' + str(view_number),
-        'cmd_resources': './resources',
-        'workspace': workspaces,
-        'toolbar_panel_id': panel,
-        'custom_view_number': view_number,
-        'command_enabled': SetViewCommand.get_view_exists(view_number),
-        'add_to_drop_down': True,
-        'drop_down_cmd_id': 'cmd_id_saved_views',
-        'drop_down_resources': './resources',
-        'drop_down_name': "Saved Views",
-        'command_in_nav_bar': command_in_nav_bar,
-        'class': SetViewCommand
-    }
-    command_definitions.append(cmd)
+# Template for the custom view commands
+# They are only created for views that exist in a document, see SaveViewCommand.refresh_custom_views
+set_view_cmd = {
+    'cmd_resources': './resources',
+    'workspace': workspaces,
+    'toolbar_panel_id': panel,
+    'add_to_drop_down': True,
+    'drop_down_cmd_id': 'cmd_id_saved_views',
+    'drop_down_resources': './resources',
+    'drop_down_name': "Saved Views",
+    'command_in_nav_bar': command_in_nav_bar,
+    'restore_scope_from_selection': False,
+    'class': SetViewCommand
+}
+
+# Only added when perf_history is enabled, see below
+perf_report_cmd = {
+    'cmd_name': 'Performance Report',
+    'cmd_description': 'Compare command timings against the stored baseline',
+    'cmd_id': 'cmdID_PerfReportCommand',
+    'cmd_resources': './resources',
+    'workspace': workspaces,
+    'toolbar_panel_id': panel,
+    'command_promoted': False,
+    'command_in_nav_bar': command_in_nav_bar,
+    'class': PerfReportCommand
+}
+
+# Only added when benchmark is enabled, see below
+benchmark_cmd = {
+    'cmd_name': 'Benchmark',
+    'cmd_description': 'Time saving and restoring views on synthetic assemblies',
+    'cmd_id': 'cmdID_BenchmarkCommand',
+    'cmd_resources': './resources',
+    'workspace': workspaces,
+    'toolbar_panel_id': panel,
+    'command_promoted': False,
+    'command_in_nav_bar': command_in_nav_bar,
+    'class': BenchmarkCommand
+}
 
 # Define parameters for 1st command
 cmd = {
@@ -191,19 +225,73 @@ command_definitions.append(cmd)
 # Set to True to display various useful messages when debugging your app
 debug = False
 
+# Set to True to time captures and restores with Fusion360Profiler
+# In debug mode Refresh Views then shows the slowest spans and writes a Chrome trace file
+profile = False
+
+# Set to True to count and time every Fusion API call made through AppObjects with Fusion360CallCounter
+# A ranked report is written to the Text Commands palette at the end of each command
+count_calls = False
+
+# Set to True to keep the timings of every command across sessions in ~/Fusion360DebugUtilities
+# Samples are kept per add-in version and model size, the Performance Report command flags p95 regressions
+perf_history = False
+
+# Set to True to add the Benchmark command, which times captures and restores on synthetic assemblies
+# With perf_history the results are kept per version and model size, with count_calls the API calls are reported
+benchmark = False
+
 
 # Don't change anything below here:
+if perf_history:
+    command_definitions.append(perf_report_cmd)
+
+if benchmark:
+    command_definitions.append(benchmark_cmd)
+
 for cmd_def in command_definitions:
     command = cmd_def['class'](cmd_def, debug)
     commands.append(command)
 
 
+# Version from the add-in manifest, the performance history is kept per version
+def get_addin_version():
+    manifest_file_name = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'FusionDisplayer.manifest')
+
+    try:
+        with open(manifest_file_name) as f:
+            return json.load(f).get('version', '')
+    except:
+        return ''
+
+
 def run(context):
 
+    if profile:
+        Fusion360Profiler.enable(record_trace=True)
+
+    if count_calls:
+        Fusion360CallCounter.enable_call_counting()
+
+    if perf_history:
+        Fusion360PerfHistory.enable_perf_history(os.path.join(get_log_directory(), 'FusionDisplayer-PerfHistory.jsonl'),
+                                                 get_addin_version(), get_model_size)
+
     for run_command in commands:
         run_command.on_run()
 
+    # Custom view commands are created for the views saved in the document, if one is open
+    configure_set_view_commands(set_view_cmd, debug)
+    refresh_custom_views()
+    start_document_events()
+
 
 def stop(context):
+    if perf_history:
+        Fusion360PerfHistory.disable_perf_history()
+
+    stop_document_events()
+    stop_set_view_commands()
+
     for stop_command in commands:
         stop_command.on_stop()
@@ -0,0 +1,141 @@
+import adsk.core
+import adsk.fusion
+
+from typing import Optional
+
+from .DisplayStateEncoding import get_ordering_fingerprint
+from .Fusion360Utilities.Fusion360Profiler import span
+from .Fusion360Utilities.Fusion360CallCounter import cast
+from .Fusion360Utilities.Fusion360Utilities import scoped_app_objects
+
+# Occurrence indexes built so far, keyed by document creation id
+_occurrence_indexes = {}
+
+
+# Cheap to read values that change whenever occurrences are added or removed or the timeline changes
+# Renames are not caught, that would mean reading every component name on each look up
+# Occurrences renamed since the index was built are found by their entity token, which reads the paths again,
+# see OccurrenceIndex.find and OccurrenceIndex.has_current_paths
+# Not caught: an occurrence moved under another parent while no occurrence or timeline feature
+# is added or removed. Restores still find such an occurrence by its entity token
+def get_design_change_key(design: adsk.fusion.Design):
+    timeline_count = None
+
+    try:
+        timeline_count = design.timeline.count
+    except:
+        pass
+
+    return design.rootComponent.allOccurrences.count, timeline_count
+
+
+# Every occurrence of a design from a single pass over allOccurrences
+# Occurrences are identified by their position in the index
+# Look ups by fullPathName are direct, occurrences renamed since a view was saved are found by entity token
+class OccurrenceIndex(object):
+
+    def __init__(self, design: adsk.fusion.Design):
+        self.design = design
+        self.read_occurrences()
+
+    # Reads every occurrence again, after occurrences were renamed
+    def read_occurrences(self):
+        self.change_key = get_design_change_key(self.design)
+
+        self.occurrences = []
+        self.paths = []
+        self.tokens = []
+        self.positions_by_path = {}
+
+        for occurrence in self.design.rootComponent.allOccurrences:
+            position = len(self.occurrences)
+            path = occurrence.fullPathName
+            token = occurrence.entityToken
+
+            self.occurrences.append(occurrence)
+            self.paths.append(path)
+            self.tokens.append(token)
+            self.positions_by_path[path] = position
+
+        self.ordering_fingerprint = get_ordering_fingerprint(self.paths)
+
+    def __len__(self):
+        return len(self.occurrences)
+
+    def get_token(self, path) -> Optional[str]:
+        position = self.positions_by_path.get(path, None)
+
+        if position is None:
+            return None
+
+        return self.tokens[position]
+
+    # Position of an occurrence by its path, or by resolving its entity token when the path no longer matches
+    # Tokens are not compared as strings, the token of the same occurrence can change
+    # Returns None if the occurrence is not in the index
+    def find(self, path, token=None) -> Optional[int]:
+        position = self.positions_by_path.get(path, None)
+
+        if position is None and token is not None:
+            current_path = self.resolve_token_path(token)
+
+            # Renamed since the index was built
+            if current_path is not None and current_path not in self.positions_by_path:
+                with span('refresh occurrence index'):
+                    self.read_occurrences()
+
+            if current_path is not None:
+                position = self.positions_by_path.get(current_path, None)
+
+        return position
+
+    # False if an occurrence at one of the positions was renamed since the index was built
+    # Reads the fullPathName of those occurrences only
+    def has_current_paths(self, positions) -> bool:
+        for position in positions:
+            if self.occurrences[position].fullPathName != self.paths[position]:
+                return False
+
+        return True
+
+    # Path the design now uses for an entity token, None if it does not resolve to an occurrence
+    def resolve_token_path(self, token) -> Optional[str]:
+        for entity in self.design.findEntityByToken(token):
+            occurrence = cast(adsk.fusion.Occurrence, entity)
+
+            if occurrence is not None:
+                return occurrence.fullPathName
+
+        return None
+
+
+# Returns the occurrence index for the active design, building it when missing or when the design has changed
+# Returns None if there is no design
+def get_occurrence_index(design=None) -> Optional[OccurrenceIndex]:
+    if design is None:
+        design = cast(adsk.fusion.Design, scoped_app_objects().app.activeProduct)
+
+    if design is None:
+        return None
+
+    key = design.parentDocument.creationId
+    occurrence_index = _occurrence_indexes.get(key)
+
+    if occurrence_index is None or occurrence_index.change_key != get_design_change_key(design):
+        with span('build occurrence index'):
+            occurrence_index = OccurrenceIndex(design)
+        _occurrence_indexes[key] = occurrence_index
+
+    return occurrence_index
+
+
+def invalidate_occurrence_index(document=None):
+    if document is None:
+        document = scoped_app_objects().document
+
+    if document is not None:
+        _occurrence_indexes.pop(document.creationId, None)
+
+
+def clear_occurrence_indexes():
+    _occurrence_indexes.clear()
@@ -2,11 +2,28 @@ import adsk.core
 import adsk.fusion
 import traceback
 
-from .Fusion360Utilities.Fusion360Utilities import AppObjects, get_default_dir, read_settings, write_settings
-from .Fusion360Utilities.Fusion360CommandBase import Fusion360CommandBase
+from .Fusion360Utilities.Fusion360Utilities import scoped_app_objects, get_default_dir, read_settings, write_settings, \
+    write_json_lines
+from .Fusion360Utilities.Fusion360CommandBase import Fusion360CommandBase, create_document_event, \
+    remove_document_event, run_steps, write_text_commands
+from .Fusion360Utilities.Fusion360Profiler import profiled, is_enabled as is_profiler_enabled
+from .Fusion360Utilities.Fusion360DebugUtilities import profile_message, get_log_file_name
+from .Fusion360Utilities.Fusion360CommandTiming import dump_command_timings, format_command_timing_stats
+from .Fusion360Utilities.Fusion360PerfHistory import is_perf_history_enabled, load_perf_baseline, \
+    save_perf_baseline, find_regressions, format_perf_report
+from .Fusion360Utilities.Fusion360CallCounter import cast
+from .DisplayStateEncoding import encode_display_state, decode_display_state, decode_display_state_tokens, \
+    get_default_state, encode_display_state_bits, decode_display_state_bits, bits_from_states, iter_set_bits, \
+    set_display_state_scope, decode_display_state_scope, is_path_in_scope, \
+    encode_appearance_tokens, decode_appearance_tokens, is_appearance_tokens
+from .ViewStorage import get_view_index, invalidate_view_index, get_view_cache_stats, on_document_saved, \
+    clear_view_indexes, on_document_saving, view_id_from_number, view_number_from_id, encode_document_view, \
+    decode_document_view, collect_unused_facets, iter_export_records, iter_import_records, \
+    import_view_records, DEFAULT_TOOLTIP
+from .OccurrenceIndex import get_occurrence_index, invalidate_occurrence_index, clear_occurrence_indexes
 
-import json
 import os
+import time
 from collections import defaultdict
 
 
@@ -48,10 +65,11 @@ def get_vector(vector):
     return vector_out
 
 
+@profiled()
 def set_camera(camera_object):
-    ao = AppObjects()
+    ao = scoped_app_objects()
 
-    camera = ao.app.activeViewport.camera
+    camera = ao.viewport.camera
 
     camera.cameraType = camera_object["camera_type"]
     camera.eye = get_point(camera_object["eye"])
@@ -65,12 +83,13 @@ def set_camera(camera_object):
     if not camera_object["camera_type"] == adsk.core.CameraTypes.OrthographicCameraType:
         camera.perspectiveAngle = camera_object["perspective_angle"]
 
-    ao.app.activeViewport.camera = camera
+    ao.viewport.camera = camera
 
 
+@profiled()
 def build_camera_object():
-    ao = AppObjects()
-    camera = ao.app.activeViewport.camera
+    ao = scoped_app_objects()
+    camera = ao.viewport.camera
 
     camera_object = {
 
@@ -90,8 +109,9 @@ def build_camera_object():
     return camera_object
 
 
+@profiled()
 def build_parameter_object(all_params):
-    ao = AppObjects()
+    ao = scoped_app_objects()
     um = ao.units_manager
 
     design = ao.design
@@ -122,8 +142,47 @@ def build_parameter_object(all_params):
         return False
 
 
-def set_parameters(parameter_object):
-    ao = AppObjects()
+# Orders parameter changes so a parameter is applied before the changed parameters that depend on it
+def order_parameter_changes(parameter_changes):
+    changes_by_name = {parameter.name: (parameter, expression) for parameter, expression in parameter_changes}
+
+    dependents = {}
+    dependency_count = {name: 0 for name in changes_by_name}
+
+    for name, (parameter, expression) in changes_by_name.items():
+        dependents[name] = []
+        for dependent_parameter in parameter.dependentParameters:
+            dependent_name = dependent_parameter.name
+            if dependent_name in changes_by_name:
+                dependents[name].append(dependent_name)
+                dependency_count[dependent_name] += 1
+
+    ready = [name for name, count in dependency_count.items() if count == 0]
+    ordered_names = []
+
+    while len(ready) > 0:
+        name = ready.pop(0)
+        ordered_names.append(name)
+        for dependent_name in dependents[name]:
+            dependency_count[dependent_name] -= 1
+            if dependency_count[dependent_name] == 0:
+                ready.append(dependent_name)
+
+    # Anything left is in a cycle, apply it in the original order
+    for name in changes_by_name:
+        if dependency_count[name] > 0:
+            ordered_names.append(name)
+
+    return [changes_by_name[name] for name in ordered_names]
+
+
+# Apply saved parameter expressions to the design
+# With batched the changes are ordered by dependency and applied with one Design.modifyParameters call,
+# so the model is recomputed once at the end instead of once per parameter
+# Returns a dict with the number of changes and the time in seconds spent in each phase
+@profiled()
+def set_parameters(parameter_object, batched=False):
+    ao = scoped_app_objects()
     um = ao.units_manager
 
     design = ao.design
@@ -133,6 +192,17 @@ def set_parameters(parameter_object):
 
     if design.designType == adsk.fusion.DesignTypes.ParametricDesignType:
 
+        result = {
+            "changed": 0,
+            "collect": 0.0,
+            "order": 0.0,
+            "apply": 0.0
+        }
+
+        start_time = time.perf_counter()
+
+        parameter_changes = []
+
         all_parameters = design.allParameters
 
         for parameter in all_parameters:
@@ -152,69 +222,354 @@ def set_parameters(parameter_object):
 
                 # TODO handle units with an attribute that is written on create.  Can be set for link
                 if parameter.value != evaluated_value:
-                    parameter.expression = this_parameter["expression"]
-        return True
+                    parameter_changes.append((parameter, this_parameter["expression"]))
+
+        result["changed"] = len(parameter_changes)
+        result["collect"] = time.perf_counter() - start_time
+
+        # Versions of Fusion 360 before modifyParameters recompute after every change
+        modify_parameters = getattr(design, 'modifyParameters', None)
+
+        if not batched or modify_parameters is None:
+            start_time = time.perf_counter()
+            for parameter, expression in parameter_changes:
+                parameter.expression = expression
+            result["apply"] = time.perf_counter() - start_time
+
+            return result
+
+        if len(parameter_changes) == 0:
+            return result
+
+        start_time = time.perf_counter()
+        parameter_changes = order_parameter_changes(parameter_changes)
+        parameters = [parameter for parameter, expression in parameter_changes]
+        values = [adsk.core.ValueInput.createByString(expression) for parameter, expression in parameter_changes]
+        result["order"] = time.perf_counter() - start_time
+
+        # Sets every expression and then computes the model once
+        start_time = time.perf_counter()
+        modify_parameters(parameters, values)
+        result["apply"] = time.perf_counter() - start_time
+
+        return result
 
     else:
         return False
 
 
-def build_display_state_object():
-    ao = AppObjects()
-    root_comp = ao.root_comp
+# Display state captures and restores are generators of steps for Fusion360CommandBase.run_chunked
+# They yield the number of occurrences handled so far and return their result
+# The plain functions run them to the end immediately
+# Generators only start running at their first step, so chunked callers pass in the occurrence index
+# of the design the task started in, the user can switch documents before the last slice
 
-    display_state_object = {}
+# Number of steps of a display state capture or restore, for run_chunked
+# Scoped ones only walk the subtrees of scope_occurrences, or of the scope display_state_object was saved for
+def get_display_state_step_count(occurrence_index, scope_occurrences=None, display_state_object=None):
+    if occurrence_index is None:
+        return 0
+
+    if scope_occurrences is not None:
+        scope_paths = [occurrence.fullPathName for occurrence in scope_occurrences]
+
+    else:
+        saved_scope = None
+        if display_state_object is not None:
+            saved_scope = decode_display_state_scope(display_state_object)
 
-    if root_comp is not None:
+        if saved_scope is None:
+            return len(occurrence_index)
 
-        all_occurrences = ao.root_comp.allOccurrences
+        positions = [occurrence_index.find(path, token) for path, token in saved_scope]
+        scope_paths = [occurrence_index.paths[position] for position in positions if position is not None]
 
-        for occurrence in all_occurrences:
-            display_state_object[occurrence.fullPathName] = occurrence.isLightBulbOn
+    return sum(1 for path in occurrence_index.paths if is_path_in_scope(path, scope_paths))
 
+
+# Saved display state for the active design, with the entity token of each stored occurrence
+# and a bitset over the occurrence index ordering
+def encode_current_display_state():
+    return run_steps(iter_encode_display_state())
+
+
+def iter_encode_display_state(occurrence_index=None):
+    if occurrence_index is None:
+        occurrence_index = get_occurrence_index()
+
+    if occurrence_index is None:
+        return encode_display_state({})
+
+    states = []
+    for occurrence in occurrence_index.occurrences:
+        states.append(occurrence.isLightBulbOn)
+        yield len(states)
+
+    # Only the paths of the occurrences not in the default state are stored, they are read again if any was renamed
+    default = get_default_state(states)
+    if not occurrence_index.has_current_paths(position for position, state in enumerate(states) if state != default):
+        occurrence_index.read_occurrences()
+
+    display_state_object = encode_display_state(dict(zip(occurrence_index.paths, states)),
+                                                occurrence_index.get_token)
+    display_state_object['bitset'] = encode_display_state_bits(occurrence_index.ordering_fingerprint,
+                                                               len(states), bits_from_states(states))
     return display_state_object
 
 
-def set_display_state(display_state_object):
-    ao = AppObjects()
-    root_comp = ao.root_comp
+# Yields (fullPathName, occurrence) for the occurrences and all of their descendants, each once
+# Only these subtrees are walked, not the whole assembly
+def iter_subtree_occurrences(occurrences):
+    visited_paths = set()
+    stack = list(reversed(list(occurrences)))
 
-    if root_comp is None:
-        return False
+    while len(stack) > 0:
+        occurrence = stack.pop()
+        path = occurrence.fullPathName
 
-    all_occurrences = root_comp.allOccurrences
+        if path in visited_paths:
+            continue
+        visited_paths.add(path)
 
-    for occurrence in all_occurrences:
-        state = display_state_object.get(occurrence.fullPathName, None)
+        yield path, occurrence
 
-        if state is not None:
+        child_occurrences = occurrence.childOccurrences
+        for i in range(child_occurrences.count - 1, -1, -1):
+            stack.append(child_occurrences.item(i))
+
+
+# Occurrences in the active selection, None if no occurrence is selected
+def get_selected_occurrences():
+    ao = scoped_app_objects()
+    selected_occurrences = []
+
+    for i in range(ao.ui.activeSelections.count):
+        occurrence = cast(adsk.fusion.Occurrence, ao.ui.activeSelections.item(i).entity)
+        if occurrence is not None:
+            selected_occurrences.append(occurrence)
+
+    if len(selected_occurrences) == 0:
+        return None
+
+    return selected_occurrences
+
+
+# Saved display state for the selected occurrences and their descendants only
+def encode_scoped_display_state(scope_occurrences):
+    return run_steps(iter_encode_scoped_display_state(scope_occurrences))
+
+
+def iter_encode_scoped_display_state(scope_occurrences):
+    display_state_object = {}
+    tokens = {}
+
+    for path, occurrence in iter_subtree_occurrences(scope_occurrences):
+        display_state_object[path] = occurrence.isLightBulbOn
+        tokens[path] = occurrence.entityToken
+        yield len(tokens)
+
+    scoped_display_state_object = encode_display_state(display_state_object, tokens.get)
+    set_display_state_scope(scoped_display_state_object,
+                            [occurrence.fullPathName for occurrence in scope_occurrences],
+                            [occurrence.entityToken for occurrence in scope_occurrences])
+    return scoped_display_state_object
+
+
+# Restore light bulb states for the scope of a display state captured for part of the assembly,
+# or only for the subtrees of scope_occurrences if given
+# The default state is only applied inside the scope the display state was captured for
+def iter_set_scoped_display_state(display_state_object, occurrence_index, saved_scope, scope_occurrences,
+                                  diff_only):
+    default, states = decode_display_state(display_state_object)
+    tokens = decode_display_state_tokens(display_state_object)
+
+    # Saved paths are only trusted if the occurrences at them still have them
+    saved_positions = [occurrence_index.positions_by_path[path] for path in states
+                       if path in occurrence_index.positions_by_path]
+    if not occurrence_index.has_current_paths(saved_positions):
+        occurrence_index.read_occurrences()
+
+    # Saved occurrences no longer at their saved path, such as renamed ones, are moved to their current path
+    # by resolving their entity token, tokens are not compared as strings
+    states = dict(states)
+    for path, token in tokens.items():
+        if path in states and path not in occurrence_index.positions_by_path:
+            current_path = occurrence_index.resolve_token_path(token)
+            if current_path is not None:
+                states[current_path] = states.pop(path)
+
+    scope_paths = None
+
+    if saved_scope is not None:
+        saved_scope_occurrences = []
+        for path, token in saved_scope:
+            position = occurrence_index.find(path, token)
+            if position is not None:
+                saved_scope_occurrences.append(occurrence_index.occurrences[position])
+
+        scope_paths = [occurrence.fullPathName for occurrence in saved_scope_occurrences]
+
+        if scope_occurrences is None:
+            scope_occurrences = saved_scope_occurrences
+
+    written = 0
+    skipped = 0
+    visited = 0
+
+    for path, occurrence in iter_subtree_occurrences(scope_occurrences):
+        visited += 1
+        yield visited
+
+        state = states.get(path, None)
+
+        if state is None and (scope_paths is None or is_path_in_scope(path, scope_paths)):
+            state = default
+
+        if state is None:
+            continue
+
+        if diff_only and occurrence.isLightBulbOn == state:
+            skipped += 1
+        else:
             occurrence.isLightBulbOn = state
+            written += 1
 
-    return True
+    return {
+        "written": written,
+        "skipped": skipped
+    }
+
+
+# Returns the bits of a saved display state, or None if the display state has no bitset
+# or the occurrence ordering has changed since it was saved
+def get_usable_display_state_bits(display_state_object, occurrence_index):
+    display_state_bits = decode_display_state_bits(display_state_object)
+
+    if display_state_bits is None:
+        return None
+
+    fingerprint, count, bits = display_state_bits
+
+    if fingerprint != occurrence_index.ordering_fingerprint or count != len(occurrence_index):
+        return None
+
+    return bits
+
+
+# Restore light bulb states from the bitset of a saved display state
+def iter_set_display_state_bits(bits, occurrence_index, diff_only=False):
+    count = len(occurrence_index)
+
+    # Saved state of each occurrence as a '0' or '1' character, in index order
+    bit_text = format(bits, 'b').zfill(count)[::-1]
+
+    if diff_only:
+        states = []
+        for occurrence in occurrence_index.occurrences:
+            states.append(occurrence.isLightBulbOn)
+            yield len(states)
+
+        positions = list(iter_set_bits(bits ^ bits_from_states(states)))
+    else:
+        positions = range(count)
+
+    for position in positions:
+        occurrence_index.occurrences[position].isLightBulbOn = bit_text[position] == '1'
+        if not diff_only:
+            yield position + 1
+
+    return {
+        "written": len(positions),
+        "skipped": count - len(positions)
+    }
+
+
+# Restore light bulb states from a saved display state, in either the legacy or sparse encoding
+# The bitset is used when the occurrence ordering still matches
+# Otherwise occurrences are looked up in the cached occurrence index,
+# the assembly is only walked to apply a default state
+# Occurrences renamed since the view was saved are found by their entity token
+# Display states captured for part of the assembly, or a restore limited to scope_occurrences,
+# only walk the subtrees of their scope
+# With diff_only the current state is read first and only occurrences that differ are written
+# Returns a dict with the number of writes made and skipped, or None if there is no design
+def set_display_state(display_state_object, diff_only=False, scope_occurrences=None):
+    return run_steps(iter_set_display_state(display_state_object, diff_only, scope_occurrences))
+
+
+def iter_set_display_state(display_state_object, diff_only=False, scope_occurrences=None, occurrence_index=None):
+    if occurrence_index is None:
+        occurrence_index = get_occurrence_index()
+
+    if occurrence_index is None:
+        return None
+
+    saved_scope = decode_display_state_scope(display_state_object)
+
+    if saved_scope is not None or scope_occurrences is not None:
+        return (yield from iter_set_scoped_display_state(display_state_object, occurrence_index, saved_scope,
+                                                         scope_occurrences, diff_only))
+
+    bits = get_usable_display_state_bits(display_state_object, occurrence_index)
+
+    if bits is not None:
+        return (yield from iter_set_display_state_bits(bits, occurrence_index, diff_only))
+
+    default, states = decode_display_state(display_state_object)
+    tokens = decode_display_state_tokens(display_state_object)
+
+    explicit_states = {}
+
+    for path, state in states.items():
+        position = occurrence_index.find(path, tokens.get(path, None))
+
+        if position is not None:
+            explicit_states[position] = state
+
+    if default is None:
+        positions = explicit_states.keys()
+    else:
+        positions = range(len(occurrence_index))
+
+    written = 0
+    skipped = 0
+
+    for position in positions:
+        yield written + skipped + 1
+
+        state = explicit_states.get(position, default)
+        occurrence = occurrence_index.occurrences[position]
+
+        if diff_only and occurrence.isLightBulbOn == state:
+            skipped += 1
+        else:
+            occurrence.isLightBulbOn = state
+            written += 1
+
+    return {
+        "written": written,
+        "skipped": skipped
+    }
 
 
 def delete_view_attributes():
-    ao = AppObjects()
+    ao = scoped_app_objects()
 
     view_object_attributes = ao.document.attributes.itemsByGroup('displayer_custom_views')
 
     for attribute in view_object_attributes:
         attribute.deleteMe()
 
+    invalidate_view_index()
 
-def delete_tooltips():
-    ao = AppObjects()
 
-    for custom_view_number in range(0, 10):
-        command_defintion = ao.ui.commandDefinitions.itemById(
-            'cmdID_SetViewCommand_' + str(custom_view_number)
-        )
-        command_defintion.tooltip = 'This View has not been set'
-        command_defintion.controlDefinition.isEnabled = False
+def delete_tooltips():
+    for custom_view_number in set_view_commands:
+        disable_custom_view(custom_view_number)
 
 
 def delete_appearance_attributes():
-    ao = AppObjects()
+    ao = scoped_app_objects()
 
     appearance_object_attributes = ao.document.attributes.itemsByGroup('displayer_appearances')
 
@@ -222,62 +577,246 @@ def delete_appearance_attributes():
         attribute.deleteMe()
 
 
-def remove_all_appearances():
-    ao = AppObjects()
-    all_appearances = ao.design.appearances
+# SetViewCommand for each view number that has been used, created on demand
+set_view_commands = {}
 
-    for appearance in all_appearances:
-        used_by = appearance.usedBy
-        for item in used_by:
-            item.appearance = None
+# Command definition every SetViewCommand is created from, set by configure_set_view_commands
+set_view_command_template = {}
 
 
-def get_view_from_number(custom_view_number):
-    ao = AppObjects()
-    view_object_attribute = ao.document.attributes.itemByName(
-        'displayer_custom_views',
-        "Custom View " + str(custom_view_number)
-    )
-    if view_object_attribute is not None:
-        view_object = json.loads(view_object_attribute.value)
-    else:
-        view_object = None
+def configure_set_view_commands(cmd_def, debug):
+    set_view_command_template.clear()
+    set_view_command_template.update(cmd_def)
+    set_view_command_template['debug'] = debug
 
-    return view_object
 
+# Returns the SetViewCommand for a view number, adding its command to the UI the first time
+def get_set_view_command(custom_view_number, tooltip=DEFAULT_TOOLTIP):
+    set_view_command = set_view_commands.get(custom_view_number, None)
 
-def refresh_custom_views():
-    ao = AppObjects()
-    view_object_attributes = ao.app.activeDocument.attributes.itemsByGroup('displayer_custom_views')
+    if set_view_command is None and len(set_view_command_template) > 0:
+        cmd_def = dict(set_view_command_template)
+        cmd_def['cmd_name'] = view_id_from_number(custom_view_number)
+        cmd_def['cmd_description'] = tooltip
+        cmd_def['cmd_id'] = 'cmdID_SetViewCommand_' + str(custom_view_number)
+        cmd_def['custom_view_number'] = custom_view_number
 
-    delete_tooltips()
+        # Commands are created in any order, each is added before the command of the next higher view number
+        later_view_numbers = [view_number for view_number in set_view_commands if view_number > custom_view_number]
+        if len(later_view_numbers) > 0:
+            cmd_def['control_position_id'] = set_view_commands[min(later_view_numbers)].cmd_id
+            cmd_def['control_is_before'] = True
 
-    for view_object_attribute in view_object_attributes:
-        view_object = json.loads(view_object_attribute.value)
-        command_defintion = ao.ui.commandDefinitions.itemById(
-            'cmdID_SetViewCommand_' + view_object_attribute.name[-1:]
-        )
-        command_defintion.tooltip = view_object["name"]
-        command_defintion.controlDefinition.isEnabled = True
+        set_view_command = cmd_def['class'](cmd_def, cmd_def['debug'])
+        set_view_command.on_run()
+        set_view_commands[custom_view_number] = set_view_command
 
+    return set_view_command
 
-def set_appearances(view_name):
-    ao = AppObjects()
-    attributes = ao.design.findAttributes("displayer_appearances", view_name)
 
-    remove_all_appearances()
+def stop_set_view_commands():
+    for set_view_command in set_view_commands.values():
+        set_view_command.on_stop()
 
-    if len(attributes) > 0:
+    set_view_commands.clear()
+
+
+def enable_custom_view(custom_view_number, tooltip):
+    ao = scoped_app_objects()
+
+    if custom_view_number is None:
+        return
+
+    set_view_command = get_set_view_command(custom_view_number, tooltip)
+
+    if set_view_command is None:
+        return
+
+    command_defintion = ao.ui.commandDefinitions.itemById(set_view_command.cmd_id)
+    command_defintion.tooltip = tooltip
+    command_defintion.controlDefinition.isEnabled = True
+
+
+def disable_custom_view(custom_view_number):
+    ao = scoped_app_objects()
+
+    command_defintion = ao.ui.commandDefinitions.itemById('cmdID_SetViewCommand_' + str(custom_view_number))
+
+    if command_defintion is not None:
+        command_defintion.tooltip = DEFAULT_TOOLTIP
+        command_defintion.controlDefinition.isEnabled = False
+
+
+# Update tooltips and enabled state of the custom view commands from the active document
+# Commands are only created for views that exist, views without a command are left alone
+# With rebuild the view index is read again from the document
+@profiled()
+def refresh_custom_views(rebuild=False):
+    if rebuild:
+        invalidate_view_index()
+
+    view_index = get_view_index()
+
+    view_numbers = []
+    if view_index is not None:
+        view_numbers = view_index.view_numbers()
+
+    saved_view_numbers = set(view_numbers)
+    for custom_view_number in list(set_view_commands):
+        if custom_view_number not in saved_view_numbers:
+            disable_custom_view(custom_view_number)
+
+    for custom_view_number in view_numbers:
+        enable_custom_view(custom_view_number, view_index.get_tooltip(view_id_from_number(custom_view_number)))
+
+
+# View numbers to offer in the view drop downs, every saved view plus at least the first 10 slots and a free one
+def get_view_number_choices(view_index):
+    return list(range(0, max(10, view_index.next_view_number() + 1)))
+
+
+# Saved views are re-read and the views list updated whenever a different document becomes active
+def on_document_activated(event_args: adsk.core.DocumentEventArgs):
+    invalidate_view_index(event_args.document)
+    invalidate_occurrence_index(event_args.document)
+    refresh_custom_views()
+
+
+# The closed document can no longer be queried for its id, so every index is dropped
+def on_document_closed(event_args: adsk.core.DocumentEventArgs):
+    clear_view_indexes()
+    clear_occurrence_indexes()
+
+
+# Number of occurrences in the active design, the model size performance samples are recorded against
+# Returns None if there is no design
+# Read from the application directly, so it does not show up in call counting reports
+def get_model_size():
+    design = adsk.fusion.Design.cast(adsk.core.Application.get().activeProduct)
+
+    if design is None:
+        return None
+
+    return design.rootComponent.allOccurrences.count
+
+
+document_events = {
+    'documentActivated': on_document_activated,
+    'documentSaving': on_document_saving,
+    'documentSaved': on_document_saved,
+    'documentClosed': on_document_closed
+}
+
+document_event_handlers = {}
+
+
+def start_document_events():
+    for event_name, execution_function in document_events.items():
+        document_event_handlers[event_name] = create_document_event(execution_function, event_name)
+
+
+def stop_document_events():
+    for event_name, on_document_event in document_event_handlers.items():
+        remove_document_event(on_document_event, event_name)
+
+    document_event_handlers.clear()
+
+
+# Map of entity token to (entity, appearance id) for everything that currently has an appearance applied
+@profiled()
+def get_current_appearances():
+    ao = scoped_app_objects()
+    current_appearances = {}
+
+    for appearance in ao.design.appearances:
+        appearance_id = appearance.id
+        for item in appearance.usedBy:
+            current_appearances[item.entityToken] = (item, appearance_id)
+
+    return current_appearances
+
+
+# Map of entity token to (entity, appearance id) for a saved view
+# Legacy views store a view name with one attribute per entity, entities are resolved here
+# Token views store a single compressed mapping, entities are left as None and resolved by set_appearances
+# Only the tokens of legacy views are read now
+def get_saved_appearances(appearances_object):
+    ao = scoped_app_objects()
+    saved_appearances = {}
 
+    if is_appearance_tokens(appearances_object):
+        for token, appearance_id in decode_appearance_tokens(appearances_object).items():
+            saved_appearances[token] = (None, appearance_id)
+
+    else:
+        attributes = ao.design.findAttributes("displayer_appearances", appearances_object)
         for attribute in attributes:
             item = attribute.parent
 
             if item is not None:
-                item.appearance = ao.design.appearances.itemById(attribute.value)
+                saved_appearances[item.entityToken] = (item, attribute.value)
+
+    return saved_appearances
+
+
+# Restore the appearances saved for a view
+# The token of the same entity can change, so saved tokens are never compared with current ones
+# Saved tokens are resolved with findEntityByToken, the resolved entities are matched to the current
+# appearances by the tokens both read during this restore
+# Only entities whose appearance differs from the saved one are written
+@profiled()
+def set_appearances(appearances_object):
+    ao = scoped_app_objects()
+    design = ao.design
+
+    saved_items = []
+
+    for token, (item, appearance_id) in get_saved_appearances(appearances_object).items():
+        if item is None:
+            entities = design.findEntityByToken(token)
+            if len(entities) == 0:
+                continue
+            item = entities[0]
+            token = item.entityToken
+
+        saved_items.append((token, item, appearance_id))
+
+    saved_tokens = set(token for token, item, appearance_id in saved_items)
+
+    current_appearances = get_current_appearances()
+
+    # Clear anything that did not have an appearance when the view was saved
+    for token, (item, appearance_id) in current_appearances.items():
+        if token not in saved_tokens:
+            item.appearance = None
+
+    # Appearance lookups are cached for the duration of the restore
+    appearance_cache = {}
+
+    for token, item, appearance_id in saved_items:
+        current = current_appearances.get(token)
+
+        if current is not None and current[1] == appearance_id:
+            continue
+
+        if appearance_id not in appearance_cache:
+            appearance_cache[appearance_id] = design.appearances.itemById(appearance_id)
+
+        item.appearance = appearance_cache[appearance_id]
+
+
+# Capture the current appearances as a single compressed entity token mapping
+@profiled()
+def build_appearance_tokens():
+    current_appearances = get_current_appearances()
+
+    appearance_tokens = {token: appearance_id for token, (item, appearance_id) in current_appearances.items()}
+
+    return encode_appearance_tokens(appearance_tokens)
 
 
 def build_appearances(view_name):
-    ao = AppObjects()
+    ao = scoped_app_objects()
     all_appearances = ao.design.appearances
     for appearance in all_appearances:
         used_by = appearance.usedBy
@@ -287,7 +826,7 @@ def build_appearances(view_name):
 
 
 def get_appearance_object(view_name):
-    ao = AppObjects()
+    ao = scoped_app_objects()
     attributes = ao.design.findAttributes("displayer_appearances", view_name)
 
     appearance_object = defaultdict(list)
@@ -311,11 +850,65 @@ def build_appearances_from_object(view_name, appearance_object):
             item.attributes.add("displayer_appearances", view_name, appearance_id)
 
 
+# Converts a view using per entity appearance attributes to a single token mapping in the view record
+# Returns True if the view was migrated
+def migrate_appearance_attributes(view_object):
+    appearances_view_name = view_object.get("appearances", None)
+
+    if appearances_view_name is None or is_appearance_tokens(appearances_view_name):
+        return False
+
+    appearance_object = get_appearance_object(appearances_view_name)
+
+    appearance_tokens = {}
+    for appearance_id, item_list in appearance_object.items():
+        for item in item_list:
+            appearance_tokens[item.entityToken] = appearance_id
+
+    view_object["appearances"] = encode_appearance_tokens(appearance_tokens)
+
+    ao = scoped_app_objects()
+    for attribute in ao.design.findAttributes("displayer_appearances", appearances_view_name):
+        attribute.deleteMe()
+
+    return True
+
+
+# Stores a captured view in its slot of document, the active document by default
+@profiled()
+def save_view(custom_view_name, view_object, document=None):
+    ao = scoped_app_objects()
+
+    if document is None:
+        document = ao.document
+
+    view_value = encode_document_view(view_object, document)
+    replaced = get_view_index(document).get_view_exists(custom_view_name)
+
+    document.attributes.add('displayer_custom_views', custom_view_name, view_value)
+
+    # Facets only the replaced view used are no longer needed
+    if replaced:
+        collect_unused_facets(document)
+
+    invalidate_view_index(document)
+
+    # The view commands show the views of the active document, another document refreshes them when activated
+    if ao.document is not None and ao.document.creationId == document.creationId:
+        enable_custom_view(view_number_from_id(custom_view_name), view_object['name'])
+
+
 # Create a new custom view
 class CaptureViewCommand(Fusion360CommandBase):
 
+    def __init__(self, cmd_def, debug):
+        super().__init__(cmd_def, debug)
+
+        # 'tokens' stores one compressed mapping in the view, 'attributes' adds an attribute to every entity
+        self.appearance_backend = cmd_def.get('appearance_backend', 'tokens')
+
     def on_execute(self, command: adsk.core.Command, inputs: adsk.core.CommandInputs, args, input_values):
-        ao = AppObjects()
+        ao = scoped_app_objects()
 
         view_object = {"name": input_values['view_name_id']}
 
@@ -324,49 +917,72 @@ class CaptureViewCommand(Fusion360CommandBase):
         if input_values["camera_input_checkbox"]:
             view_object["camera"] = build_camera_object()
 
-        if input_values["display_input_checkbox"]:
-            view_object["display_state"] = build_display_state_object()
-
         if input_values["visual_style_input_checkbox"]:
-            view_object["visual_style"] = ao.app.activeViewport.visualStyle
+            view_object["visual_style"] = ao.viewport.visualStyle
 
         if input_values["appearances_input_checkbox"]:
-            view_object["appearances"] = custom_view_name
-            build_appearances(custom_view_name)
+            if self.appearance_backend == 'attributes':
+                view_object["appearances"] = custom_view_name
+                build_appearances(custom_view_name)
+            else:
+                view_object["appearances"] = build_appearance_tokens()
 
         if input_values["parameters_input_checkbox"]:
             view_object["parameters"] = build_parameter_object(True)
 
-        json_string = json.dumps(view_object)
+        # The hide/show state is captured last, in slices for large assemblies, and the view saved when it is done
+        # The view is saved to the document the capture started in, even if another one is active by then
+        if input_values["display_input_checkbox"]:
+            document = ao.document
+            occurrence_index = get_occurrence_index()
+            scope_occurrences = [cast(adsk.fusion.Occurrence, entity)
+                                 for entity in input_values.get("display_scope_input", [])]
+
+            if len(scope_occurrences) > 0:
+                display_state_steps = iter_encode_scoped_display_state(scope_occurrences)
+                step_count = get_display_state_step_count(occurrence_index, scope_occurrences)
+            else:
+                display_state_steps = iter_encode_display_state(occurrence_index)
+                step_count = get_display_state_step_count(occurrence_index)
+
+            def on_display_state(display_state_object):
+                view_object["display_state"] = display_state_object
+                save_view(custom_view_name, view_object, document)
 
-        ao.document.attributes.add('displayer_custom_views', custom_view_name, json_string)
+            self.run_chunked(display_state_steps, step_count, 'Capturing hide/show state',
+                             on_display_state)
 
-        command_definition = ao.ui.commandDefinitions.itemById(
-            'cmdID_SetViewCommand_' + custom_view_name[-1:]
-        )
-        command_definition.tooltip = input_values['view_name_id']
-        command_definition.controlDefinition.isEnabled = True
+        else:
+            save_view(custom_view_name, view_object)
 
     def on_create(self, command: adsk.core.Command, inputs: adsk.core.CommandInputs):
-        ao = AppObjects()
+        ao = scoped_app_objects()
 
         inputs.addStringValueInput('view_name_id', "View Name: ", "My Custom View")
 
         drop_input = inputs.addDropDownCommandInput("view_names_input", "Which View to save?",
                                                     adsk.core.DropDownStyles.TextListDropDownStyle)
-        first = 0
-
-        for custom_view_number in range(0, 10):
-            view_name = "Custom View " + str(custom_view_number)
-            view_def = ao.document.attributes.itemByName('displayer_custom_views', view_name)
-            drop_input.listItems.add("Custom View " + str(custom_view_number), False)
-            if view_def is None and first == 0:
+        first = None
+        view_index = get_view_index()
+        view_number_choices = get_view_number_choices(view_index)
+
+        for custom_view_number in view_number_choices:
+            view_name = view_id_from_number(custom_view_number)
+            drop_input.listItems.add(view_name, False)
+            if not view_index.get_view_exists(view_name) and first is None:
                 first = custom_view_number
 
-        drop_input.listItems.item(first).isSelected = True
+        drop_input.listItems.item(view_number_choices.index(first)).isSelected = True
 
         inputs.addBoolValueInput("camera_input_checkbox", "Capture Camera?", True, '', True)
         inputs.addBoolValueInput("display_input_checkbox", "Capture Hide/Show State?", True, '', True)
+
+        scope_input = inputs.addSelectionInput("display_scope_input", "Hide/Show Scope",
+                                               "Only capture these occurrences and their children, "
+                                               "select none for the whole assembly")
+        scope_input.addSelectionFilter('Occurrences')
+        scope_input.setSelectionLimits(0, 0)
+
         inputs.addBoolValueInput("visual_style_input_checkbox", "Capture Visual Style?", True, '', True)
         inputs.addBoolValueInput("appearances_input_checkbox", "Capture Appearances?", True, '', False)
         inputs.addBoolValueInput("parameters_input_checkbox", "Capture Parameters?", True, '', False)
@@ -380,89 +996,109 @@ class SetViewCommand(Fusion360CommandBase):
 
         self.custom_view_number = cmd_def.get('custom_view_number', None)
 
+        # Restore hide/show states only below the occurrences selected when the view is set
+        self.restore_scope_from_selection = cmd_def.get('restore_scope_from_selection', False)
+
     # This is typically where your main program logic would go
     def on_execute(self, command: adsk.core.Command, inputs: adsk.core.CommandInputs, args, input_values):
-        ao = AppObjects()
+        ao = scoped_app_objects()
 
-        view_name = "Custom View " + str(self.custom_view_number)
-        view_def = ao.document.attributes.itemByName('displayer_custom_views', view_name)
+        view_object = get_view_index().get_view(view_id_from_number(self.custom_view_number))
 
-        if view_def is not None:
-            view_object = json.loads(view_def.value)
+        if view_object is not None:
             camera_object = view_object.get("camera", None)
             display_state_object = view_object.get("display_state", None)
             visual_style = view_object.get("visual_style", None)
-            appearances_view_name = view_object.get("appearances", None)
+            appearances_object = view_object.get("appearances", None)
             parameters_object = view_object.get("parameters", None)
 
             if camera_object is not None:
                 set_camera(camera_object)
 
-            if display_state_object is not None:
-                set_display_state(display_state_object)
-
             if visual_style is not None:
-                ao.app.activeViewport.visualStyle = visual_style
+                ao.viewport.visualStyle = visual_style
 
-            if appearances_view_name is not None:
-                set_appearances(appearances_view_name)
+            if appearances_object is not None:
+                set_appearances(appearances_object)
 
             if parameters_object is not None:
-                set_parameters(parameters_object)
+                parameters_result = set_parameters(parameters_object, batched=True)
+
+                if parameters_result:
+                    self.debug_message(
+                        'Parameters restored: {} changed, '
+                        'collect: {:.3f} s, order: {:.3f} s, apply and compute: {:.3f} s'.format(
+                            parameters_result["changed"], parameters_result["collect"], parameters_result["order"],
+                            parameters_result["apply"]))
+
+            # Restored after the parameters, which can add or remove occurrences, in slices for large assemblies
+            if display_state_object is not None:
+                scope_occurrences = None
+
+                if self.restore_scope_from_selection:
+                    scope_occurrences = get_selected_occurrences()
+
+                occurrence_index = get_occurrence_index()
+
+                self.run_chunked(iter_set_display_state(display_state_object, diff_only=True,
+                                                        scope_occurrences=scope_occurrences,
+                                                        occurrence_index=occurrence_index),
+                                 get_display_state_step_count(occurrence_index, scope_occurrences,
+                                                              display_state_object),
+                                 'Restoring hide/show state',
+                                 self.on_display_state_restored)
+
+    def on_display_state_restored(self, display_state_result):
+        if display_state_result is not None:
+            self.debug_message('Display state restored: {} written, {} skipped'.format(
+                display_state_result["written"], display_state_result["skipped"]))
 
     @staticmethod
     def get_tooltip(custom_view_number):
-        ao = AppObjects()
-        view_object_attribute = None
+        view_index = get_view_index()
 
-        if ao.document is not None:
-            view_object_attribute = ao.document.attributes.itemByName(
-                'displayer_custom_views',
-                "Custom View " + str(custom_view_number)
-            )
+        if view_index is None:
+            return DEFAULT_TOOLTIP
 
-        if view_object_attribute is not None:
-            tooltip = json.loads(view_object_attribute.value)["name"]
-        else:
-            tooltip = 'This View has not been set'
-
-        return tooltip
+        return view_index.get_tooltip(view_id_from_number(custom_view_number))
 
     @staticmethod
     def get_view_exists(custom_view_number):
-        ao = AppObjects()
-        view_object_attribute = None
-
-        if ao.document is not None:
-            view_object_attribute = ao.document.attributes.itemByName(
-                'displayer_custom_views',
-                "Custom View " + str(custom_view_number)
-            )
-        if view_object_attribute is not None:
-            exists = True
-        else:
-            exists = False
+        view_index = get_view_index()
+
+        if view_index is None:
+            return False
 
-        return exists
+        return view_index.get_view_exists(view_id_from_number(custom_view_number))
 
 
 # Manage the custom views in this model
 class ManageViewsCommand(Fusion360CommandBase):
 
+    def __init__(self, cmd_def, debug):
+        super().__init__(cmd_def, debug)
+
+        # With the 'tokens' backend legacy per entity appearance attributes are migrated into the view
+        self.appearance_backend = cmd_def.get('appearance_backend', 'tokens')
+
     def on_execute(self, command: adsk.core.Command, inputs: adsk.core.CommandInputs, args, input_values):
-        ao = AppObjects()
+        ao = scoped_app_objects()
         view_object_attributes = ao.document.attributes.itemsByGroup('displayer_custom_views')
         saved_views = {}
 
         appearance_views = {}
 
         for view_object_attribute in view_object_attributes:
-            view_object = json.loads(view_object_attribute.value)
+            view_object = decode_document_view(view_object_attribute.value)
             saved_views[view_object["name"]] = view_object
-            if view_object.get("appearances", None) is not None:
+            appearance_views[view_object["name"]] = None
+
+            if self.appearance_backend == 'tokens':
+                migrate_appearance_attributes(view_object)
+
+            elif view_object.get("appearances", None) is not None and \
+                    not is_appearance_tokens(view_object["appearances"]):
                 appearance_views[view_object["name"]] = get_appearance_object(view_object["appearances"])
-            else:
-                appearance_views[view_object["name"]] = None
         delete_view_attributes()
         delete_tooltips()
         delete_appearance_attributes()
@@ -473,33 +1109,36 @@ class ManageViewsCommand(Fusion360CommandBase):
             view_name = cmd_input.selectedItem.name
 
             if not cmd_input.selectedItem.name == "**Delete This View**":
-                ao.document.attributes.add('displayer_custom_views', view_name,
-                                           json.dumps(view_object)
-                                           )
                 if appearance_object is not None:
+                    view_object["appearances"] = view_name
                     build_appearances_from_object(view_name, appearance_object)
 
-                command_defintion = ao.ui.commandDefinitions.itemById(
-                    'cmdID_SetViewCommand_' + view_name[-1:]
-                )
+                ao.document.attributes.add('displayer_custom_views', view_name,
+                                           encode_document_view(view_object)
+                                           )
+
+                enable_custom_view(view_number_from_id(view_name), view_object["name"])
 
-                command_defintion.tooltip = view_object["name"]
-                command_defintion.controlDefinition.isEnabled = True
+        collect_unused_facets()
+        invalidate_view_index()
 
     def on_create(self, command: adsk.core.Command, inputs: adsk.core.CommandInputs):
-        ao = AppObjects()
+        ao = scoped_app_objects()
 
-        view_object_attributes = ao.document.attributes.itemsByGroup('displayer_custom_views')
+        view_index = get_view_index()
 
-        if len(view_object_attributes) > 0:
+        if len(view_index.views) > 0:
+            view_number_choices = get_view_number_choices(view_index)
 
-            for view_object_attribute in view_object_attributes:
-                view_object = json.loads(view_object_attribute.value)
+            for view_id, view_object in view_index.views.items():
                 drop_input = inputs.addDropDownCommandInput("view_names_input_", view_object["name"],
                                                             adsk.core.DropDownStyles.TextListDropDownStyle)
-                for custom_view_number in range(0, 10):
-                    drop_input.listItems.add("Custom View " + str(custom_view_number), False)
-                drop_input.listItems.item(int(view_object_attribute.name[-1:])).isSelected = True
+                for custom_view_number in view_number_choices:
+                    drop_input.listItems.add(view_id_from_number(custom_view_number), False)
+
+                view_number = view_number_from_id(view_id)
+                if view_number is not None:
+                    drop_input.listItems.item(view_number_choices.index(view_number)).isSelected = True
                 drop_input.listItems.add("**Delete This View**", False)
         else:
             ao.ui.messageBox("No views have been saved")
@@ -510,6 +1149,7 @@ class DeleteAllViewsCommand(Fusion360CommandBase):
 
     def on_execute(self, command: adsk.core.Command, inputs: adsk.core.CommandInputs, args, input_values):
         delete_view_attributes()
+        collect_unused_facets()
         delete_tooltips()
         delete_appearance_attributes()
 
@@ -524,32 +1164,21 @@ class DeleteAllViewsCommand(Fusion360CommandBase):
 class ExportAllViewsCommand(Fusion360CommandBase):
 
     def on_execute(self, command: adsk.core.Command, inputs: adsk.core.CommandInputs, args, input_values):
-        ao = AppObjects()
-
-        view_object_attributes = ao.document.attributes.itemsByGroup('displayer_custom_views')
+        ao = scoped_app_objects()
 
-        all_views = {}
-
-        if view_object_attributes is not None:
-
-            for view_object_attribute in view_object_attributes:
-                view_object = json.loads(view_object_attribute.value)
-
-        for custom_view_number in range(0, 10):
-            view_object = get_view_from_number(custom_view_number)
-            if view_object is not None:
-                all_views["Custom View " + str(custom_view_number)] = view_object
-
-        all_views_text = json.dumps(all_views)
         directory = input_values["export_dir_input"]
 
         if not os.path.exists(directory):
             os.makedirs(directory)
 
-        file_name = os.path.join(directory, input_values["export_file_input"] + ".json")
-        f = open(file_name, "w")
-        f.write(all_views_text)
-        f.close()
+        file_name = os.path.join(directory, input_values["export_file_input"] + ".jsonl")
+
+        start_time = time.perf_counter()
+        record_count, byte_count = write_json_lines(file_name, iter_export_records())
+        elapsed_time = time.perf_counter() - start_time
+
+        ao.ui.messageBox('Exported {} records, {:,} bytes in {:.2f} s to:\n{}'.format(
+            record_count, byte_count, elapsed_time, file_name))
 
         settings = {
             "app_name": "Displayer",
@@ -559,7 +1188,7 @@ class ExportAllViewsCommand(Fusion360CommandBase):
         write_settings("Displayer", settings)
 
     def on_create(self, command: adsk.core.Command, inputs: adsk.core.CommandInputs):
-        ao = AppObjects()
+        ao = scoped_app_objects()
 
         app_name = "Displayer"
         settings = read_settings(app_name)
@@ -575,7 +1204,7 @@ class ExportAllViewsCommand(Fusion360CommandBase):
 class ImportViewsCommand(Fusion360CommandBase):
 
     def on_execute(self, command: adsk.core.Command, inputs: adsk.core.CommandInputs, args, input_values):
-        ao = AppObjects()
+        ao = scoped_app_objects()
         app_name = "Displayer"
 
         settings = read_settings(app_name)
@@ -588,8 +1217,7 @@ class ImportViewsCommand(Fusion360CommandBase):
 
         file_dialog = ao.ui.createFileDialog()
 
-        # file_dialog.initialDirectory = default_dir
-        file_dialog.initialDirectory = "/Users/rainsbp/Dropbox/test_test_23"
+        file_dialog.initialDirectory = default_dir
 
         file_dialog.isMultiSelectEnabled = False
 
@@ -603,19 +1231,20 @@ class ImportViewsCommand(Fusion360CommandBase):
             file_name = file_dialog.filename
         else:
             return
-        with open(file_name) as f:
-            all_views = json.load(f)
+        with open(file_name, encoding='utf-8') as f:
+            summary = import_view_records(iter_import_records(f))
 
-        for view_name, view_object in all_views.items():
-            ao.document.attributes.add('displayer_custom_views', view_name,
-                                       json.dumps(view_object))
+        for view_name, view_display_name in summary['views'].items():
+            enable_custom_view(view_number_from_id(view_name), view_display_name)
 
-            command_defintion = ao.ui.commandDefinitions.itemById(
-                'cmdID_SetViewCommand_' + view_name[-1:]
-            )
+        # Facets of views replaced by the import may no longer be needed
+        if summary['updated'] > 0:
+            collect_unused_facets()
 
-            command_defintion.tooltip = view_object["name"]
-            command_defintion.controlDefinition.isEnabled = True
+        invalidate_view_index()
+
+        ao.ui.messageBox('Imported views: {} added, {} updated, {} skipped'.format(
+            summary['added'], summary['updated'], summary['skipped']))
 
     def on_create(self, command: adsk.core.Command, inputs: adsk.core.CommandInputs):
         inputs.addTextBoxCommandInput("import_text_input", "",
@@ -627,12 +1256,59 @@ class ImportViewsCommand(Fusion360CommandBase):
 
 class RefreshViewsCommand(Fusion360CommandBase):
     def on_execute(self, command: adsk.core.Command, inputs: adsk.core.CommandInputs, args, input_values):
-        refresh_custom_views()
+        refresh_custom_views(rebuild=True)
+
+        if self.debug:
+            view_cache_stats = get_view_cache_stats()
+            self.debug_message('View cache: {} hits, {} misses, {} documents'.format(
+                view_cache_stats['hits'], view_cache_stats['misses'], view_cache_stats['documents']))
+
+            # Command timings of every command so far, see Fusion360CommandTiming
+            timings_file_name = get_log_file_name('CommandTimings', '.json')
+            dump_command_timings(timings_file_name)
+            self.debug_message('Command timings written to {}:\n{}'.format(
+                timings_file_name, format_command_timing_stats()))
+
+            if is_profiler_enabled():
+                profile_message()
+
+
+# Compare the performance history of this version of the add-in against the stored baseline
+class PerfReportCommand(Fusion360CommandBase):
+    def on_execute(self, command: adsk.core.Command, inputs: adsk.core.CommandInputs, args, input_values):
+        ao = scoped_app_objects()
+
+        if not is_perf_history_enabled():
+            ao.ui.messageBox('Performance history is not enabled, set perf_history = True in FusionDisplayer.py')
+            return
+
+        baseline = load_perf_baseline()
+
+        if baseline is None or input_values['save_baseline_input']:
+            key_count = save_perf_baseline()
+            ao.ui.messageBox('Baseline saved for {} commands and model sizes'.format(key_count))
+            return
+
+        regressions = find_regressions(baseline, input_values['threshold_input'])
+        write_text_commands(format_perf_report(baseline, regressions))
+
+        if len(regressions) > 0:
+            ao.ui.messageBox('{} regressions found, slowest {} {} at {:.1f} x the baseline p95\n'
+                             'See the Text Commands palette for the full report'.format(
+                                len(regressions), regressions[0]['cmd'], regressions[0]['metric'],
+                                regressions[0]['ratio']))
+        else:
+            ao.ui.messageBox('No regressions against the baseline of version {}'.format(baseline.get('version', '')))
+
+    def on_create(self, command: adsk.core.Command, inputs: adsk.core.CommandInputs):
+        inputs.addValueInput('threshold_input', 'Regression threshold (p95 ratio)', '',
+                             adsk.core.ValueInput.createByReal(1.2))
+        inputs.addBoolValueInput('save_baseline_input', 'Save current performance as baseline?', True, '', False)
 
 
 class NormalToCommand(Fusion360CommandBase):
     def on_execute(self, command: adsk.core.Command, inputs: adsk.core.CommandInputs, args, input_values):
-        ao = AppObjects()
+        ao = scoped_app_objects()
 
         active_object = ao.design.activeEditObject
 
@@ -668,11 +1344,11 @@ class NormalToCommand(Fusion360CommandBase):
 
 class NormalToSketchCommand(Fusion360CommandBase):
     def on_execute(self, command: adsk.core.Command, inputs: adsk.core.CommandInputs, args, input_values):
-        ao = AppObjects()
-        ao.app.activeViewport.refresh()
+        ao = scoped_app_objects()
+        ao.viewport.refresh()
         selections = ao.ui.activeSelections
         selections.clear()
-        ao.app.activeViewport.fit()
+        ao.viewport.fit()
         ao.ui.terminateActiveCommand()
         selections = ao.ui.activeSelections
         selections.clear()
@@ -0,0 +1,167 @@
+# Storage format for the saved view attributes
+# Pure python, no Fusion 360 API access, so it can be used outside of Fusion as well
+import base64
+import json
+import zlib
+from collections.abc import MutableMapping
+
+# Attribute values in this format start with 'DSPV<version>:' followed by a small JSON envelope
+# The view name is stored as plain text, every other key (camera, display_state, etc.) is a facet
+# Each facet is compressed separately so it can be decoded only when it is used
+# Version 2 moves facets larger than INLINE_FACET_SIZE out of the envelope, the envelope keeps a reference
+# that is resolved with a load_facet function only when the facet is read
+# Attributes written before this format are plain JSON and start with '{'
+PAYLOAD_PREFIX = 'DSPV'
+PAYLOAD_VERSION = 2
+PAYLOAD_HEADER = PAYLOAD_PREFIX + str(PAYLOAD_VERSION) + ':'
+
+# Encoded facets up to this many characters stay in the envelope
+INLINE_FACET_SIZE = 256
+
+
+def is_encoded_view(value: str) -> bool:
+    return value.startswith(PAYLOAD_PREFIX)
+
+
+# Returns 0 for the legacy plain JSON format
+def get_payload_version(value: str) -> int:
+    if not is_encoded_view(value):
+        return 0
+
+    return int(value[len(PAYLOAD_PREFIX):value.index(':')])
+
+
+def encode_facet(facet_value) -> str:
+    json_bytes = json.dumps(facet_value, separators=(',', ':')).encode('utf-8')
+    return base64.b64encode(zlib.compress(json_bytes)).decode('ascii')
+
+
+def decode_facet(encoded_facet: str):
+    json_bytes = zlib.decompress(base64.b64decode(encoded_facet))
+    return json.loads(json_bytes.decode('utf-8'))
+
+
+# A saved view that loads and decodes its facets the first time they are read
+# Behaves like the view dictionary, use to_dict() where a real dict is needed (json.dumps)
+class LazyView(MutableMapping):
+
+    def __init__(self, name, encoded_facets=None, decoded_facets=None, facet_refs=None, load_facet=None):
+        self.name = name
+        self.encoded_facets = dict(encoded_facets or {})
+        self.decoded_facets = dict(decoded_facets or {})
+        self.facet_refs = dict(facet_refs or {})
+        self.load_facet = load_facet
+
+    def __getitem__(self, key):
+        if key == 'name':
+            return self.name
+
+        if key not in self.decoded_facets:
+            if key not in self.encoded_facets:
+                if key not in self.facet_refs or self.load_facet is None:
+                    raise KeyError(key)
+
+                encoded_facet = self.load_facet(self.facet_refs[key])
+                if encoded_facet is None:
+                    raise KeyError(key)
+
+                self.encoded_facets[key] = encoded_facet
+
+            self.decoded_facets[key] = decode_facet(self.encoded_facets[key])
+
+        return self.decoded_facets[key]
+
+    def __setitem__(self, key, value):
+        if key == 'name':
+            self.name = value
+        else:
+            self.decoded_facets[key] = value
+            self.encoded_facets.pop(key, None)
+            self.facet_refs.pop(key, None)
+
+    def __delitem__(self, key):
+        if key == 'name' or key not in self:
+            raise KeyError(key)
+
+        self.encoded_facets.pop(key, None)
+        self.decoded_facets.pop(key, None)
+        self.facet_refs.pop(key, None)
+
+    def __iter__(self):
+        yield 'name'
+        for key in self.facet_names():
+            yield key
+
+    def __len__(self):
+        return 1 + len(self.facet_names())
+
+    def __contains__(self, key):
+        return key == 'name' or key in self.encoded_facets or key in self.decoded_facets or key in self.facet_refs
+
+    def facet_names(self):
+        facet_names = list(self.decoded_facets)
+        for facets in [self.encoded_facets, self.facet_refs]:
+            for key in facets:
+                if key not in facet_names:
+                    facet_names.append(key)
+        return facet_names
+
+    def to_dict(self) -> dict:
+        return {key: self[key] for key in self}
+
+
+# Encodes a view dictionary or LazyView into an attribute value
+# store_facet(encoded_facet) stores a large facet outside of the envelope and returns its reference
+# Without store_facet every facet is kept in the envelope
+# Facets of a LazyView that were never loaded are copied without loading or decoding them
+def encode_view(view_object, store_facet=None) -> str:
+    facets = {}
+    facet_refs = {}
+
+    for key in view_object:
+        if key == 'name':
+            continue
+
+        if isinstance(view_object, LazyView) and key not in view_object.decoded_facets:
+            if key in view_object.encoded_facets:
+                encoded_facet = view_object.encoded_facets[key]
+            elif store_facet is not None:
+                facet_refs[key] = view_object.facet_refs[key]
+                continue
+            else:
+                encoded_facet = view_object.load_facet(view_object.facet_refs[key])
+        else:
+            encoded_facet = encode_facet(view_object[key])
+
+        if store_facet is not None and len(encoded_facet) > INLINE_FACET_SIZE:
+            facet_refs[key] = store_facet(encoded_facet)
+        else:
+            facets[key] = encoded_facet
+
+    envelope = {
+        'name': view_object['name'],
+        'facets': facets
+    }
+
+    if len(facet_refs) > 0:
+        envelope['refs'] = facet_refs
+
+    return PAYLOAD_HEADER + json.dumps(envelope, separators=(',', ':'))
+
+
+# Decodes an attribute value in either the current or the legacy plain JSON format
+# load_facet(reference) returns an encoded facet stored outside of the envelope, or None if it is missing
+def decode_view(value: str, load_facet=None) -> LazyView:
+    version = get_payload_version(value)
+
+    if version == 0:
+        view_object = json.loads(value)
+        name = view_object.pop('name')
+        return LazyView(name, decoded_facets=view_object)
+
+    if version > PAYLOAD_VERSION:
+        raise ValueError('Unsupported view payload version: {}'.format(version))
+
+    envelope = json.loads(value.split(':', 1)[1])
+    return LazyView(envelope['name'], encoded_facets=envelope['facets'], facet_refs=envelope.get('refs', None),
+                    load_facet=load_facet)
@@ -0,0 +1,415 @@
+import adsk.core
+import adsk.fusion
+
+import hashlib
+import json
+from typing import Optional
+
+from .Fusion360Utilities.Fusion360Utilities import iter_json_lines, iter_json_object_items, scoped_app_objects
+from .Fusion360Utilities.Fusion360Profiler import span
+from .ViewPayload import LazyView, encode_view, decode_view, get_payload_version, PAYLOAD_VERSION
+
+# Attribute group on the document that holds the saved views
+VIEW_ATTRIBUTE_GROUP = 'displayer_custom_views'
+
+# Attribute group for large view facets, named by the hash of their content so views can share them
+FACET_ATTRIBUTE_GROUP = 'displayer_view_facets'
+
+DEFAULT_TOOLTIP = 'This View has not been set'
+
+# Saved views are identified by 'Custom View <number>', the number is also the id of its command
+VIEW_ID_PREFIX = 'Custom View '
+
+# Export files with the views as stored in the document and each facet once, see iter_export_records
+# Version 2 files are a single JSON object, version 3 files have one JSON record per line
+EXPORT_FORMAT_KEY = 'displayer_export'
+EXPORT_FORMAT_VERSION = 3
+
+# View indexes built so far, keyed by document creation id
+_view_indexes = {}
+
+# Number of get_view_index calls answered from memory and that had to read the document
+view_cache_stats = {
+    'hits': 0,
+    'misses': 0
+}
+
+
+# Returns the active document without raising if there is none
+def get_active_document() -> Optional[adsk.core.Document]:
+    app = scoped_app_objects().app
+    document = None
+    try:
+        document = app.activeDocument
+    except:
+        pass
+
+    return document
+
+
+def get_facet_ref(encoded_facet: str) -> str:
+    return hashlib.sha1(encoded_facet.encode('ascii')).hexdigest()
+
+
+# Stores an encoded facet on the document once and returns its reference
+def store_facet(document: adsk.core.Document, encoded_facet: str) -> str:
+    facet_ref = get_facet_ref(encoded_facet)
+
+    if document.attributes.itemByName(FACET_ATTRIBUTE_GROUP, facet_ref) is None:
+        document.attributes.add(FACET_ATTRIBUTE_GROUP, facet_ref, encoded_facet)
+
+    return facet_ref
+
+
+def load_facet(document: adsk.core.Document, facet_ref: str) -> Optional[str]:
+    facet_attribute = document.attributes.itemByName(FACET_ATTRIBUTE_GROUP, facet_ref)
+
+    if facet_attribute is None:
+        return None
+
+    return facet_attribute.value
+
+
+# Encodes a view for an attribute of the document, large facets are stored in their own attributes
+def encode_document_view(view_object, document=None) -> str:
+    if document is None:
+        document = get_active_document()
+
+    return encode_view(view_object, lambda encoded_facet: store_facet(document, encoded_facet))
+
+
+# Decodes a view attribute value, facets stored in their own attributes are only read when they are used
+def decode_document_view(value: str, document=None) -> LazyView:
+    if document is None:
+        document = get_active_document()
+
+    return decode_view(value, lambda facet_ref: load_facet(document, facet_ref))
+
+
+# Number of saved views referencing each facet, read from the view envelopes without loading any facet
+def get_facet_ref_counts(document=None) -> dict:
+    if document is None:
+        document = get_active_document()
+
+    facet_ref_counts = {}
+
+    for view_object_attribute in document.attributes.itemsByGroup(VIEW_ATTRIBUTE_GROUP):
+        view_object = decode_view(view_object_attribute.value)
+
+        for facet_ref in view_object.facet_refs.values():
+            facet_ref_counts[facet_ref] = facet_ref_counts.get(facet_ref, 0) + 1
+
+    return facet_ref_counts
+
+
+# Deletes facets no saved view references any more
+# Returns the number of facets deleted
+def collect_unused_facets(document=None) -> int:
+    if document is None:
+        document = get_active_document()
+
+    facet_ref_counts = get_facet_ref_counts(document)
+    deleted = 0
+
+    for facet_attribute in document.attributes.itemsByGroup(FACET_ATTRIBUTE_GROUP):
+        if facet_ref_counts.get(facet_attribute.name, 0) == 0:
+            facet_attribute.deleteMe()
+            deleted += 1
+
+    return deleted
+
+
+# Records of an export file for Fusion360Utilities.write_json_lines, produced one view at a time
+# The first record is the header, then each view follows the facets it references that were not written yet,
+# so every facet is written once however many views share it
+# Views are kept in their stored form, only views in the legacy format are encoded
+def iter_export_records(document=None):
+    if document is None:
+        document = get_active_document()
+
+    yield {EXPORT_FORMAT_KEY: EXPORT_FORMAT_VERSION}
+
+    exported_facet_refs = set()
+
+    for view_object_attribute in document.attributes.itemsByGroup(VIEW_ATTRIBUTE_GROUP):
+        value = view_object_attribute.value
+        facets = {}
+
+        if get_payload_version(value) < PAYLOAD_VERSION:
+            def export_facet(encoded_facet):
+                facet_ref = get_facet_ref(encoded_facet)
+                facets[facet_ref] = encoded_facet
+                return facet_ref
+
+            value = encode_view(decode_document_view(value, document), export_facet)
+
+        for facet_ref in decode_view(value).facet_refs.values():
+            if facet_ref not in exported_facet_refs and facet_ref not in facets:
+                encoded_facet = load_facet(document, facet_ref)
+                if encoded_facet is not None:
+                    facets[facet_ref] = encoded_facet
+
+        for facet_ref, encoded_facet in facets.items():
+            if facet_ref not in exported_facet_refs:
+                exported_facet_refs.add(facet_ref)
+                yield {'facet': facet_ref, 'value': encoded_facet}
+
+        yield {'view': view_object_attribute.name, 'value': value}
+
+
+# Reads the records of an export file of any version one at a time, in the form written by iter_export_records
+# Views of the original {id: view} format are returned as {'view': id, 'view_object': view dictionary}
+def iter_import_records(f):
+    prefix = f.read(4096)
+    f.seek(0)
+
+    header = None
+    if '\n' in prefix:
+        try:
+            header = json.loads(prefix[:prefix.index('\n')])
+        except ValueError:
+            pass
+
+    if isinstance(header, dict) and header.get(EXPORT_FORMAT_KEY, 0) >= 3:
+        if header[EXPORT_FORMAT_KEY] > EXPORT_FORMAT_VERSION:
+            raise ValueError('Unsupported export version: {}'.format(header[EXPORT_FORMAT_KEY]))
+
+        for record in iter_json_lines(f):
+            if EXPORT_FORMAT_KEY not in record:
+                yield record
+        return
+
+    for key, value in iter_json_object_items(f):
+        if key == EXPORT_FORMAT_KEY:
+            continue
+
+        # Version 2 files, a single object with every facet and view
+        elif key == 'facets':
+            for facet_ref, encoded_facet in value.items():
+                yield {'facet': facet_ref, 'value': encoded_facet}
+        elif key == 'views':
+            for view_id, view_value in value.items():
+                yield {'view': view_id, 'value': view_value}
+
+        else:
+            yield {'view': key, 'view_object': value}
+
+
+def get_view_value_hash(value: str) -> str:
+    return hashlib.sha1(value.encode('utf-8')).hexdigest()
+
+
+# Adds the views of export records (see iter_import_records) to a document
+# Views whose content hash matches the view with the same id in the document are skipped without writing to it
+# Facets are only written for the views that are added or updated and are not already in the document
+# Returns the view id and name of each view written and the number of views added, updated and skipped
+def import_view_records(records, document=None) -> dict:
+    if document is None:
+        document = get_active_document()
+
+    existing_view_hashes = {}
+    for view_object_attribute in document.attributes.itemsByGroup(VIEW_ATTRIBUTE_GROUP):
+        existing_view_hashes[view_object_attribute.name] = get_view_value_hash(view_object_attribute.value)
+
+    # Facets from the file that are not in the document yet, kept until a view needs them
+    pending_facets = {}
+
+    summary = {
+        'views': {},
+        'added': 0,
+        'updated': 0,
+        'skipped': 0
+    }
+
+    for record in records:
+        if 'facet' in record:
+            facet_ref = record['facet']
+            if document.attributes.itemByName(FACET_ATTRIBUTE_GROUP, facet_ref) is None:
+                pending_facets[facet_ref] = record['value']
+            continue
+
+        if 'view' not in record:
+            continue
+
+        view_id = record['view']
+
+        if 'view_object' in record:
+            def import_facet(encoded_facet):
+                facet_ref = get_facet_ref(encoded_facet)
+                if facet_ref not in pending_facets and \
+                        document.attributes.itemByName(FACET_ATTRIBUTE_GROUP, facet_ref) is None:
+                    pending_facets[facet_ref] = encoded_facet
+                return facet_ref
+
+            value = encode_view(record['view_object'], import_facet)
+        else:
+            value = record['value']
+
+        existing_view_hash = existing_view_hashes.get(view_id, None)
+
+        if existing_view_hash == get_view_value_hash(value):
+            summary['skipped'] += 1
+            continue
+
+        view_object = decode_view(value)
+
+        for facet_ref in view_object.facet_refs.values():
+            encoded_facet = pending_facets.pop(facet_ref, None)
+            if encoded_facet is not None:
+                document.attributes.add(FACET_ATTRIBUTE_GROUP, facet_ref, encoded_facet)
+
+        document.attributes.add(VIEW_ATTRIBUTE_GROUP, view_id, value)
+        summary['views'][view_id] = view_object.name
+
+        if existing_view_hash is None:
+            summary['added'] += 1
+        else:
+            summary['updated'] += 1
+
+    return summary
+
+
+def view_id_from_number(view_number) -> str:
+    return VIEW_ID_PREFIX + str(view_number)
+
+
+# Returns None for ids that are not in the 'Custom View <number>' form
+def view_number_from_id(view_id) -> Optional[int]:
+    if not view_id.startswith(VIEW_ID_PREFIX):
+        return None
+
+    try:
+        return int(view_id[len(VIEW_ID_PREFIX):])
+    except ValueError:
+        return None
+
+
+# Registry of the views saved in a document, built with a single pass over its attributes
+# Views can be looked up by id (the attribute name) or by the name the user gave them
+# Views are LazyView objects, a facet is only decoded when it is first read
+# View objects are shared between callers and must not be modified
+class ViewIndex(object):
+
+    def __init__(self, document: adsk.core.Document):
+        self.views = {}
+        self.view_ids_by_name = {}
+
+        for view_object_attribute in document.attributes.itemsByGroup(VIEW_ATTRIBUTE_GROUP):
+            view_object = decode_document_view(view_object_attribute.value, document)
+            self.views[view_object_attribute.name] = view_object
+            self.view_ids_by_name[view_object["name"]] = view_object_attribute.name
+
+    def get_view(self, view_name) -> Optional[LazyView]:
+        return self.views.get(view_name, None)
+
+    def get_view_by_name(self, name) -> Optional[LazyView]:
+        view_id = self.view_ids_by_name.get(name, None)
+
+        if view_id is None:
+            return None
+
+        return self.views[view_id]
+
+    def get_view_id(self, name) -> Optional[str]:
+        return self.view_ids_by_name.get(name, None)
+
+    # Numbers of the saved views in ascending order
+    def view_numbers(self):
+        view_numbers = []
+        for view_id in self.views:
+            view_number = view_number_from_id(view_id)
+            if view_number is not None:
+                view_numbers.append(view_number)
+
+        return sorted(view_numbers)
+
+    # One more than the highest view number in use
+    def next_view_number(self):
+        view_numbers = self.view_numbers()
+
+        if len(view_numbers) == 0:
+            return 0
+
+        return view_numbers[-1] + 1
+
+    def get_tooltip(self, view_name):
+        view_object = self.views.get(view_name, None)
+
+        if view_object is None:
+            return DEFAULT_TOOLTIP
+
+        return view_object["name"]
+
+    def get_view_exists(self, view_name):
+        return view_name in self.views
+
+
+# Returns the view index for a document, building it the first time it is requested
+# Returns None if there is no document
+def get_view_index(document=None) -> Optional[ViewIndex]:
+    if document is None:
+        document = get_active_document()
+
+    if document is None:
+        return None
+
+    key = document.creationId
+    view_index = _view_indexes.get(key)
+
+    if view_index is None:
+        view_cache_stats['misses'] += 1
+        with span('build view index'):
+            view_index = ViewIndex(document)
+        _view_indexes[key] = view_index
+    else:
+        view_cache_stats['hits'] += 1
+
+    return view_index
+
+
+# Call after changing the saved views of a document so the index is rebuilt on next use
+def invalidate_view_index(document=None):
+    if document is None:
+        document = get_active_document()
+
+    if document is not None:
+        _view_indexes.pop(document.creationId, None)
+
+
+def clear_view_indexes():
+    _view_indexes.clear()
+
+
+def get_view_cache_stats() -> dict:
+    view_cache_stats_ = dict(view_cache_stats)
+    view_cache_stats_['documents'] = len(_view_indexes)
+    return view_cache_stats_
+
+
+# Document event callbacks, connected with Fusion360CommandBase.create_document_event
+
+# Rewrites views saved in the legacy plain JSON format or an older payload version in the current format
+# Returns the number of views upgraded
+def upgrade_view_attributes(document: adsk.core.Document):
+    upgraded = 0
+
+    for view_object_attribute in document.attributes.itemsByGroup(VIEW_ATTRIBUTE_GROUP):
+        value = view_object_attribute.value
+
+        if get_payload_version(value) < PAYLOAD_VERSION:
+            view_object_attribute.value = encode_document_view(decode_document_view(value, document), document)
+            upgraded += 1
+
+    return upgraded
+
+
+# Legacy views are upgraded as part of a save, so opening a document does not modify it
+def on_document_saving(event_args: adsk.core.DocumentEventArgs):
+    document = event_args.document
+
+    if document is not None and upgrade_view_attributes(document) > 0:
+        invalidate_view_index(document)
+
+
+def on_document_saved(event_args: adsk.core.DocumentEventArgs):
+    invalidate_view_index(event_args.document)
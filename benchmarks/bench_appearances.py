@@ -0,0 +1,78 @@
+# Compares the two appearance capture backends, one attribute per entity and one token mapping per view
+#     python benchmarks/bench_appearances.py --scales 100 1000 10000 --latency-us 10 --changed-percent 1
+# Every occurrence gets an appearance, a percent of them is changed before each restore
+import argparse
+
+import bench_common
+from bench_common import fusion_standin
+
+SaveViewCommand = fusion_standin.load_addin_module('SaveViewCommand')
+Fusion360Utilities = fusion_standin.load_addin_module('Fusion360Utilities.Fusion360Utilities')
+
+VIEW_NAME = 'displayer_benchmark'
+
+APPEARANCE_COUNT = 10
+
+
+def measure_scoped(latency, function, *args):
+    with Fusion360Utilities.AppObjectsScope():
+        return bench_common.measure(latency, function, *args)
+
+
+def run_scale(scale, changed_percent, latency):
+    fusion_standin.reset()
+    design = fusion_standin.new_design()
+    fusion_standin.build_assembly(design, scale)
+    appearances = fusion_standin.add_appearances(design, APPEARANCE_COUNT)
+
+    occurrences = list(design.rootComponent.allOccurrences)
+    for i, occurrence in enumerate(occurrences):
+        occurrence.appearance = appearances[i % len(appearances)]
+
+    changed_occurrences = occurrences[::max(1, int(100 / changed_percent))]
+
+    rows = []
+
+    for backend in ['attributes', 'tokens']:
+        if backend == 'attributes':
+            capture_time, capture_calls, result = measure_scoped(latency, SaveViewCommand.build_appearances,
+                                                                 VIEW_NAME)
+            appearances_object = VIEW_NAME
+            stored = '{} attributes'.format(len(design.findAttributes('displayer_appearances', VIEW_NAME)))
+        else:
+            capture_time, capture_calls, appearances_object = measure_scoped(
+                latency, SaveViewCommand.build_appearance_tokens)
+            stored = '{} bytes'.format(len(appearances_object['data']))
+
+        for occurrence in changed_occurrences:
+            occurrence.appearance = appearances[-1] if occurrence.appearance != appearances[-1] else appearances[0]
+
+        start_writes = fusion_standin.get_appearance_writes(design)
+        restore_time, restore_calls, result = measure_scoped(latency, SaveViewCommand.set_appearances,
+                                                             appearances_object)
+        writes = fusion_standin.get_appearance_writes(design) - start_writes
+
+        rows.append([scale, backend, stored, bench_common.format_ms(capture_time), capture_calls,
+                     bench_common.format_ms(restore_time), restore_calls, writes])
+
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the appearance capture backends')
+    parser.add_argument('--scales', type=int, nargs='+', default=bench_common.DEFAULT_SCALES)
+    parser.add_argument('--latency-us', type=float, default=bench_common.DEFAULT_LATENCY_US)
+    parser.add_argument('--changed-percent', type=float, default=1.0,
+                        help='Percent of the appearances changed since the view was saved')
+    args = parser.parse_args()
+
+    rows = []
+    for scale in args.scales:
+        rows += run_scale(scale, args.changed_percent, args.latency_us / 1e6)
+
+    print(bench_common.format_table(['scale', 'backend', 'stored', 'capture ms', 'capture calls', 'restore ms',
+                                     'restore calls', 'writes'], rows))
+
+
+if __name__ == '__main__':
+    main()
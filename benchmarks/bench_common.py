@@ -0,0 +1,55 @@
+# Shared set up of the benchmarks, which run the add-in against the stand-in adsk package in tests/standin
+# so they run anywhere Python 3 does, without Fusion 360
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), 'tests', 'standin'))
+
+import fusion_standin
+
+DEFAULT_SCALES = [100, 1000, 10000]
+
+# Default seconds per API call, about what a property read costs through the Fusion 360 Python API
+DEFAULT_LATENCY_US = 10.0
+
+
+def parse_args(description, default_scales=None):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--scales', type=int, nargs='+', default=default_scales or DEFAULT_SCALES,
+                        help='Sizes to benchmark, in occurrences unless stated otherwise')
+    parser.add_argument('--latency-us', type=float, default=DEFAULT_LATENCY_US,
+                        help='Microseconds every stand-in API call takes')
+    return parser.parse_args()
+
+
+# Runs function once with the call latency set, and the write latency if given
+# Returns (seconds, API calls, result)
+def measure(latency, function, *args, write_latency=0.0):
+    fusion_standin.set_call_latency(latency)
+    fusion_standin.set_write_latency(write_latency)
+    start_calls = fusion_standin.get_call_count()
+    start_time = time.perf_counter()
+
+    try:
+        result = function(*args)
+    finally:
+        fusion_standin.set_call_latency(0.0)
+        fusion_standin.set_write_latency(0.0)
+
+    return time.perf_counter() - start_time, fusion_standin.get_call_count() - start_calls, result
+
+
+def format_table(header, rows):
+    widths = [max(len(str(value)) for value in column) for column in zip(header, *rows)]
+    lines = []
+
+    for row in [header] + rows:
+        lines.append('  '.join(str(value).rjust(width) for value, width in zip(row, widths)))
+
+    return '\n'.join(lines)
+
+
+def format_ms(seconds):
+    return '{:.1f}'.format(seconds * 1000)
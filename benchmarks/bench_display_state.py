@@ -0,0 +1,66 @@
+# Compares a full hide/show restore with a diff-only one, which reads every light bulb and only writes those
+# that differ from the saved view
+#     python benchmarks/bench_display_state.py --latency-us 10 --write-latency-us 100 --changed-percent 1
+# Light bulb reads and writes are each an API call, a write also updates the graphics so it costs more
+import argparse
+
+import bench_common
+from bench_common import fusion_standin
+
+SaveViewCommand = fusion_standin.load_addin_module('SaveViewCommand')
+Fusion360Utilities = fusion_standin.load_addin_module('Fusion360Utilities.Fusion360Utilities')
+
+
+def restore(design, display_state_object, changed_occurrences, diff_only, latency, write_latency):
+    for occurrence in changed_occurrences:
+        occurrence.isLightBulbOn = not occurrence.isLightBulbOn
+
+    start_writes = fusion_standin.get_light_bulb_writes(design)
+
+    with Fusion360Utilities.AppObjectsScope():
+        elapsed, calls, result = bench_common.measure(latency, SaveViewCommand.set_display_state,
+                                                      display_state_object, diff_only, write_latency=write_latency)
+
+    return elapsed, calls, fusion_standin.get_light_bulb_writes(design) - start_writes, result['skipped']
+
+
+def run_scale(scale, changed_percent, latency, write_latency):
+    fusion_standin.reset()
+    design = fusion_standin.new_design()
+    fusion_standin.build_assembly(design, scale)
+
+    occurrences = list(design.rootComponent.allOccurrences)
+    changed_occurrences = occurrences[::max(1, int(100 / changed_percent))]
+
+    with Fusion360Utilities.AppObjectsScope():
+        display_state_object = SaveViewCommand.encode_current_display_state()
+
+    rows = []
+
+    for mode, diff_only in [('full', False), ('diff only', True)]:
+        elapsed, calls, writes, skipped = restore(design, display_state_object, changed_occurrences, diff_only,
+                                                  latency, write_latency)
+        rows.append([scale, mode, bench_common.format_ms(elapsed), calls, writes, skipped])
+
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare full and diff-only hide/show restores')
+    parser.add_argument('--scales', type=int, nargs='+', default=bench_common.DEFAULT_SCALES)
+    parser.add_argument('--latency-us', type=float, default=bench_common.DEFAULT_LATENCY_US)
+    parser.add_argument('--write-latency-us', type=float, default=100.0,
+                        help='Microseconds every stand-in property write takes on top of the call latency')
+    parser.add_argument('--changed-percent', type=float, default=1.0,
+                        help='Percent of the occurrences toggled since the view was saved')
+    args = parser.parse_args()
+
+    rows = []
+    for scale in args.scales:
+        rows += run_scale(scale, args.changed_percent, args.latency_us / 1e6, args.write_latency_us / 1e6)
+
+    print(bench_common.format_table(['scale', 'restore', 'ms', 'API calls', 'writes', 'skipped'], rows))
+
+
+if __name__ == '__main__':
+    main()
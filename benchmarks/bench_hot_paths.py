@@ -0,0 +1,43 @@
+# Times the capture and restore hot paths the Benchmark command times, on synthetic assemblies of each size
+#     python benchmarks/bench_hot_paths.py --scales 100 1000 10000 --latency-us 10
+# The latency only applies to the benchmarked functions, not to building the assemblies
+import bench_common
+from bench_common import fusion_standin
+
+BenchmarkCommand = fusion_standin.load_addin_module('BenchmarkCommand')
+OccurrenceIndex = fusion_standin.load_addin_module('OccurrenceIndex')
+Fusion360Utilities = fusion_standin.load_addin_module('Fusion360Utilities.Fusion360Utilities')
+
+
+def run_scale(scale, latency):
+    fusion_standin.reset()
+    document = BenchmarkCommand.build_synthetic_design(scale, parameter_count=max(2, scale // 10))
+
+    try:
+        with Fusion360Utilities.AppObjectsScope():
+            elapsed, calls, timings = bench_common.measure(latency, BenchmarkCommand.run_benchmarks)
+    finally:
+        document.close(False)
+        OccurrenceIndex.clear_occurrence_indexes()
+
+    if len(fusion_standin.get_messages()) > 0:
+        raise RuntimeError('The add-in reported: {}'.format(fusion_standin.get_messages()))
+
+    return timings, calls
+
+
+def main():
+    args = bench_common.parse_args('Time the capture and restore hot paths against the stand-in adsk package')
+    latency = args.latency_us / 1e6
+    results = []
+
+    for scale in args.scales:
+        timings, calls = run_scale(scale, latency)
+        results.append((scale, timings))
+        print('{} occurrences: {} API calls'.format(scale, calls))
+
+    print(BenchmarkCommand.format_benchmark_results(results))
+
+
+if __name__ == '__main__':
+    main()
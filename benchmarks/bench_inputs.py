@@ -0,0 +1,81 @@
+# Times reading the command inputs for input changed events in dialogs with hundreds of inputs,
+# reading every input on each event and updating the cached input_values for the changed input only
+#     python benchmarks/bench_inputs.py --scales 100 300 1000 --latency-us 10
+import bench_common
+from bench_common import fusion_standin
+
+import adsk.core
+
+Fusion360CommandBase = fusion_standin.load_addin_module('Fusion360Utilities.Fusion360CommandBase')
+Fusion360CommandTiming = fusion_standin.load_addin_module('Fusion360Utilities.Fusion360CommandTiming')
+
+INPUT_CHANGES = 200
+
+
+# A dialog of input_count inputs of the kinds get_inputs reads differently
+class InputsCommand(Fusion360CommandBase.Fusion360CommandBase):
+    def __init__(self, cmd_def, debug):
+        super().__init__(cmd_def, debug)
+        self.input_count = cmd_def.get('input_count', 100)
+
+    def on_create(self, command: adsk.core.Command, inputs: adsk.core.CommandInputs):
+        for i in range(self.input_count):
+            input_id = 'input_{}'.format(i)
+
+            if i % 5 == 0:
+                inputs.addBoolValueInput(input_id, input_id, True, '', False)
+            elif i % 5 == 1:
+                inputs.addStringValueInput(input_id, input_id, 'Text')
+            elif i % 5 == 2:
+                inputs.addValueInput(input_id, input_id, 'mm', adsk.core.ValueInput.createByReal(1.0))
+            elif i % 5 == 3:
+                drop_down = inputs.addDropDownCommandInput(input_id, input_id,
+                                                           adsk.core.DropDownStyles.TextListDropDownStyle)
+                drop_down.listItems.add('First', True)
+                drop_down.listItems.add('Second', False)
+            else:
+                inputs.addTextBoxCommandInput(input_id, input_id, 'Text', 1, True)
+
+
+def run_mode(input_count, incremental, latency):
+    cmd_id = 'cmdID_InputsBenchmark_{}_{}'.format(input_count, incremental)
+    command_object = InputsCommand({'cmd_id': cmd_id, 'input_count': input_count,
+                                    'incremental_inputs': incremental}, False)
+    command = fusion_standin.open_command(command_object)
+    command._preview()
+
+    value_inputs = [command_input for command_input in command.commandInputs._inputs
+                    if isinstance(command_input, adsk.core.StringValueCommandInput)]
+
+    def change_inputs():
+        for i in range(INPUT_CHANGES):
+            command_input = value_inputs[i % len(value_inputs)]
+            command_input.value = 'Text {}'.format(i)
+            command._change_input(command_input)
+
+    elapsed, calls, result = bench_common.measure(latency, change_inputs)
+    command._cancel()
+
+    # Only the time spent reading inputs, recorded by Fusion360CommandBase for each event
+    samples = Fusion360CommandTiming.get_command_timing_stats(cmd_id)[cmd_id]['input_changed_inputs']
+
+    return [input_count, 'incremental' if incremental else 'full', '{:.3f}'.format(samples['p50'] * 1000),
+            '{:.3f}'.format(elapsed / INPUT_CHANGES * 1000), calls // INPUT_CHANGES]
+
+
+def main():
+    args = bench_common.parse_args('Time reading command inputs for input changed events', [100, 300, 1000])
+    fusion_standin.reset()
+    fusion_standin.new_design()
+
+    rows = []
+    for input_count in args.scales:
+        for incremental in [False, True]:
+            rows.append(run_mode(input_count, incremental, args.latency_us / 1e6))
+
+    print(bench_common.format_table(['inputs', 'mode', 'read inputs p50 ms', 'event ms', 'API calls per event'],
+                                    rows))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,23 @@
+# The tests run the add-in against the stand-in adsk package, see tests/standin/fusion_standin.py
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), 'standin'))
+
+import fusion_standin
+
+
+# A new application for every test, failing the test if the add-in showed an error message
+@pytest.fixture(autouse=True)
+def standin():
+    fusion_standin.reset()
+    yield fusion_standin
+    assert fusion_standin.get_messages() == []
+    fusion_standin.reset()
+
+
+@pytest.fixture
+def design():
+    return fusion_standin.new_design()
@@ -0,0 +1,14 @@
+# Pure python stand-in for the parts of the Fusion 360 API the add-in uses
+# Lets the add-in be tested and benchmarked outside of Fusion 360, see tests/standin/fusion_standin.py
+# It is never on the path inside Fusion 360, where the real adsk package is used
+
+
+# Delivers the custom events fired so far, like Fusion 360 does between events
+def doEvents():
+    from . import core
+    core.Application.get()._process_custom_events()
+    return True
+
+
+# Loaded together like in Fusion 360, where adsk.cam is available without importing it
+from . import core, fusion, cam
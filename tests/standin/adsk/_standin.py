@@ -0,0 +1,161 @@
+# State of the stand-in adsk package that is not part of the Fusion 360 API
+# Set through tests/standin/fusion_standin.py
+import time
+
+_standin = {
+    # Seconds every API property read, property write and method call takes
+    'call_latency': 0.0,
+
+    # Seconds every API property write takes, on top of call_latency
+    'write_latency': 0.0,
+
+    # Seconds every model recompute takes, on top of call_latency
+    'compute_latency': 0.0,
+
+    # Number of API calls made, whatever the latency
+    'calls': 0
+}
+
+
+def busy_wait(seconds):
+    end_time = time.perf_counter() + seconds
+    while time.perf_counter() < end_time:
+        pass
+
+
+def simulate_call():
+    _standin['calls'] += 1
+
+    if _standin['call_latency'] > 0:
+        busy_wait(_standin['call_latency'])
+
+
+def simulate_write():
+    if _standin['write_latency'] > 0:
+        busy_wait(_standin['write_latency'])
+
+
+def simulate_compute():
+    if _standin['compute_latency'] > 0:
+        busy_wait(_standin['compute_latency'])
+
+
+def set_call_latency(seconds):
+    _standin['call_latency'] = seconds
+
+
+def set_write_latency(seconds):
+    _standin['write_latency'] = seconds
+
+
+def set_compute_latency(seconds):
+    _standin['compute_latency'] = seconds
+
+
+def get_call_count() -> int:
+    return _standin['calls']
+
+
+# Base of every stand-in API class
+# Reading or writing a public member is one API call, writes take the write latency on top
+# Internal state is kept in members starting with _
+class Base(object):
+    __hash__ = None
+
+    def __getattribute__(self, name):
+        if name[0] != '_':
+            simulate_call()
+        return object.__getattribute__(self, name)
+
+    def __setattr__(self, name, value):
+        if name[0] != '_':
+            simulate_call()
+            simulate_write()
+        object.__setattr__(self, name, value)
+
+    @classmethod
+    def cast(cls, value):
+        return value if isinstance(value, cls) else None
+
+    @classmethod
+    def classType(cls):
+        return 'adsk::{}::{}'.format(cls.__module__.split('.')[-1], cls.__name__)
+
+    @property
+    def objectType(self):
+        return type(self).classType()
+
+    @property
+    def isValid(self):
+        return True
+
+
+# Read only collection of items with count, item() and iteration, like the API collections
+class Collection(Base):
+    def __init__(self, items=None):
+        self._items = list(items) if items is not None else []
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    def item(self, index):
+        if 0 <= index < len(self._items):
+            return self._items[index]
+        return None
+
+    def _item(self, index):
+        return self._items[index]
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        simulate_call()
+        return self._items[index]
+
+    def __iter__(self):
+        for index in range(len(self._items)):
+            simulate_call()
+            yield self._item(index)
+
+
+# Event that API event handlers are added to
+class Event(Base):
+    def __init__(self, name, sender=None):
+        self._name = name
+        self._sender = sender
+        self._handlers = []
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def sender(self):
+        return self._sender
+
+    def add(self, handler):
+        if handler in self._handlers:
+            return False
+        self._handlers.append(handler)
+        return True
+
+    def remove(self, handler):
+        if handler not in self._handlers:
+            return False
+        self._handlers.remove(handler)
+        return True
+
+    def _fire(self, args):
+        object.__setattr__(args, '_firing_event', self)
+        for handler in list(self._handlers):
+            handler.notify(args)
+
+
+class EventArgs(Base):
+    _firing_event = None
+
+    @property
+    def firingEvent(self):
+        return self._firing_event
@@ -0,0 +1,6 @@
+# Stand-in for the parts of adsk.cam the add-in uses
+from . import core
+
+
+class CAM(core.Product):
+    _product_type = 'CAMProductType'
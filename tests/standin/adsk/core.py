@@ -0,0 +1,1444 @@
+# Stand-in for the parts of adsk.core the add-in uses
+import collections
+import uuid
+
+from ._standin import Base, Collection, Event, EventArgs, simulate_call
+
+
+class Point3D(Base):
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self.x = x
+        self.y = y
+        self.z = z
+
+    @staticmethod
+    def create(x=0.0, y=0.0, z=0.0):
+        simulate_call()
+        return Point3D(x, y, z)
+
+    def copy(self):
+        return Point3D(self.x, self.y, self.z)
+
+
+class Vector3D(Point3D):
+    @staticmethod
+    def create(x=0.0, y=0.0, z=0.0):
+        simulate_call()
+        return Vector3D(x, y, z)
+
+    def copy(self):
+        return Vector3D(self.x, self.y, self.z)
+
+
+class Matrix3D(Base):
+    @staticmethod
+    def create():
+        simulate_call()
+        return Matrix3D()
+
+
+class ValueInput(Base):
+    def __init__(self, string_value=None, real_value=None, object_value=None):
+        self._string_value = string_value
+        self._real_value = real_value
+        self._object_value = object_value
+
+    @staticmethod
+    def createByString(string_value):
+        simulate_call()
+        return ValueInput(string_value=string_value)
+
+    @staticmethod
+    def createByReal(real_value):
+        simulate_call()
+        return ValueInput(real_value=real_value)
+
+    @staticmethod
+    def createByBoolean(boolean_value):
+        simulate_call()
+        return ValueInput(object_value=boolean_value)
+
+    @staticmethod
+    def createByObject(object_value):
+        simulate_call()
+        return ValueInput(object_value=object_value)
+
+    @property
+    def stringValue(self):
+        return self._string_value if self._string_value is not None else ''
+
+    @property
+    def realValue(self):
+        return self._real_value if self._real_value is not None else 0.0
+
+    def _get_expression(self):
+        if self._string_value is not None:
+            return self._string_value
+        return repr(self._real_value)
+
+
+class ObjectCollection(Collection):
+    @staticmethod
+    def create():
+        simulate_call()
+        return ObjectCollection()
+
+    def add(self, item):
+        self._items.append(item)
+        return True
+
+    def clear(self):
+        self._items = []
+        return True
+
+
+class DocumentTypes(object):
+    FusionDesignDocumentType = 0
+    DrawingDocumentType = 1
+
+
+class DropDownStyles(object):
+    LabeledIconDropDownStyle = 0
+    CheckBoxDropDownStyle = 1
+    TextListDropDownStyle = 2
+
+
+class CameraTypes(object):
+    OrthographicCameraType = 0
+    PerspectiveCameraType = 1
+    PerspectiveWithOrthoFacesCameraType = 2
+
+
+class DialogResults(object):
+    DialogError = -1
+    DialogOK = 0
+    DialogCancel = 1
+    DialogYes = 2
+    DialogNo = 3
+
+
+class CommandTerminationReason(object):
+    UnknownTerminationReason = 0
+    CompletedTerminationReason = 1
+    CancelledTerminationReason = 2
+    AbortedTerminationReason = 3
+    PreEmptedTerminationReason = 4
+    SessionEndingTerminationReason = 5
+
+
+class PaletteDockingStates(object):
+    PaletteDockStateFloating = 0
+    PaletteDockStateTop = 1
+    PaletteDockStateBottom = 2
+    PaletteDockStateLeft = 3
+    PaletteDockStateRight = 4
+
+
+# Event handlers, the add-in subclasses these and implements notify
+class EventHandler(object):
+    def notify(self, args):
+        pass
+
+
+class CommandCreatedEventHandler(EventHandler):
+    pass
+
+
+class CommandEventHandler(EventHandler):
+    pass
+
+
+class InputChangedEventHandler(EventHandler):
+    pass
+
+
+class ValidateInputsEventHandler(EventHandler):
+    pass
+
+
+class SelectionEventHandler(EventHandler):
+    pass
+
+
+class CustomEventHandler(EventHandler):
+    pass
+
+
+class DocumentEventHandler(EventHandler):
+    pass
+
+
+class HTMLEventHandler(EventHandler):
+    pass
+
+
+class UserInterfaceGeneralEventHandler(EventHandler):
+    pass
+
+
+class WorkspaceEventHandler(EventHandler):
+    pass
+
+
+class CommandCreatedEventArgs(EventArgs):
+    def __init__(self, command):
+        self._command = command
+
+    @property
+    def command(self):
+        return self._command
+
+
+class CommandEventArgs(EventArgs):
+    def __init__(self, command, termination_reason=CommandTerminationReason.UnknownTerminationReason):
+        self._command = command
+        self._termination_reason = termination_reason
+
+    @property
+    def command(self):
+        return self._command
+
+    @property
+    def terminationReason(self):
+        return self._termination_reason
+
+
+class InputChangedEventArgs(EventArgs):
+    def __init__(self, command_input):
+        self._input = command_input
+
+    @property
+    def input(self):
+        return self._input
+
+    @property
+    def inputs(self):
+        return self._input._parent_inputs
+
+
+class CustomEventArgs(EventArgs):
+    def __init__(self, additional_info):
+        self._additional_info = additional_info
+
+    @property
+    def additionalInfo(self):
+        return self._additional_info
+
+
+class DocumentEventArgs(EventArgs):
+    def __init__(self, document):
+        self._document = document
+
+    @property
+    def document(self):
+        return self._document
+
+
+class WorkspaceEventArgs(EventArgs):
+    def __init__(self, workspace):
+        self._workspace = workspace
+
+    @property
+    def workspace(self):
+        return self._workspace
+
+
+class HTMLEventArgs(EventArgs):
+    def __init__(self, action, data):
+        self._action = action
+        self._data = data
+
+    @property
+    def action(self):
+        return self._action
+
+    @property
+    def data(self):
+        return self._data
+
+
+class CustomEvent(Event):
+    @property
+    def eventId(self):
+        return self._name
+
+
+# Command inputs
+
+class CommandInput(Base):
+    def __init__(self, parent_inputs, input_id, name):
+        self._parent_inputs = parent_inputs
+        self._id = input_id
+        self._name = name
+        self.isVisible = True
+        self.isEnabled = True
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def parentCommand(self):
+        return self._parent_inputs._command
+
+    @property
+    def commandInputs(self):
+        return self._parent_inputs
+
+    @property
+    def parentCommandInput(self):
+        return self._parent_inputs._parent_input
+
+    def deleteMe(self):
+        self._parent_inputs._remove(self)
+        return True
+
+
+class ValueInputBase(CommandInput):
+    def __init__(self, parent_inputs, input_id, name, value):
+        super().__init__(parent_inputs, input_id, name)
+        self._value = value
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+
+
+class BoolValueCommandInput(ValueInputBase):
+    pass
+
+
+class StringValueCommandInput(ValueInputBase):
+    pass
+
+
+class ValueCommandInput(ValueInputBase):
+    @property
+    def expression(self):
+        return repr(self._value)
+
+
+class DistanceValueCommandInput(ValueCommandInput):
+    pass
+
+
+class IntegerSpinnerCommandInput(ValueInputBase):
+    pass
+
+
+class FloatSpinnerCommandInput(ValueInputBase):
+    pass
+
+
+class SliderCommandInput(ValueInputBase):
+    pass
+
+
+class IntegerSliderCommandInput(SliderCommandInput):
+    pass
+
+
+class FloatSliderCommandInput(SliderCommandInput):
+    pass
+
+
+class TextBoxCommandInput(CommandInput):
+    def __init__(self, parent_inputs, input_id, name, formatted_text, num_rows, is_read_only):
+        super().__init__(parent_inputs, input_id, name)
+        self.formattedText = formatted_text
+        self.numRows = num_rows
+        self.isReadOnly = is_read_only
+
+    @property
+    def text(self):
+        return self.formattedText
+
+
+class ListItem(Base):
+    def __init__(self, parent, name, is_selected):
+        self._parent = parent
+        self._name = name
+        self._is_selected = is_selected
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def isSelected(self):
+        return self._is_selected
+
+    @isSelected.setter
+    def isSelected(self, is_selected):
+        if is_selected and self._parent._single_select:
+            for item in self._parent._items:
+                item._is_selected = False
+        self._is_selected = is_selected
+
+
+class ListItems(Collection):
+    def __init__(self, single_select):
+        super().__init__()
+        self._single_select = single_select
+
+    def add(self, name, is_selected, icon='', before_index=-1):
+        item = ListItem(self, name, False)
+        self._items.append(item)
+        item.isSelected = is_selected
+        return item
+
+    def clear(self):
+        self._items = []
+        return True
+
+
+class ListCommandInputBase(CommandInput):
+    def __init__(self, parent_inputs, input_id, name, single_select=True):
+        super().__init__(parent_inputs, input_id, name)
+        self._list_items = ListItems(single_select)
+
+    @property
+    def listItems(self):
+        return self._list_items
+
+    @property
+    def selectedItem(self):
+        for item in self._list_items._items:
+            if item._is_selected:
+                return item
+        return None
+
+
+class DropDownCommandInput(ListCommandInputBase):
+    def __init__(self, parent_inputs, input_id, name, drop_down_style):
+        super().__init__(parent_inputs, input_id, name,
+                         drop_down_style != DropDownStyles.CheckBoxDropDownStyle)
+        self._drop_down_style = drop_down_style
+
+    @property
+    def dropDownStyle(self):
+        return self._drop_down_style
+
+
+class ButtonRowCommandInput(ListCommandInputBase):
+    pass
+
+
+class RadioButtonGroupCommandInput(ListCommandInputBase):
+    pass
+
+
+class Selection(Base):
+    def __init__(self, entity):
+        self._entity = entity
+
+    @property
+    def entity(self):
+        return self._entity
+
+
+class SelectionCommandInput(CommandInput):
+    def __init__(self, parent_inputs, input_id, name, command_prompt):
+        super().__init__(parent_inputs, input_id, name)
+        self._command_prompt = command_prompt
+        self._selections = []
+
+    @property
+    def selectionCount(self):
+        return len(self._selections)
+
+    def selection(self, index):
+        return self._selections[index]
+
+    def addSelection(self, entity):
+        self._selections.append(Selection(entity))
+        return True
+
+    def clearSelection(self):
+        self._selections = []
+        return True
+
+    def addSelectionFilter(self, selection_filter):
+        return True
+
+    def setSelectionLimits(self, minimum, maximum=0):
+        return True
+
+
+# An input holding other inputs
+class GroupCommandInput(CommandInput):
+    def __init__(self, parent_inputs, input_id, name):
+        super().__init__(parent_inputs, input_id, name)
+        self._children = CommandInputs(parent_inputs._command, self)
+        self.isExpanded = True
+
+    @property
+    def children(self):
+        return self._children
+
+
+class TabCommandInput(GroupCommandInput):
+    def __init__(self, parent_inputs, input_id, name):
+        super().__init__(parent_inputs, input_id, name)
+        self.isActive = False
+
+
+# Iterating gives the inputs at this level, itemById also finds the inputs inside groups and tabs
+class CommandInputs(Base):
+    def __init__(self, command, parent_input=None):
+        self._command = command
+        self._parent_input = parent_input
+        self._inputs = []
+
+    def _add(self, command_input):
+        self._inputs.append(command_input)
+        return command_input
+
+    def _remove(self, command_input):
+        self._inputs.remove(command_input)
+
+    @property
+    def command(self):
+        return self._command
+
+    @property
+    def count(self):
+        return len(self._inputs)
+
+    def item(self, index):
+        return self._inputs[index]
+
+    def itemById(self, input_id):
+        for command_input in self._inputs:
+            if command_input._id == input_id:
+                return command_input
+
+            if isinstance(command_input, GroupCommandInput):
+                child_input = command_input._children.itemById(input_id)
+                if child_input is not None:
+                    return child_input
+
+        return None
+
+    def __len__(self):
+        return len(self._inputs)
+
+    def __iter__(self):
+        for command_input in list(self._inputs):
+            simulate_call()
+            yield command_input
+
+    def addBoolValueInput(self, input_id, name, is_check_box, resource_folder='', initial_value=False):
+        return self._add(BoolValueCommandInput(self, input_id, name, initial_value))
+
+    def addStringValueInput(self, input_id, name, initial_value=''):
+        return self._add(StringValueCommandInput(self, input_id, name, initial_value))
+
+    def addValueInput(self, input_id, name, unit_type, initial_value):
+        return self._add(ValueCommandInput(self, input_id, name, initial_value._real_value or 0.0))
+
+    def addDistanceValueCommandInput(self, input_id, name, initial_value):
+        return self._add(DistanceValueCommandInput(self, input_id, name, initial_value._real_value or 0.0))
+
+    def addIntegerSpinnerCommandInput(self, input_id, name, minimum, maximum, spin_step, initial_value):
+        return self._add(IntegerSpinnerCommandInput(self, input_id, name, initial_value))
+
+    def addFloatSpinnerCommandInput(self, input_id, name, unit_type, minimum, maximum, spin_step, initial_value):
+        return self._add(FloatSpinnerCommandInput(self, input_id, name, initial_value))
+
+    def addIntegerSliderCommandInput(self, input_id, name, minimum, maximum, has_two_sliders=False):
+        return self._add(IntegerSliderCommandInput(self, input_id, name, minimum))
+
+    def addFloatSliderCommandInput(self, input_id, name, unit_type, minimum, maximum, has_two_sliders=False):
+        return self._add(FloatSliderCommandInput(self, input_id, name, minimum))
+
+    def addTextBoxCommandInput(self, input_id, name, formatted_text, num_rows, is_read_only):
+        return self._add(TextBoxCommandInput(self, input_id, name, formatted_text, num_rows, is_read_only))
+
+    def addDropDownCommandInput(self, input_id, name, drop_down_style):
+        return self._add(DropDownCommandInput(self, input_id, name, drop_down_style))
+
+    def addButtonRowCommandInput(self, input_id, name, is_multi_select):
+        return self._add(ButtonRowCommandInput(self, input_id, name, not is_multi_select))
+
+    def addRadioButtonGroupCommandInput(self, input_id, name=''):
+        return self._add(RadioButtonGroupCommandInput(self, input_id, name))
+
+    def addSelectionInput(self, input_id, name, command_prompt):
+        return self._add(SelectionCommandInput(self, input_id, name, command_prompt))
+
+    def addGroupCommandInput(self, input_id, name):
+        return self._add(GroupCommandInput(self, input_id, name))
+
+    def addTabCommandInput(self, input_id, name, resource_folder=''):
+        return self._add(TabCommandInput(self, input_id, name))
+
+
+# A command dialog, created by CommandDefinition.execute
+# The _preview, _change_input, _ok and _cancel methods stand in for what the user does in the dialog
+class Command(Base):
+    def __init__(self, command_definition):
+        self._command_definition = command_definition
+        self._command_inputs = CommandInputs(self)
+        self._is_terminated = False
+
+        self._execute = Event('execute', self)
+        self._execute_preview = Event('executePreview', self)
+        self._input_changed = Event('inputChanged', self)
+        self._destroy = Event('destroy', self)
+        self._validate_inputs = Event('validateInputs', self)
+        self._activate = Event('activate', self)
+        self._deactivate = Event('deactivate', self)
+
+        self.isOKButtonVisible = True
+        self.okButtonText = 'OK'
+        self.cancelButtonText = 'Cancel'
+        self.isExecutedWhenPreEmpted = True
+        self.helpFile = ''
+
+    @property
+    def parentCommandDefinition(self):
+        return self._command_definition
+
+    @property
+    def commandInputs(self):
+        return self._command_inputs
+
+    @property
+    def execute(self):
+        return self._execute
+
+    @property
+    def executePreview(self):
+        return self._execute_preview
+
+    @property
+    def inputChanged(self):
+        return self._input_changed
+
+    @property
+    def destroy(self):
+        return self._destroy
+
+    @property
+    def validateInputs(self):
+        return self._validate_inputs
+
+    @property
+    def activate(self):
+        return self._activate
+
+    @property
+    def deactivate(self):
+        return self._deactivate
+
+    def setDialogInitialSize(self, width, height):
+        return True
+
+    def setDialogMinimumSize(self, width, height):
+        return True
+
+    def doExecute(self, terminate):
+        self._execute._fire(CommandEventArgs(self))
+        if terminate:
+            self._terminate(CommandTerminationReason.CompletedTerminationReason)
+        return True
+
+    def _preview(self):
+        self._execute_preview._fire(CommandEventArgs(self))
+
+    def _change_input(self, command_input):
+        self._input_changed._fire(InputChangedEventArgs(command_input))
+
+    def _ok(self):
+        self._execute._fire(CommandEventArgs(self))
+        self._terminate(CommandTerminationReason.CompletedTerminationReason)
+
+    def _cancel(self):
+        self._terminate(CommandTerminationReason.CancelledTerminationReason)
+
+    def _terminate(self, reason):
+        if self._is_terminated:
+            return
+
+        self._is_terminated = True
+        self._destroy._fire(CommandEventArgs(self, reason))
+
+        user_interface = Application._instance._user_interface
+        if user_interface._active_command is self:
+            user_interface._active_command = None
+
+
+class ControlDefinition(Base):
+    def __init__(self, name):
+        self.isEnabled = True
+        self.isVisible = True
+        self.name = name
+
+
+class CommandDefinition(Base):
+    def __init__(self, command_definitions, command_id, name, tooltip, resource_folder):
+        self._command_definitions = command_definitions
+        self._id = command_id
+        self._command_created = Event('commandCreated', self)
+        self._control_definition = ControlDefinition(name)
+        self._is_valid = True
+        self.name = name
+        self.tooltip = tooltip
+        self.resourceFolder = resource_folder
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def commandCreated(self):
+        return self._command_created
+
+    @property
+    def controlDefinition(self):
+        return self._control_definition
+
+    @property
+    def isValid(self):
+        return self._is_valid
+
+    # Opens the command dialog, the command is Application.get().userInterface._active_command until it ends
+    def execute(self, inputs=None):
+        user_interface = Application._instance._user_interface
+
+        if user_interface._active_command is not None:
+            user_interface._active_command._terminate(CommandTerminationReason.PreEmptedTerminationReason)
+
+        command = Command(self)
+        user_interface._active_command = command
+        self._command_created._fire(CommandCreatedEventArgs(command))
+        return True
+
+    def deleteMe(self):
+        self._is_valid = False
+        self._command_definitions._items.remove(self)
+        return True
+
+
+class CommandDefinitions(Collection):
+    def itemById(self, command_id):
+        for command_definition in self._items:
+            if command_definition._id == command_id:
+                return command_definition
+        return None
+
+    def addButtonDefinition(self, command_id, name, tooltip, resource_folder=''):
+        if self.itemById(command_id) is not None:
+            raise RuntimeError('3 : the command definition {} already exists'.format(command_id))
+
+        command_definition = CommandDefinition(self, command_id, name, tooltip, resource_folder)
+        self._items.append(command_definition)
+        return command_definition
+
+
+class ToolbarControl(Base):
+    def __init__(self, controls, control_id):
+        self._controls = controls
+        self._id = control_id
+        self._is_valid = True
+        self.isVisible = True
+        self.isPromoted = False
+        self.isPromotedByDefault = False
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def isValid(self):
+        return self._is_valid
+
+    @property
+    def parent(self):
+        return self._controls
+
+    def deleteMe(self):
+        self._is_valid = False
+        self._controls._items.remove(self)
+        return True
+
+
+class CommandControl(ToolbarControl):
+    def __init__(self, controls, command_definition):
+        super().__init__(controls, command_definition._id)
+        self._command_definition = command_definition
+
+    @property
+    def commandDefinition(self):
+        return self._command_definition
+
+
+class DropDownControl(ToolbarControl):
+    def __init__(self, controls, control_id, text):
+        super().__init__(controls, control_id)
+        self._child_controls = ToolbarControls()
+        self.text = text
+
+    @property
+    def controls(self):
+        return self._child_controls
+
+
+class ToolbarControls(Collection):
+    def itemById(self, control_id):
+        for control in self._items:
+            if control._id == control_id:
+                return control
+        return None
+
+    # Controls are added next to the control with position_id, or at the end if there is no such control
+    def _insert(self, control, position_id, is_before):
+        position_control = self.itemById(position_id) if position_id else None
+
+        if position_control is None:
+            self._items.append(control)
+        else:
+            position = self._items.index(position_control)
+            self._items.insert(position if is_before else position + 1, control)
+
+        return control
+
+    def addCommand(self, command_definition, position_id='', is_before=True):
+        return self._insert(CommandControl(self, command_definition), position_id, is_before)
+
+    def addDropDown(self, text, resource_folder, control_id='', position_id='', is_before=True):
+        return self._insert(DropDownControl(self, control_id, text), position_id, is_before)
+
+
+class ToolbarPanel(Base):
+    def __init__(self, panel_id, name):
+        self._id = panel_id
+        self._controls = ToolbarControls()
+        self.name = name
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def controls(self):
+        return self._controls
+
+
+class ToolbarPanels(Collection):
+    def itemById(self, panel_id):
+        for panel in self._items:
+            if panel._id == panel_id:
+                return panel
+        return None
+
+    def add(self, panel_id, name, position_id='', is_before=True):
+        panel = ToolbarPanel(panel_id, name)
+        self._items.append(panel)
+        return panel
+
+
+class Workspace(Base):
+    def __init__(self, workspace_id):
+        self._id = workspace_id
+        self._toolbar_panels = ToolbarPanels([ToolbarPanel('SolidScriptsAddinsPanel', 'Add-Ins')])
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def toolbarPanels(self):
+        return self._toolbar_panels
+
+
+class Workspaces(Collection):
+    def itemById(self, workspace_id):
+        for workspace in self._items:
+            if workspace._id == workspace_id:
+                return workspace
+        return None
+
+
+class Toolbar(Base):
+    def __init__(self, toolbar_id):
+        self._id = toolbar_id
+        self._controls = ToolbarControls()
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def controls(self):
+        return self._controls
+
+
+class Toolbars(Collection):
+    def itemById(self, toolbar_id):
+        for toolbar in self._items:
+            if toolbar._id == toolbar_id:
+                return toolbar
+        return None
+
+
+class Palette(Base):
+    def __init__(self, palettes, palette_id, name):
+        self._palettes = palettes
+        self._id = palette_id
+        self._is_valid = True
+        self._closed = Event('closed', self)
+        self._incoming_from_html = Event('incomingFromHTML', self)
+        self.name = name
+        self.isVisible = True
+        self.dockingState = PaletteDockingStates.PaletteDockStateFloating
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def isValid(self):
+        return self._is_valid
+
+    @property
+    def closed(self):
+        return self._closed
+
+    @property
+    def incomingFromHTML(self):
+        return self._incoming_from_html
+
+    def sendInfoToHTML(self, action, data):
+        return ''
+
+    def deleteMe(self):
+        self._is_valid = False
+        self._palettes._items.remove(self)
+        return True
+
+
+# The Text Commands palette keeps the most recent lines written to it
+class TextCommandPalette(Palette):
+    def __init__(self, palettes):
+        super().__init__(palettes, 'TextCommands', 'Text Commands')
+        self._lines = collections.deque(maxlen=1000)
+
+    def writeText(self, text):
+        self._lines.append(text)
+        return True
+
+
+class Palettes(Collection):
+    def itemById(self, palette_id):
+        for palette in self._items:
+            if palette._id == palette_id:
+                return palette
+        return None
+
+    def add(self, palette_id, name, html_file_url, is_visible, show_close_button, is_resizable, width=0, height=0,
+            use_new_web_browser=False):
+        palette = Palette(self, palette_id, name)
+        palette.isVisible = is_visible
+        self._items.append(palette)
+        return palette
+
+
+# The task can be cancelled from outside with _cancel, as if the user pressed the cancel button
+class ProgressDialog(Base):
+    def __init__(self):
+        self._is_showing = False
+        self._was_cancelled = False
+        self.isCancelButtonShown = False
+        self.cancelButtonText = 'Cancel'
+        self.title = ''
+        self.message = ''
+        self.minimumValue = 0
+        self.maximumValue = 100
+        self.progressValue = 0
+
+    @property
+    def isShowing(self):
+        return self._is_showing
+
+    @property
+    def wasCancelled(self):
+        return self._was_cancelled
+
+    def show(self, title, message, minimum_value, maximum_value, delay=0):
+        self._is_showing = True
+        self._was_cancelled = False
+        self.title = title
+        self.message = message
+        self.minimumValue = minimum_value
+        self.maximumValue = maximum_value
+        return True
+
+    def hide(self):
+        self._is_showing = False
+        return True
+
+    def _cancel(self):
+        self._was_cancelled = True
+
+
+# Shows no dialog, showOpen and showSave pick the file set with _select_file and are cancelled without one
+class FileDialog(Base):
+    def __init__(self, file_name):
+        self._file_name = file_name
+        self.initialDirectory = ''
+        self.isMultiSelectEnabled = False
+        self.title = ''
+        self.filter = ''
+        self.filename = ''
+
+    def _show(self):
+        if self._file_name is None:
+            return DialogResults.DialogCancel
+
+        self.filename = self._file_name
+        return DialogResults.DialogOK
+
+    def showOpen(self):
+        return self._show()
+
+    def showSave(self):
+        return self._show()
+
+
+class Selections(Collection):
+    def add(self, entity):
+        self._items.append(Selection(entity))
+        return True
+
+    def clear(self):
+        self._items = []
+        return True
+
+
+# Message boxes are answered with DialogOK and kept in _messages, tests check that no handler reported an error
+class UserInterface(Base):
+    def __init__(self):
+        self._messages = []
+        self._active_command = None
+        self._command_definitions = CommandDefinitions()
+        self._workspaces = Workspaces([Workspace('FusionSolidEnvironment')])
+        self._toolbars = Toolbars([Toolbar('NavToolbar')])
+        self._palettes = Palettes()
+        self._palettes._items.append(TextCommandPalette(self._palettes))
+        self._active_selections = Selections()
+        self._workspace_activated = Event('workspaceActivated', self)
+        self._progress_dialogs = []
+        self._selected_file_name = None
+
+    def messageBox(self, text, title='', buttons=0, icon=0):
+        self._messages.append(text)
+        return DialogResults.DialogOK
+
+    @property
+    def commandDefinitions(self):
+        return self._command_definitions
+
+    @property
+    def workspaces(self):
+        return self._workspaces
+
+    @property
+    def toolbars(self):
+        return self._toolbars
+
+    @property
+    def palettes(self):
+        return self._palettes
+
+    @property
+    def activeSelections(self):
+        return self._active_selections
+
+    @property
+    def workspaceActivated(self):
+        return self._workspace_activated
+
+    @property
+    def activeCommand(self):
+        if self._active_command is None:
+            return 'SelectCommand'
+        return self._active_command._command_definition._id
+
+    def terminateActiveCommand(self):
+        if self._active_command is not None:
+            self._active_command._terminate(CommandTerminationReason.AbortedTerminationReason)
+        return True
+
+    # File the next file dialog picks, None to cancel it
+    def _select_file(self, file_name):
+        self._selected_file_name = file_name
+
+    def createFileDialog(self):
+        return FileDialog(self._selected_file_name)
+
+    def createProgressDialog(self):
+        progress_dialog = ProgressDialog()
+        self._progress_dialogs.append(progress_dialog)
+        return progress_dialog
+
+
+class Attribute(Base):
+    def __init__(self, attributes, group_name, name, value):
+        self._attributes = attributes
+        self._group_name = group_name
+        self._name = name
+        self._value = value
+        self._is_valid = True
+
+    @property
+    def groupName(self):
+        return self._group_name
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+
+    @property
+    def parent(self):
+        return self._attributes._get_parent()
+
+    @property
+    def isValid(self):
+        return self._is_valid
+
+    def deleteMe(self):
+        self._is_valid = False
+        del self._attributes._by_key[(self._group_name, self._name)]
+        return True
+
+
+# Attributes of one entity or document, _get_parent returns a new object for the entity like the API does
+class Attributes(Base):
+    def __init__(self, get_parent):
+        self._get_parent = get_parent
+        self._by_key = {}
+
+    def add(self, group_name, name, value):
+        attribute = Attribute(self, group_name, name, value)
+        self._by_key[(group_name, name)] = attribute
+        return attribute
+
+    def itemByName(self, group_name, name):
+        return self._by_key.get((group_name, name), None)
+
+    def itemsByGroup(self, group_name):
+        return [attribute for (group, name), attribute in list(self._by_key.items()) if group == group_name]
+
+    @property
+    def groupNames(self):
+        return sorted(set(group for group, name in self._by_key))
+
+    @property
+    def count(self):
+        return len(self._by_key)
+
+    def item(self, index):
+        return list(self._by_key.values())[index]
+
+    def __iter__(self):
+        for attribute in list(self._by_key.values()):
+            simulate_call()
+            yield attribute
+
+
+class Product(Base):
+    _product_type = ''
+
+    @property
+    def productType(self):
+        return self._product_type
+
+
+class Products(Collection):
+    def itemByProductType(self, product_type):
+        for product in self._items:
+            if product._product_type == product_type:
+                return product
+        return None
+
+
+class Document(Base):
+    def __init__(self, application, name):
+        from . import fusion
+
+        self._application = application
+        self._creation_id = str(uuid.uuid4())
+        self._attributes = Attributes(lambda: self)
+        self._is_valid = True
+        self._design = fusion.Design(self)
+        self._products = Products([self._design])
+        self.name = name
+        self.isSaved = True
+
+    @property
+    def creationId(self):
+        return self._creation_id
+
+    @property
+    def attributes(self):
+        return self._attributes
+
+    @property
+    def products(self):
+        return self._products
+
+    @property
+    def isValid(self):
+        return self._is_valid
+
+    def activate(self):
+        self._application._activate(self)
+        return True
+
+    def close(self, save_changes=False):
+        self._application._close(self)
+        return True
+
+
+class Documents(Collection):
+    def __init__(self, application):
+        super().__init__()
+        self._application = application
+
+    def add(self, document_type, visible=True, options=None):
+        document = Document(self._application, 'Untitled {}'.format(len(self._items) + 1))
+        self._items.append(document)
+        self._application._activate(document)
+        return document
+
+
+class Camera(Base):
+    def __init__(self):
+        self.cameraType = CameraTypes.OrthographicCameraType
+        self.eye = Point3D(0.0, 0.0, 10.0)
+        self.target = Point3D(0.0, 0.0, 0.0)
+        self.upVector = Vector3D(0.0, 1.0, 0.0)
+        self.isFitView = False
+        self.isSmoothTransition = True
+        self.viewExtents = 10.0
+        self.viewOrientation = 0
+        self.perspectiveAngle = 0.5
+
+    def _copy(self):
+        camera = Camera()
+        for name in ['cameraType', 'isFitView', 'isSmoothTransition', 'viewExtents', 'viewOrientation',
+                     'perspectiveAngle']:
+            object.__setattr__(camera, name, object.__getattribute__(self, name))
+        for name in ['eye', 'target', 'upVector']:
+            object.__setattr__(camera, name, object.__getattribute__(self, name).copy())
+        return camera
+
+
+class Viewport(Base):
+    def __init__(self):
+        self._camera = Camera()
+        self.visualStyle = 0
+
+    @property
+    def camera(self):
+        return self._camera._copy()
+
+    @camera.setter
+    def camera(self, camera):
+        self._camera = camera._copy()
+
+    def fit(self):
+        return True
+
+    def refresh(self):
+        return True
+
+
+class MaterialLibrary(Base):
+    def __init__(self, library_id, name, appearances):
+        self._id = library_id
+        self._appearances = appearances
+        self.name = name
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def appearances(self):
+        return self._appearances
+
+
+class MaterialLibraries(Collection):
+    def itemById(self, library_id):
+        for library in self._items:
+            if library._id == library_id:
+                return library
+        return None
+
+
+# The Fusion 360 application, there is one per process
+# Custom events are queued by fireCustomEvent and delivered by adsk.doEvents
+class Application(Base):
+    _instance = None
+
+    def __init__(self):
+        from . import fusion
+
+        self._user_interface = UserInterface()
+        self._documents = Documents(self)
+        self._active_document = None
+        self._active_viewport = Viewport()
+        self._custom_events = {}
+        self._pending_custom_events = collections.deque()
+
+        self._document_activated = Event('documentActivated', self)
+        self._document_deactivated = Event('documentDeactivated', self)
+        self._document_opened = Event('documentOpened', self)
+        self._document_closed = Event('documentClosed', self)
+        self._document_saving = Event('documentSaving', self)
+        self._document_saved = Event('documentSaved', self)
+
+        library_appearances = fusion.Appearances(None, [
+            fusion.Appearance(None, 'library-appearance-{}'.format(i), 'Library Appearance {}'.format(i))
+            for i in range(20)])
+        self._material_libraries = MaterialLibraries([
+            MaterialLibrary('BA5EE55E-9982-449B-9D66-9F036540E140', 'Fusion 360 Appearance Library',
+                            library_appearances)])
+
+    @staticmethod
+    def get():
+        if Application._instance is None:
+            Application._instance = Application()
+        return Application._instance
+
+    @property
+    def userInterface(self):
+        return self._user_interface
+
+    @property
+    def documents(self):
+        return self._documents
+
+    @property
+    def activeDocument(self):
+        if self._active_document is None:
+            raise RuntimeError('2 : InternalValidationError : there is no active document')
+        return self._active_document
+
+    @property
+    def activeProduct(self):
+        if self._active_document is None:
+            return None
+        return self._active_document._design
+
+    @property
+    def activeViewport(self):
+        return self._active_viewport
+
+    @property
+    def materialLibraries(self):
+        return self._material_libraries
+
+    @property
+    def documentActivated(self):
+        return self._document_activated
+
+    @property
+    def documentDeactivated(self):
+        return self._document_deactivated
+
+    @property
+    def documentOpened(self):
+        return self._document_opened
+
+    @property
+    def documentClosed(self):
+        return self._document_closed
+
+    @property
+    def documentSaving(self):
+        return self._document_saving
+
+    @property
+    def documentSaved(self):
+        return self._document_saved
+
+    def registerCustomEvent(self, event_id):
+        custom_event = self._custom_events.get(event_id, None)
+
+        if custom_event is None:
+            custom_event = CustomEvent(event_id, self)
+            self._custom_events[event_id] = custom_event
+
+        return custom_event
+
+    def unregisterCustomEvent(self, event_id):
+        return self._custom_events.pop(event_id, None) is not None
+
+    def fireCustomEvent(self, event_id, additional_info=''):
+        if event_id not in self._custom_events:
+            return False
+
+        self._pending_custom_events.append((event_id, additional_info))
+        return True
+
+    # Delivers queued custom events, including ones fired while delivering, returns the number delivered
+    def _process_custom_events(self):
+        delivered = 0
+
+        while len(self._pending_custom_events) > 0:
+            event_id, additional_info = self._pending_custom_events.popleft()
+            custom_event = self._custom_events.get(event_id, None)
+
+            if custom_event is not None:
+                custom_event._fire(CustomEventArgs(additional_info))
+                delivered += 1
+
+        return delivered
+
+    def _activate(self, document):
+        if self._active_document is document:
+            return
+
+        if self._active_document is not None:
+            self._document_deactivated._fire(DocumentEventArgs(self._active_document))
+
+        self._active_document = document
+        self._document_activated._fire(DocumentEventArgs(document))
+
+    def _close(self, document):
+        self._documents._items.remove(document)
+        self._document_closed._fire(DocumentEventArgs(document))
+        document._is_valid = False
+
+        if self._active_document is document:
+            self._active_document = None
+            if len(self._documents._items) > 0:
+                self._activate(self._documents._items[-1])
+
+
+class UnitsManager(Base):
+    pass
+
+
+class ImportManager(Base):
+    pass
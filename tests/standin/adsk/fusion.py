@@ -0,0 +1,710 @@
+# Stand-in for the parts of adsk.fusion the add-in uses
+#
+# Occurrences are kept as a tree of native occurrences, an Occurrence object is the path to one of them
+# from the root component, so a component used in several places has an occurrence for each path
+# Occurrence objects are made on every read and compare equal when they have the same path, like the API
+#
+# Entity tokens include the session of the design, Design._reopen starts a new one,
+# so tokens of the same entity differ between sessions but all of them resolve with findEntityByToken
+import math
+import re
+
+from . import core
+from ._standin import Base, Collection, simulate_call, simulate_compute
+
+
+class DesignTypes(object):
+    DirectDesignType = 0
+    ParametricDesignType = 1
+
+
+class FeatureOperations(object):
+    JoinFeatureOperation = 0
+    CutFeatureOperation = 1
+    IntersectFeatureOperation = 2
+    NewBodyFeatureOperation = 3
+    NewComponentFeatureOperation = 4
+
+
+# Classes the add-in only refers to, for casts and type hints
+class BRepBody(Base):
+    pass
+
+
+class BRepFace(Base):
+    pass
+
+
+class ConstructionPlane(Base):
+    pass
+
+
+class Sketch(Base):
+    pass
+
+
+class Sketches(Collection):
+    pass
+
+
+class ExtrudeFeature(Base):
+    pass
+
+
+class ExportManager(Base):
+    pass
+
+
+class Timeline(Base):
+    def __init__(self, design):
+        self._design = design
+
+    @property
+    def count(self):
+        return self._design._timeline_count
+
+
+# One use of a component inside another, the parent of every Occurrence path element
+class _NativeOccurrence(object):
+    __slots__ = ('id', 'parent_component_id', 'component_id', 'number')
+
+    def __init__(self, native_id, parent_component_id, component_id, number):
+        self.id = native_id
+        self.parent_component_id = parent_component_id
+        self.component_id = component_id
+        self.number = number
+
+
+class Component(Base):
+    def __init__(self, design, component_id, name):
+        self._design = design
+        self._id = component_id
+        self._name = name
+        self._native_occurrence_ids = []
+        self._instance_count = 0
+
+    def __eq__(self, other):
+        return isinstance(other, Component) and other._design is self._design and other._id == self._id
+
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, name):
+        self._name = name
+
+    @property
+    def parentDesign(self):
+        return self._design
+
+    @property
+    def entityToken(self):
+        return self._design._get_token(('component', (self._id,)))
+
+    @property
+    def occurrences(self):
+        return OccurrenceList(self._design, (), self._native_occurrence_ids, self)
+
+    @property
+    def allOccurrences(self):
+        return OccurrenceList(self._design, (), None, self)
+
+    @property
+    def attributes(self):
+        return self._design._get_attributes(('component', (self._id,)))
+
+
+class Occurrence(Base):
+    def __init__(self, design, path):
+        self._design = design
+        self._path = path
+
+    def __eq__(self, other):
+        return isinstance(other, Occurrence) and other._design is self._design and other._path == self._path
+
+    def _native(self):
+        return self._design._native_occurrences[self._path[-1]]
+
+    def _key(self):
+        return 'occurrence', self._path
+
+    @property
+    def name(self):
+        return self._design._get_occurrence_name(self._path[-1])
+
+    @property
+    def fullPathName(self):
+        return '+'.join(self._design._get_occurrence_name(native_id) for native_id in self._path)
+
+    @property
+    def component(self):
+        return self._design._components[self._native().component_id]
+
+    @property
+    def childOccurrences(self):
+        component = self._design._components[self._native().component_id]
+        return OccurrenceList(self._design, self._path, component._native_occurrence_ids, None)
+
+    @property
+    def isLightBulbOn(self):
+        return self._design._light_bulbs.get(self._path, True)
+
+    @isLightBulbOn.setter
+    def isLightBulbOn(self, is_light_bulb_on):
+        self._design._light_bulb_writes += 1
+        self._design._light_bulbs[self._path] = bool(is_light_bulb_on)
+
+    @property
+    def appearance(self):
+        return self._design._get_appearance(self._key())
+
+    @appearance.setter
+    def appearance(self, appearance):
+        self._design._set_appearance(self._key(), appearance)
+
+    @property
+    def entityToken(self):
+        return self._design._get_token(self._key())
+
+    @property
+    def attributes(self):
+        return self._design._get_attributes(self._key())
+
+    @property
+    def isValid(self):
+        return self._design._is_valid_path(self._path)
+
+
+# The occurrences directly under a component, or every occurrence below it when native_ids is None
+class OccurrenceList(Base):
+    def __init__(self, design, prefix, native_ids, component):
+        self._design = design
+        self._prefix = prefix
+        self._component = component
+
+        if native_ids is None:
+            self._paths = design._get_all_paths(component)
+        else:
+            self._paths = [prefix + (native_id,) for native_id in native_ids]
+
+    @property
+    def count(self):
+        return len(self._paths)
+
+    def item(self, index):
+        if 0 <= index < len(self._paths):
+            return Occurrence(self._design, self._paths[index])
+        return None
+
+    def __len__(self):
+        return len(self._paths)
+
+    def __getitem__(self, index):
+        simulate_call()
+        return Occurrence(self._design, self._paths[index])
+
+    def __iter__(self):
+        for path in self._paths:
+            simulate_call()
+            yield Occurrence(self._design, path)
+
+    def addNewComponent(self, transform):
+        component = self._design._add_component('Component{}'.format(len(self._design._components)))
+        return self._design._add_occurrence(self._component, component)
+
+    def addExistingComponent(self, component, transform):
+        return self._design._add_occurrence(self._component, component)
+
+
+class Appearance(Base):
+    def __init__(self, design, appearance_id, name):
+        self._design = design
+        self._id = appearance_id
+        self._name = name
+
+    def __eq__(self, other):
+        return isinstance(other, Appearance) and other._design is self._design and other._id == self._id
+
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, name):
+        self._name = name
+
+    @property
+    def usedBy(self):
+        design = self._design
+        keys = design._entities_by_appearance.get(self._id, {})
+        return core.ObjectCollection([design._get_entity(key) for key in keys])
+
+
+class Appearances(Collection):
+    def __init__(self, design, items=None):
+        super().__init__(items)
+        self._design = design
+
+    def itemById(self, appearance_id):
+        for appearance in self._items:
+            if appearance._id == appearance_id:
+                return appearance
+        return None
+
+    def itemByName(self, name):
+        for appearance in self._items:
+            if appearance._name == name:
+                return appearance
+        return None
+
+    def addByCopy(self, appearance_to_copy, name):
+        appearance = Appearance(self._design, '{}-{}'.format(appearance_to_copy._id, len(self._items)), name)
+        self._items.append(appearance)
+        return appearance
+
+
+# Expressions are numbers with optional units, parameter names, + - * / and parentheses
+_UNIT_SCALES = {'mm': 0.1, 'cm': 1.0, 'm': 100.0, 'in': 2.54, 'ft': 30.48, 'deg': math.pi / 180, 'rad': 1.0, '': 1.0}
+
+_EXPRESSION_TOKEN = re.compile(r'\s*(?:(?P<number>\d+(?:\.\d*)?|\.\d+)(?:\s*(?P<unit>mm|cm|m|in|ft|deg|rad)\b)?'
+                               r'|(?P<name>[A-Za-z_]\w*)|(?P<operator>[-+*/()]))')
+
+
+def _parse_expression(expression):
+    tokens = []
+    position = 0
+    expression = expression.rstrip()
+
+    while position < len(expression):
+        match = _EXPRESSION_TOKEN.match(expression, position)
+
+        if match is None or match.end() == position:
+            raise ValueError('Invalid expression: {}'.format(expression))
+
+        tokens.append(match)
+        position = match.end()
+
+    return tokens
+
+
+class Parameter(Base):
+    def __init__(self, design, name, expression, unit, comment, is_deletable):
+        self._design = design
+        self._name = name
+        self._expression = expression
+        self._unit = unit
+        self._comment = comment
+        self._is_deletable = is_deletable
+
+    def __eq__(self, other):
+        return isinstance(other, Parameter) and other._design is self._design and other._name == self._name
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def expression(self):
+        return self._expression
+
+    # Every change is followed by a recompute of the model
+    @expression.setter
+    def expression(self, expression):
+        self._design._evaluate(expression, self._unit)
+        self._design._set_expressions([(self, expression)])
+
+    @property
+    def value(self):
+        return self._design._evaluate(self._expression, self._unit)
+
+    @property
+    def unit(self):
+        return self._unit
+
+    @property
+    def comment(self):
+        return self._comment
+
+    @property
+    def isDeletable(self):
+        return self._is_deletable
+
+    @property
+    def dependentParameters(self):
+        return ParameterList(self._design._get_dependents().get(self._name, []))
+
+
+class UserParameter(Parameter):
+    pass
+
+
+class ParameterList(Collection):
+    def itemByName(self, name):
+        for parameter in self._items:
+            if parameter._name == name:
+                return parameter
+        return None
+
+
+class UserParameters(ParameterList):
+    def __init__(self, design):
+        super().__init__()
+        self._design = design
+        self._items = design._parameters
+
+    def add(self, name, value, units, comment):
+        design = self._design
+
+        if self.itemByName(name) is not None:
+            raise RuntimeError('3 : a parameter named {} already exists'.format(name))
+
+        expression = value._get_expression()
+        design._evaluate(expression, units)
+
+        parameter = UserParameter(design, name, expression, units, comment, True)
+        design._parameters.append(parameter)
+        design._expressions_version += 1
+        design._compute()
+        return parameter
+
+
+class FusionUnitsManager(Base):
+    def __init__(self, design):
+        self._design = design
+        self.defaultLengthUnits = 'mm'
+
+    def formatInternalValue(self, internal_value, display_units='', show_units=True):
+        text = '{:g}'.format(internal_value / _UNIT_SCALES.get(display_units, 1.0))
+        if show_units and len(display_units) > 0:
+            text += ' ' + display_units
+        return text
+
+    def isValidExpression(self, expression, units):
+        try:
+            self._design._evaluate(expression, units)
+        except (ValueError, SyntaxError, ZeroDivisionError):
+            return False
+        return True
+
+    def evaluateExpression(self, expression, units=''):
+        try:
+            return self._design._evaluate(expression, units)
+        except (ValueError, SyntaxError, ZeroDivisionError):
+            raise RuntimeError('3 : invalid expression: {}'.format(expression))
+
+
+class Design(core.Product):
+    _product_type = 'DesignProductType'
+
+    def __init__(self, document):
+        self._document = document
+        self._session = 1
+        self._next_id = 1
+
+        self._components = {}
+        self._native_occurrences = {}
+        self._structure_version = 0
+        self._all_paths = {}
+
+        self._light_bulbs = {}
+        self._light_bulb_writes = 0
+
+        self._appearances = Appearances(self)
+        self._appearance_by_entity = {}
+        self._entities_by_appearance = {}
+        self._appearance_writes = 0
+        self._entity_attributes = {}
+
+        self._parameters = []
+        self._expressions_version = 0
+        self._dependents = (None, {})
+        self._compute_count = 0
+        self._is_compute_deferred = False
+        self._is_compute_pending = False
+
+        self._timeline_count = 0
+        self._design_type = DesignTypes.ParametricDesignType
+        self._units_manager = FusionUnitsManager(self)
+        self._root_component = self._add_component('(Unsaved)')
+
+    # Entities
+
+    def _new_id(self):
+        new_id = self._next_id
+        self._next_id += 1
+        return new_id
+
+    def _add_component(self, name):
+        component = Component(self, self._new_id(), name)
+        self._components[component._id] = component
+        return component
+
+    def _add_occurrence(self, parent_component, component):
+        component._instance_count += 1
+        native_occurrence = _NativeOccurrence(self._new_id(), parent_component._id, component._id,
+                                              component._instance_count)
+        self._native_occurrences[native_occurrence.id] = native_occurrence
+        parent_component._native_occurrence_ids.append(native_occurrence.id)
+
+        self._structure_version += 1
+        self._timeline_count += 1
+
+        return Occurrence(self, (native_occurrence.id,))
+
+    def _get_occurrence_name(self, native_id):
+        native_occurrence = self._native_occurrences[native_id]
+        return '{}:{}'.format(self._components[native_occurrence.component_id]._name, native_occurrence.number)
+
+    # Paths of every occurrence below a component, depth first in the order they were added
+    def _get_all_paths(self, component):
+        cached = self._all_paths.get(component._id, None)
+
+        if cached is not None and cached[0] == self._structure_version:
+            return cached[1]
+
+        paths = []
+
+        def add_paths(parent_component, prefix):
+            for native_id in parent_component._native_occurrence_ids:
+                path = prefix + (native_id,)
+                paths.append(path)
+                add_paths(self._components[self._native_occurrences[native_id].component_id], path)
+
+        add_paths(component, ())
+        self._all_paths[component._id] = (self._structure_version, paths)
+        return paths
+
+    def _is_valid_path(self, path):
+        parent_component_id = self._root_component._id
+
+        for native_id in path:
+            native_occurrence = self._native_occurrences.get(native_id, None)
+
+            if native_occurrence is None or native_occurrence.parent_component_id != parent_component_id:
+                return False
+
+            parent_component_id = native_occurrence.component_id
+
+        return True
+
+    def _get_entity(self, key):
+        kind, ids = key
+
+        if kind == 'occurrence':
+            return Occurrence(self, ids)
+
+        return self._components[ids[0]]
+
+    def _get_token(self, key):
+        kind, ids = key
+        return 's{}/{}/{}'.format(self._session, kind, '.'.join(str(entity_id) for entity_id in ids))
+
+    # Starts a new session, as if the document was closed and opened again, every entity token changes
+    def _reopen(self):
+        self._session += 1
+
+    def _get_attributes(self, key):
+        attributes = self._entity_attributes.get(key, None)
+
+        if attributes is None:
+            attributes = core.Attributes(lambda: self._get_entity(key))
+            self._entity_attributes[key] = attributes
+
+        return attributes
+
+    def _get_appearance(self, key):
+        appearance_id = self._appearance_by_entity.get(key, None)
+
+        if appearance_id is None:
+            return None
+
+        return self._appearances.itemById(appearance_id)
+
+    def _set_appearance(self, key, appearance):
+        self._appearance_writes += 1
+        previous_id = self._appearance_by_entity.pop(key, None)
+
+        if previous_id is not None:
+            self._entities_by_appearance[previous_id].pop(key, None)
+
+        if appearance is not None:
+            self._appearance_by_entity[key] = appearance._id
+            self._entities_by_appearance.setdefault(appearance._id, {})[key] = None
+
+    # Parameters
+
+    def _get_parameter(self, name):
+        for parameter in self._parameters:
+            if parameter._name == name:
+                return parameter
+        return None
+
+    def _evaluate(self, expression, unit, depth=0):
+        if depth > 50:
+            raise ValueError('Circular parameter reference in: {}'.format(expression))
+
+        matches = _parse_expression(expression)
+
+        # Numbers only take the units of the parameter when nothing in the expression has units
+        if any(match.group('unit') is not None or match.group('name') is not None for match in matches):
+            default_scale = 1.0
+        else:
+            default_scale = _UNIT_SCALES.get(unit, 1.0)
+
+        python_expression = []
+
+        for match in matches:
+            if match.group('number') is not None:
+                unit_name = match.group('unit')
+                scale = default_scale if unit_name is None else _UNIT_SCALES[unit_name]
+                python_expression.append(repr(float(match.group('number')) * scale))
+
+            elif match.group('name') is not None:
+                parameter = self._get_parameter(match.group('name'))
+                if parameter is None:
+                    raise ValueError('Unknown parameter: {}'.format(match.group('name')))
+                python_expression.append(repr(self._evaluate(parameter._expression, parameter._unit, depth + 1)))
+
+            else:
+                python_expression.append(match.group('operator'))
+
+        return float(eval(' '.join(python_expression), {'__builtins__': {}}, {}))
+
+    def _get_dependents(self):
+        version, dependents = self._dependents
+
+        if version != self._expressions_version:
+            dependents = {}
+
+            for parameter in self._parameters:
+                for match in _parse_expression(parameter._expression):
+                    if match.group('name') is not None:
+                        dependents.setdefault(match.group('name'), []).append(parameter)
+
+            self._dependents = (self._expressions_version, dependents)
+
+        return dependents
+
+    def _set_expressions(self, changes):
+        for parameter, expression in changes:
+            parameter._expression = expression
+
+        self._expressions_version += 1
+        self._compute()
+
+    # While compute is deferred the model is computed once when it is no longer deferred
+    def _compute(self):
+        if self._is_compute_deferred:
+            self._is_compute_pending = True
+            return
+
+        self._compute_count += 1
+        simulate_compute()
+
+    # API
+
+    @property
+    def parentDocument(self):
+        return self._document
+
+    @property
+    def designType(self):
+        return self._design_type
+
+    @designType.setter
+    def designType(self, design_type):
+        self._design_type = design_type
+
+    @property
+    def isComputeDeferred(self):
+        return self._is_compute_deferred
+
+    @isComputeDeferred.setter
+    def isComputeDeferred(self, is_compute_deferred):
+        self._is_compute_deferred = bool(is_compute_deferred)
+
+        if not self._is_compute_deferred and self._is_compute_pending:
+            self._is_compute_pending = False
+            self._compute()
+
+    @property
+    def rootComponent(self):
+        return self._root_component
+
+    @property
+    def activeComponent(self):
+        return self._root_component
+
+    @property
+    def allComponents(self):
+        return Collection(list(self._components.values()))
+
+    @property
+    def appearances(self):
+        return self._appearances
+
+    @property
+    def userParameters(self):
+        return UserParameters(self)
+
+    @property
+    def allParameters(self):
+        return ParameterList(self._parameters)
+
+    @property
+    def fusionUnitsManager(self):
+        return self._units_manager
+
+    @property
+    def unitsManager(self):
+        return self._units_manager
+
+    @property
+    def timeline(self):
+        return Timeline(self)
+
+    def findEntityByToken(self, entity_token):
+        try:
+            session, kind, ids = entity_token.split('/')
+            ids = tuple(int(entity_id) for entity_id in ids.split('.'))
+        except ValueError:
+            return []
+
+        if kind == 'occurrence' and self._is_valid_path(ids):
+            return [Occurrence(self, ids)]
+
+        if kind == 'component' and ids[0] in self._components:
+            return [self._components[ids[0]]]
+
+        return []
+
+    def findAttributes(self, group_name, attribute_name):
+        attributes = []
+
+        for entity_attributes in list(self._entity_attributes.values()):
+            for (group, name), attribute in entity_attributes._by_key.items():
+                if group == group_name and (attribute_name == '' or name == attribute_name):
+                    attributes.append(attribute)
+
+        return attributes
+
+    # Sets every expression, then computes the model once
+    def modifyParameters(self, parameters, values):
+        changes = [(parameter, value._get_expression()) for parameter, value in zip(parameters, values)]
+
+        for parameter, expression in changes:
+            self._evaluate(expression, parameter._unit)
+
+        self._set_expressions(changes)
+        return True
+
+    def computeAll(self):
+        self._is_compute_pending = False
+        self._compute_count += 1
+        simulate_compute()
+        return True
@@ -0,0 +1,147 @@
+# Runs the add-in outside of Fusion 360 against the stand-in adsk package in tests/standin/adsk
+#
+# import fusion_standin first, it puts the stand-in on the path, then load add-in modules with load_addin_module:
+#     SaveViewCommand = fusion_standin.load_addin_module('SaveViewCommand')
+# The add-in is loaded as the FusionDisplayer package, like Fusion 360 loads it, so its relative imports work
+import importlib
+import os
+import sys
+import types
+
+STANDIN_DIR = os.path.dirname(os.path.realpath(__file__))
+ADDIN_DIR = os.path.dirname(os.path.dirname(STANDIN_DIR))
+ADDIN_PACKAGE = 'FusionDisplayer'
+
+if STANDIN_DIR not in sys.path:
+    sys.path.insert(0, STANDIN_DIR)
+
+import adsk.core
+import adsk.fusion
+from adsk import _standin
+
+
+def load_addin_module(module_name):
+    if ADDIN_PACKAGE not in sys.modules:
+        package = types.ModuleType(ADDIN_PACKAGE)
+        package.__path__ = [ADDIN_DIR]
+        sys.modules[ADDIN_PACKAGE] = package
+
+    return importlib.import_module('{}.{}'.format(ADDIN_PACKAGE, module_name))
+
+
+# Seconds every API call takes, the per call cost of the Fusion 360 API is what the add-in optimizes for
+def set_call_latency(seconds):
+    _standin.set_call_latency(seconds)
+
+
+# Seconds every property write takes, on top of the call latency
+def set_write_latency(seconds):
+    _standin.set_write_latency(seconds)
+
+
+# Seconds every model recompute takes, on top of the call latency
+def set_compute_latency(seconds):
+    _standin.set_compute_latency(seconds)
+
+
+def get_call_count() -> int:
+    return _standin.get_call_count()
+
+
+# Starts again with a new application with no documents and empties the add-in's caches
+def reset():
+    set_call_latency(0.0)
+    set_write_latency(0.0)
+    set_compute_latency(0.0)
+    adsk.core.Application._instance = None
+
+    load_addin_module('OccurrenceIndex').clear_occurrence_indexes()
+    load_addin_module('ViewStorage').clear_view_indexes()
+
+
+def get_app() -> adsk.core.Application:
+    return adsk.core.Application.get()
+
+
+def get_ui() -> adsk.core.UserInterface:
+    return adsk.core.Application.get().userInterface
+
+
+# Messages shown with messageBox so far, the add-in reports errors with them
+def get_messages():
+    return adsk.core.Application.get().userInterface._messages
+
+
+# Makes a new design document the active one
+def new_design() -> adsk.fusion.Design:
+    adsk.core.Application.get().documents.add(adsk.core.DocumentTypes.FusionDesignDocumentType)
+    return adsk.core.Application.get().activeProduct
+
+
+# Builds a tree of occurrence_count occurrences in the active design,
+# sub assemblies of branching occurrences of one part under the root, like BenchmarkCommand does
+# Returns the sub assembly and part components
+def build_assembly(design: adsk.fusion.Design, occurrence_count, branching=9):
+    transform = adsk.core.Matrix3D.create()
+    root_comp = design.rootComponent
+
+    sub_occurrence = root_comp.occurrences.addNewComponent(transform)
+    sub_comp = sub_occurrence.component
+    sub_comp.name = 'Sub Assembly'
+
+    part_occurrence = sub_comp.occurrences.addNewComponent(transform)
+    part_comp = part_occurrence.component
+    part_comp.name = 'Part'
+
+    for i in range(branching - 1):
+        sub_comp.occurrences.addExistingComponent(part_comp, transform)
+
+    for i in range(max(1, occurrence_count // (branching + 1)) - 1):
+        root_comp.occurrences.addExistingComponent(sub_comp, transform)
+
+    return sub_comp, part_comp
+
+
+# Copies appearance_count appearances of the appearance library into the design
+def add_appearances(design: adsk.fusion.Design, appearance_count):
+    library = adsk.core.Application.get().materialLibraries.item(0)
+
+    return [design.appearances.addByCopy(library.appearances.item(i), library.appearances.item(i).name)
+            for i in range(appearance_count)]
+
+
+# Closes and opens the document of a design again, every entity token changes
+def reopen(design: adsk.fusion.Design):
+    design._reopen()
+
+
+# Number of times any occurrence light bulb was written
+def get_light_bulb_writes(design: adsk.fusion.Design) -> int:
+    return design._light_bulb_writes
+
+
+# Number of times any appearance was set or cleared
+def get_appearance_writes(design: adsk.fusion.Design) -> int:
+    return design._appearance_writes
+
+
+# Number of times the model was recomputed
+def get_compute_count(design: adsk.fusion.Design) -> int:
+    return design._compute_count
+
+
+# Runs the custom events fired so far, like Fusion 360 does between events
+def process_events():
+    adsk.doEvents()
+
+
+# Adds the toolbar controls of an add-in command and opens its dialog
+# Returns the stand-in adsk.core.Command, use its _preview, _change_input, _ok and _cancel to drive it
+def open_command(command) -> adsk.core.Command:
+    ui = get_ui()
+
+    if ui.commandDefinitions.itemById(command.cmd_id) is None:
+        command.on_run()
+
+    ui.commandDefinitions.itemById(command.cmd_id).execute()
+    return ui._active_command
@@ -0,0 +1,83 @@
+import fusion_standin
+from fusion_standin import load_addin_module
+
+SaveViewCommand = load_addin_module('SaveViewCommand')
+Fusion360Utilities = load_addin_module('Fusion360Utilities.Fusion360Utilities')
+
+
+def build_design(design, occurrence_count=100):
+    fusion_standin.build_assembly(design, occurrence_count)
+    appearances = fusion_standin.add_appearances(design, 3)
+
+    occurrences = list(design.rootComponent.allOccurrences)
+    for i, occurrence in enumerate(occurrences[:50]):
+        occurrence.appearance = appearances[i % len(appearances)]
+
+    return occurrences, appearances
+
+
+def get_appearance_ids(occurrences):
+    return [occurrence.appearance.id if occurrence.appearance is not None else None for occurrence in occurrences]
+
+
+def set_appearances(appearances_object):
+    with Fusion360Utilities.AppObjectsScope():
+        SaveViewCommand.set_appearances(appearances_object)
+
+
+# Entity tokens change when a document is opened again, saved tokens are resolved rather than compared
+def test_token_restore_after_reopen_only_writes_changes(design):
+    occurrences, appearances = build_design(design)
+
+    with Fusion360Utilities.AppObjectsScope():
+        appearances_object = SaveViewCommand.build_appearance_tokens()
+
+    saved_ids = get_appearance_ids(occurrences)
+
+    fusion_standin.reopen(design)
+    occurrences[0].appearance = appearances[2]
+    occurrences[60].appearance = appearances[0]
+
+    start_writes = fusion_standin.get_appearance_writes(design)
+    set_appearances(appearances_object)
+
+    assert get_appearance_ids(occurrences) == saved_ids
+    assert fusion_standin.get_appearance_writes(design) - start_writes == 2
+
+
+def test_attribute_restore(design):
+    occurrences, appearances = build_design(design)
+
+    with Fusion360Utilities.AppObjectsScope():
+        SaveViewCommand.build_appearances('view_1')
+
+    saved_ids = get_appearance_ids(occurrences)
+
+    for occurrence in occurrences[:10]:
+        occurrence.appearance = None
+    occurrences[99].appearance = appearances[1]
+
+    set_appearances('view_1')
+
+    assert get_appearance_ids(occurrences) == saved_ids
+
+
+def test_migrate_appearance_attributes(design):
+    occurrences, appearances = build_design(design)
+
+    with Fusion360Utilities.AppObjectsScope():
+        SaveViewCommand.build_appearances('view_1')
+        view_object = {'name': 'View 1', 'appearances': 'view_1'}
+
+        assert SaveViewCommand.migrate_appearance_attributes(view_object)
+        assert not SaveViewCommand.migrate_appearance_attributes(view_object)
+
+    assert design.findAttributes('displayer_appearances', 'view_1') == []
+
+    saved_ids = get_appearance_ids(occurrences)
+    for occurrence in occurrences:
+        occurrence.appearance = None
+
+    set_appearances(view_object['appearances'])
+
+    assert get_appearance_ids(occurrences) == saved_ids
@@ -0,0 +1,44 @@
+import adsk.core
+
+from fusion_standin import load_addin_module
+
+BenchmarkCommand = load_addin_module('BenchmarkCommand')
+SaveViewCommand = load_addin_module('SaveViewCommand')
+Fusion360Utilities = load_addin_module('Fusion360Utilities.Fusion360Utilities')
+
+
+def test_build_synthetic_design():
+    BenchmarkCommand.build_synthetic_design(100, appearance_count=4, parameter_count=6)
+    design = adsk.core.Application.get().activeProduct
+
+    assert design.rootComponent.allOccurrences.count == 100
+    assert design.appearances.count == 4
+    assert design.userParameters.count == 6
+
+
+def test_run_benchmarks_restores_what_it_changed():
+    BenchmarkCommand.build_synthetic_design(100)
+    design = adsk.core.Application.get().activeProduct
+    occurrences = list(design.rootComponent.allOccurrences)
+    occurrences[3].isLightBulbOn = False
+
+    with Fusion360Utilities.AppObjectsScope():
+        display_state_before = SaveViewCommand.encode_current_display_state()
+        timings = BenchmarkCommand.run_benchmarks()
+
+    assert [name for name, elapsed in timings] == [
+        'encode_current_display_state', 'set_display_state', 'build_appearances', 'set_appearances',
+        'build_parameter_object', 'set_parameters']
+
+    with Fusion360Utilities.AppObjectsScope():
+        assert SaveViewCommand.encode_current_display_state() == display_state_before
+
+    assert [occurrence.isLightBulbOn for occurrence in occurrences].count(False) == 1
+    assert all(occurrence.appearance is not None for occurrence in list(design.rootComponent.occurrences)[::2])
+
+
+def test_format_benchmark_results():
+    lines = BenchmarkCommand.format_benchmark_results([(100, [('set_display_state', 0.0125)])]).split('\n')
+
+    assert len(lines) == 2
+    assert lines[1].split() == ['100', 'set_display_state', '12.5']
@@ -0,0 +1,135 @@
+import pytest
+
+import adsk.core
+import adsk.fusion
+
+import fusion_standin
+from fusion_standin import load_addin_module
+
+Fusion360CallCounter = load_addin_module('Fusion360Utilities.Fusion360CallCounter')
+Fusion360Utilities = load_addin_module('Fusion360Utilities.Fusion360Utilities')
+Fusion360CommandBase = load_addin_module('Fusion360Utilities.Fusion360CommandBase')
+SaveViewCommand = load_addin_module('SaveViewCommand')
+
+
+@pytest.fixture
+def call_counting():
+    Fusion360CallCounter.reset_call_counts()
+    Fusion360CallCounter.enable_call_counting()
+    yield
+    Fusion360CallCounter.disable_call_counting()
+    Fusion360CallCounter.reset_call_counts()
+
+
+def get_call_count(type_name, member):
+    for type_name_, member_, count, total_ms in Fusion360CallCounter.get_call_counts():
+        if (type_name_, member_) == (type_name, member):
+            return count
+    return 0
+
+
+def capture_and_restore():
+    with Fusion360Utilities.AppObjectsScope():
+        display_state_object = SaveViewCommand.encode_current_display_state()
+        appearances_object = SaveViewCommand.build_appearance_tokens()
+        SaveViewCommand.set_display_state(display_state_object, True)
+        SaveViewCommand.set_appearances(appearances_object)
+
+    return display_state_object, appearances_object
+
+
+def build_design(design):
+    fusion_standin.build_assembly(design, 100)
+    appearances = fusion_standin.add_appearances(design, 2)
+
+    for i, occurrence in enumerate(design.rootComponent.occurrences):
+        occurrence.appearance = appearances[i % 2]
+
+    list(design.rootComponent.allOccurrences)[7].isLightBulbOn = False
+
+
+def test_proxies_are_transparent(design, call_counting):
+    build_design(design)
+    counted_results = capture_and_restore()
+
+    Fusion360CallCounter.disable_call_counting()
+    assert capture_and_restore() == counted_results
+
+
+def test_calls_are_counted_by_type_and_member(design, call_counting):
+    build_design(design)
+
+    with Fusion360Utilities.AppObjectsScope() as ao:
+        assert isinstance(ao.app, Fusion360CallCounter.CountingProxy)
+        SaveViewCommand.encode_current_display_state()
+
+    assert get_call_count('Occurrence', 'isLightBulbOn') == 100
+    assert get_call_count('Application', 'activeProduct') == 1
+    assert get_call_count('Design', 'findEntityByToken()') == 0
+
+    call_counts = Fusion360CallCounter.get_call_counts()
+    assert [total_ms for type_name, member, count, total_ms in call_counts] == \
+        sorted([total_ms for type_name, member, count, total_ms in call_counts], reverse=True)
+
+    report = Fusion360CallCounter.format_call_report(limit=3).split('\n')
+    assert len(report) == 5
+    assert report[-1] == '... {} more members'.format(len(call_counts) - 3)
+
+
+def test_writes_and_method_calls_are_counted(design, call_counting):
+    build_design(design)
+
+    with Fusion360Utilities.AppObjectsScope() as ao:
+        occurrence = ao.root_comp.occurrences.item(0)
+        occurrence.isLightBulbOn = False
+
+        assert not fusion_standin.get_app().activeProduct.rootComponent.occurrences.item(0).isLightBulbOn
+        assert get_call_count('Occurrence', 'isLightBulbOn =') == 1
+        assert get_call_count('OccurrenceList', 'item()') == 1
+
+
+def test_cast(design, call_counting):
+    with Fusion360Utilities.AppObjectsScope() as ao:
+        design_proxy = Fusion360CallCounter.cast(adsk.fusion.Design, ao.app.activeProduct)
+
+        assert isinstance(design_proxy, Fusion360CallCounter.CountingProxy)
+        assert Fusion360CallCounter.unwrap(design_proxy) is design
+        assert Fusion360CallCounter.cast(adsk.fusion.Occurrence, ao.app.activeProduct) is None
+
+    assert Fusion360CallCounter.cast(adsk.fusion.Design, design) is design
+
+
+# Commands write the calls they made to the Text Commands palette when they are executed
+def test_command_reports_call_counts(design, call_counting):
+    build_design(design)
+    command_object = SaveViewCommand.CaptureViewCommand({'cmd_id': 'cmdID_CountedCaptureViewCommand'}, False)
+
+    command = fusion_standin.open_command(command_object)
+    command._ok()
+
+    text_commands = fusion_standin.get_ui().palettes.itemById('TextCommands')
+    reports = [line for line in text_commands._lines if line.startswith('cmdID_CountedCaptureViewCommand')]
+
+    assert len(reports) == 1
+    assert 'Occurrence.isLightBulbOn' in reports[0]
+    assert Fusion360CallCounter.get_call_counts() == []
+
+
+
+# Every helper called by an execute shares the AppObjects of the event, so the top level objects are resolved once
+def test_execute_resolves_app_objects_once(design, call_counting, monkeypatch):
+    build_design(design)
+    command_object = SaveViewCommand.CaptureViewCommand({'cmd_id': 'cmdID_ScopedCaptureViewCommand'}, False)
+
+    command = fusion_standin.open_command(command_object)
+    Fusion360CallCounter.reset_call_counts()
+
+    # Keeps the counts the command reports when it is executed
+    monkeypatch.setattr(Fusion360CommandBase, 'reset_call_counts', lambda: None)
+    command._ok()
+
+    application_call_counts = {member: count for type_name, member, count, total_ms
+                               in Fusion360CallCounter.get_call_counts() if type_name == 'Application'}
+
+    assert {'activeProduct', 'activeDocument', 'activeViewport'} <= set(application_call_counts)
+    assert set(application_call_counts.values()) == {1}
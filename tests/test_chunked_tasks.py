@@ -0,0 +1,71 @@
+import fusion_standin
+from fusion_standin import load_addin_module
+
+SaveViewCommand = load_addin_module('SaveViewCommand')
+OccurrenceIndex = load_addin_module('OccurrenceIndex')
+ViewStorage = load_addin_module('ViewStorage')
+Fusion360Utilities = load_addin_module('Fusion360Utilities.Fusion360Utilities')
+
+
+def get_capture_command():
+    return SaveViewCommand.CaptureViewCommand({'cmd_id': 'cmdID_ChunkedCaptureViewCommand', 'chunk_threshold': 10},
+                                              False)
+
+
+def get_view_names(document):
+    return [attribute.name for attribute in document.attributes.itemsByGroup('displayer_custom_views')]
+
+
+def test_chunked_capture_saves_to_the_document_it_started_in(design):
+    fusion_standin.build_assembly(design, 100)
+    document = design.parentDocument
+    command_object = get_capture_command()
+
+    command = fusion_standin.open_command(command_object)
+    command._ok()
+
+    assert len(command_object.chunked_tasks) == 1
+    assert command_object.progress_dialog.maximumValue == 100
+    assert get_view_names(document) == []
+
+    other_document = fusion_standin.new_design().parentDocument
+    fusion_standin.process_events()
+
+    assert command_object.chunked_tasks == []
+    assert get_view_names(document) == ['Custom View 0']
+    assert get_view_names(other_document) == []
+
+    document.activate()
+    with Fusion360Utilities.AppObjectsScope():
+        view_object = ViewStorage.get_view_index().get_view('Custom View 0')
+
+    assert view_object['display_state'] is not None
+
+
+def test_cancelled_chunked_capture_saves_nothing(design):
+    fusion_standin.build_assembly(design, 100)
+    command_object = get_capture_command()
+
+    command = fusion_standin.open_command(command_object)
+    command._ok()
+    command_object.progress_dialog._cancel()
+    fusion_standin.process_events()
+
+    assert command_object.chunked_tasks == []
+    assert command_object.progress_dialog is None
+    assert get_view_names(design.parentDocument) == []
+
+
+# Scoped captures and restores only walk the subtrees of their scope, the progress total is their size
+def test_step_count_is_the_size_of_the_scope(design):
+    fusion_standin.build_assembly(design, 100)
+    scope_occurrences = [design.rootComponent.occurrences.item(1), design.rootComponent.occurrences.item(3)]
+
+    with Fusion360Utilities.AppObjectsScope():
+        display_state_object = SaveViewCommand.encode_scoped_display_state(scope_occurrences)
+        occurrence_index = OccurrenceIndex.get_occurrence_index()
+
+        assert SaveViewCommand.get_display_state_step_count(occurrence_index) == 100
+        assert SaveViewCommand.get_display_state_step_count(occurrence_index, scope_occurrences) == 20
+        assert SaveViewCommand.get_display_state_step_count(occurrence_index, scope_occurrences[:1]) == 10
+        assert SaveViewCommand.get_display_state_step_count(occurrence_index, None, display_state_object) == 20
@@ -0,0 +1,137 @@
+import adsk.core
+
+import fusion_standin
+from fusion_standin import load_addin_module
+
+Fusion360CommandBase = load_addin_module('Fusion360Utilities.Fusion360CommandBase')
+
+
+# Keeps a copy of the input_values of every event, and sets an input from code like commands often do
+class RecordingCommand(Fusion360CommandBase.Fusion360CommandBase):
+    def __init__(self, cmd_def, debug):
+        super().__init__(cmd_def, debug)
+        self.events = []
+
+    def on_create(self, command: adsk.core.Command, inputs: adsk.core.CommandInputs):
+        inputs.addStringValueInput('name_input', 'Name', 'First')
+        inputs.addBoolValueInput('check_input', 'Check', True, '', False)
+        inputs.addStringValueInput('copy_input', 'Copy', '')
+
+        drop_down = inputs.addDropDownCommandInput('drop_down_input', 'Drop Down',
+                                                   adsk.core.DropDownStyles.TextListDropDownStyle)
+        drop_down.listItems.add('First', True)
+        drop_down.listItems.add('Second', False)
+
+    def on_input_changed(self, command: adsk.core.Command, inputs: adsk.core.CommandInputs, changed_input,
+                         input_values):
+        self.events.append(('input_changed', dict(input_values)))
+
+        # Fusion 360 fires no input changed event for this
+        if changed_input.id == 'name_input':
+            inputs.itemById('copy_input').value = changed_input.value
+
+    def on_preview(self, command: adsk.core.Command, inputs: adsk.core.CommandInputs, args, input_values):
+        self.events.append(('preview', dict(input_values)))
+
+
+def run_dialog(incremental):
+    command_object = RecordingCommand({'cmd_id': 'cmdID_RecordingCommand', 'incremental_inputs': incremental},
+                                      False)
+    command = fusion_standin.open_command(command_object)
+    command_inputs = command.commandInputs
+    command._preview()
+
+    name_input = command_inputs.itemById('name_input')
+    name_input.value = 'Second'
+    command._change_input(name_input)
+    command._preview()
+
+    drop_down_input = command_inputs.itemById('drop_down_input')
+    drop_down_input.listItems.item(1).isSelected = True
+    command._change_input(drop_down_input)
+
+    check_input = command_inputs.itemById('check_input')
+    check_input.value = True
+    command._change_input(check_input)
+    command._preview()
+    command._cancel()
+
+    return [(event, {key: value for key, value in input_values.items()
+                     if not isinstance(value, adsk.core.CommandInput)})
+            for event, input_values in command_object.events]
+
+
+def test_incremental_inputs_match_full_inputs(design):
+    full_events = run_dialog(False)
+    fusion_standin.reset()
+    fusion_standin.new_design()
+    incremental_events = run_dialog(True)
+
+    assert incremental_events == full_events
+
+
+# Previews read every input, including the ones set from code since the last input changed event
+def test_preview_sees_inputs_changed_from_code(design):
+    events = run_dialog(True)
+
+    assert events[2] == ('preview', {'name_input': 'Second', 'check_input': False, 'copy_input': 'Second',
+                                     'drop_down_input': 'First'})
+    assert events[-1][1]['drop_down_input'] == 'Second'
+    assert events[-1][1]['check_input']
+
+
+# Adds a group and a tab to the inputs of RecordingCommand, with inputs inside them
+class GroupRecordingCommand(RecordingCommand):
+    def on_create(self, command: adsk.core.Command, inputs: adsk.core.CommandInputs):
+        super().on_create(command, inputs)
+
+        group_input = inputs.addGroupCommandInput('group_input', 'Group')
+        group_input.children.addStringValueInput('group_name_input', 'Group Name', 'Group First')
+        group_input.children.addBoolValueInput('group_check_input', 'Group Check', True, '', False)
+
+        tab_input = inputs.addTabCommandInput('tab_input', 'Tab')
+        tab_input.children.addIntegerSpinnerCommandInput('tab_count_input', 'Count', 0, 10, 1, 1)
+
+    def on_input_changed(self, command: adsk.core.Command, inputs: adsk.core.CommandInputs, changed_input,
+                         input_values):
+        super().on_input_changed(command, inputs, changed_input, input_values)
+
+        # An input added to a group from code, Fusion 360 fires no input changed event for this either
+        if changed_input.id == 'group_check_input' and inputs.itemById('group_added_input') is None:
+            inputs.itemById('group_input').children.addStringValueInput('group_added_input', 'Added', 'Added')
+
+
+def run_group_dialog(incremental):
+    command_object = GroupRecordingCommand({'cmd_id': 'cmdID_GroupRecordingCommand',
+                                            'incremental_inputs': incremental}, False)
+    command = fusion_standin.open_command(command_object)
+    command_inputs = command.commandInputs
+    command._preview()
+
+    for input_id, value in [('group_name_input', 'Group Second'), ('tab_count_input', 5),
+                            ('group_check_input', True), ('group_added_input', 'Changed'), ('tab_count_input', 6)]:
+        changed_input = command_inputs.itemById(input_id)
+        changed_input.value = value
+        command._change_input(changed_input)
+
+    command._preview()
+    command._cancel()
+
+    return [(event, {key: value for key, value in input_values.items()
+                     if not isinstance(value, adsk.core.CommandInput)})
+            for event, input_values in command_object.events]
+
+
+# Inputs in groups and tabs are read like the other inputs, whether one input or every input is read
+def test_incremental_inputs_in_groups_match_full_inputs(design):
+    full_events = run_group_dialog(False)
+    fusion_standin.reset()
+    fusion_standin.new_design()
+    incremental_events = run_group_dialog(True)
+
+    assert incremental_events == full_events
+
+    assert full_events[-1] == ('preview', {
+        'name_input': 'First', 'check_input': False, 'copy_input': '', 'drop_down_input': 'First',
+        'group_input': 'Group', 'group_name_input': 'Group Second', 'group_check_input': True,
+        'group_added_input': 'Changed', 'tab_input': 'Tab', 'tab_count_input': 6})
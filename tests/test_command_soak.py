@@ -0,0 +1,61 @@
+import gc
+import tracemalloc
+
+import fusion_standin
+from fusion_standin import load_addin_module
+
+SaveViewCommand = load_addin_module('SaveViewCommand')
+Fusion360CommandBase = load_addin_module('Fusion360Utilities.Fusion360CommandBase')
+
+SOAK_DIALOGS = 10000
+
+# Allowed growth of traced memory over the soak, well below a few hundred bytes per dialog
+MAX_GROWTH_BYTES = 256 * 1024
+
+
+def open_and_cancel(command_object):
+    command = fusion_standin.open_command(command_object)
+    command._preview()
+
+    view_name_input = command.commandInputs.itemById('view_name_id')
+    view_name_input.value = 'Soak View'
+    command._change_input(view_name_input)
+
+    command._preview()
+    command._cancel()
+
+
+def get_traced_memory():
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+# Opening a command dialog over and over must not keep anything of the dialogs that were closed
+def test_command_dialogs_release_their_handlers(design):
+    fusion_standin.build_assembly(design, 100)
+
+    command_object = SaveViewCommand.CaptureViewCommand({'cmd_id': 'cmdID_SoakCaptureViewCommand',
+                                                         'incremental_inputs': True}, False)
+
+    # The command is added on the first dialog, caches and rolling windows fill up during the first few hundred
+    for i in range(500):
+        open_and_cancel(command_object)
+
+    global_handler_count = len(Fusion360CommandBase.handlers)
+
+    tracemalloc.start()
+
+    try:
+        start_memory = get_traced_memory()
+
+        for i in range(SOAK_DIALOGS):
+            open_and_cancel(command_object)
+
+        growth = get_traced_memory() - start_memory
+
+    finally:
+        tracemalloc.stop()
+
+    assert command_object.live_handler_count() == 0
+    assert len(Fusion360CommandBase.handlers) == global_handler_count
+    assert growth < MAX_GROWTH_BYTES
@@ -0,0 +1,73 @@
+import pytest
+
+from fusion_standin import load_addin_module
+
+Fusion360CommandTiming = load_addin_module('Fusion360Utilities.Fusion360CommandTiming')
+
+
+@pytest.fixture
+def command_timings():
+    Fusion360CommandTiming.reset_command_timings()
+    yield
+    Fusion360CommandTiming.reset_command_timings()
+
+
+def test_percentiles():
+    samples = list(range(101))
+
+    for percentile in [0, 1, 50, 95, 99, 100]:
+        assert Fusion360CommandTiming.get_percentile(samples, percentile) == percentile
+
+    assert Fusion360CommandTiming.get_percentile([], 50) is None
+    assert Fusion360CommandTiming.get_percentile([7], 95) == 7
+    assert Fusion360CommandTiming.get_percentile([1, 2, 3, 4], 95) == 4
+    assert Fusion360CommandTiming.get_percentile([1, 2, 3, 4], 0) == 1
+
+    # Nearest rank over 20 samples: rank round(0.95 * 19) = 18
+    assert Fusion360CommandTiming.get_percentile(list(range(10, 30)), 95) == 28
+
+
+def test_stats_of_samples_recorded_in_any_order(command_timings):
+    for value in [0.004, 0.001, 0.003, 0.002, 0.005]:
+        Fusion360CommandTiming.record_command_timing('cmdID_Test', 'execute', value)
+    Fusion360CommandTiming.record_command_timing('cmdID_Other', 'previews', 2)
+
+    assert Fusion360CommandTiming.get_command_timing_stats('cmdID_Test') == {
+        'cmdID_Test': {'execute': {'count': 5, 'samples': 5, 'p50': 0.003, 'p95': 0.005, 'max': 0.005}}
+    }
+    assert sorted(Fusion360CommandTiming.get_command_timing_stats()) == ['cmdID_Other', 'cmdID_Test']
+    assert Fusion360CommandTiming.get_command_timing_stats('cmdID_Missing') == {}
+
+    assert Fusion360CommandTiming.format_command_timing_stats('cmdID_Other').split('\n') == [
+        'cmdID_Other', '    previews: 1 x, p50 2, p95 2, max 2']
+
+
+# Only the most recent ROLLING_WINDOW samples are used for the percentiles, every sample is counted
+def test_rolling_window_evicts_oldest_samples(command_timings):
+    window = Fusion360CommandTiming.ROLLING_WINDOW
+    assert window == 256
+
+    for value in range(window + 44):
+        Fusion360CommandTiming.record_command_timing('cmdID_Test', 'execute', value)
+
+    execute_stats = Fusion360CommandTiming.get_command_timing_stats('cmdID_Test')['cmdID_Test']['execute']
+    window_samples = list(range(44, window + 44))
+
+    assert execute_stats == {
+        'count': window + 44,
+        'samples': window,
+        'p50': Fusion360CommandTiming.get_percentile(window_samples, 50),
+        'p95': Fusion360CommandTiming.get_percentile(window_samples, 95),
+        'max': window + 43
+    }
+
+    # Nearest ranks round(0.5 * 255) = 128 and round(0.95 * 255) = 242 of the window starting at 44
+    assert (execute_stats['p50'], execute_stats['p95']) == (172, 286)
+
+    # Small values recorded last are in the window, the evicted large ones no longer count
+    for value in range(window):
+        Fusion360CommandTiming.record_command_timing('cmdID_Test', 'execute', -value)
+
+    execute_stats = Fusion360CommandTiming.get_command_timing_stats('cmdID_Test')['cmdID_Test']['execute']
+    assert execute_stats['max'] == 0
+    assert execute_stats['count'] == 2 * window + 44
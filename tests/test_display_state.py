@@ -0,0 +1,253 @@
+import json
+
+import fusion_standin
+from fusion_standin import load_addin_module
+
+SaveViewCommand = load_addin_module('SaveViewCommand')
+DisplayStateEncoding = load_addin_module('DisplayStateEncoding')
+OccurrenceIndex = load_addin_module('OccurrenceIndex')
+Fusion360CallCounter = load_addin_module('Fusion360Utilities.Fusion360CallCounter')
+Fusion360Utilities = load_addin_module('Fusion360Utilities.Fusion360Utilities')
+
+
+def capture():
+    with Fusion360Utilities.AppObjectsScope():
+        return SaveViewCommand.encode_current_display_state()
+
+
+def restore(display_state_object, diff_only):
+    with Fusion360Utilities.AppObjectsScope():
+        return SaveViewCommand.set_display_state(display_state_object, diff_only)
+
+
+def test_diff_only_restore_writes_only_changed_occurrences(design):
+    fusion_standin.build_assembly(design, 100)
+    occurrences = list(design.rootComponent.allOccurrences)
+    occurrences[5].isLightBulbOn = False
+
+    display_state_object = capture()
+
+    for occurrence in occurrences[10:13]:
+        occurrence.isLightBulbOn = False
+    occurrences[5].isLightBulbOn = True
+
+    start_writes = fusion_standin.get_light_bulb_writes(design)
+    result = restore(display_state_object, True)
+
+    assert result == {'written': 4, 'skipped': 96}
+    assert fusion_standin.get_light_bulb_writes(design) - start_writes == 4
+    assert [occurrence.isLightBulbOn for occurrence in occurrences] == [i != 5 for i in range(100)]
+
+
+def test_full_restore_writes_every_occurrence(design):
+    fusion_standin.build_assembly(design, 100)
+    display_state_object = capture()
+
+    result = restore(display_state_object, False)
+
+    assert result == {'written': 100, 'skipped': 0}
+
+
+# Without a usable bitset the sparse states are restored through the occurrence index
+def test_diff_only_restore_after_occurrences_were_added(design):
+    sub_comp, part_comp = fusion_standin.build_assembly(design, 100)
+    occurrences = list(design.rootComponent.allOccurrences)
+    occurrences[0].isLightBulbOn = False
+
+    display_state_object = capture()
+
+    design.rootComponent.occurrences.addExistingComponent(part_comp, None)
+    occurrences[0].isLightBulbOn = True
+    occurrences[1].isLightBulbOn = False
+
+    result = restore(display_state_object, True)
+
+    assert result['written'] == 2
+    assert not occurrences[0].isLightBulbOn
+    assert occurrences[1].isLightBulbOn
+
+
+def get_hidden_paths(design):
+    return sorted(occurrence.fullPathName for occurrence in design.rootComponent.allOccurrences
+                  if not occurrence.isLightBulbOn)
+
+
+# Renames change occurrence paths, a capture after one must not use paths from before it
+def test_capture_after_rename_stores_current_paths(design):
+    sub_comp, part_comp = fusion_standin.build_assembly(design, 100)
+    list(design.rootComponent.allOccurrences)[1].isLightBulbOn = False
+    capture()
+
+    part_comp.name = 'Renamed Part'
+    display_state_object = capture()
+
+    default, states = DisplayStateEncoding.decode_display_state(display_state_object)
+    assert {path: state for path, state in states.items() if state != default} == \
+        {'Sub Assembly:1+Renamed Part:1': False}
+
+    for occurrence in design.rootComponent.allOccurrences:
+        occurrence.isLightBulbOn = True
+
+    restore(display_state_object, True)
+
+    assert get_hidden_paths(design) == ['Sub Assembly:1+Renamed Part:1']
+
+
+# Occurrences renamed since the view was saved are found by their entity token,
+# which is different in a document opened again
+def test_restore_after_rename_and_reopen(design):
+    sub_comp, part_comp = fusion_standin.build_assembly(design, 100)
+    occurrences = list(design.rootComponent.allOccurrences)
+    occurrences[1].isLightBulbOn = False
+    occurrences[12].isLightBulbOn = False
+
+    display_state_object = capture()
+
+    fusion_standin.reopen(design)
+    part_comp.name = 'Renamed Part'
+    for occurrence in occurrences:
+        occurrence.isLightBulbOn = True
+
+    restore(display_state_object, True)
+
+    assert get_hidden_paths(design) == ['Sub Assembly:1+Renamed Part:1', 'Sub Assembly:2+Renamed Part:2']
+
+
+def test_bitset_round_trip():
+    for states in [[], [True], [False] * 9, [True, False] * 8 + [False], [i % 7 == 0 for i in range(100)]]:
+        bits = DisplayStateEncoding.bits_from_states(states)
+        bitset_object = DisplayStateEncoding.encode_display_state_bits('fingerprint', len(states), bits)
+        display_state_object = {'format': DisplayStateEncoding.SPARSE_FORMAT,
+                                'version': DisplayStateEncoding.SPARSE_VERSION, 'bitset': bitset_object}
+
+        assert DisplayStateEncoding.decode_display_state_bits(display_state_object) == \
+            ('fingerprint', len(states), bits)
+        assert list(DisplayStateEncoding.iter_set_bits(bits)) == [i for i, state in enumerate(states) if state]
+
+    assert DisplayStateEncoding.decode_display_state_bits({'Sub Assembly:1': True}) is None
+
+
+# The XOR of two bitsets has a bit set for every occurrence whose state differs
+def test_set_bits_of_differences():
+    saved_states = [i % 3 == 0 for i in range(70)]
+    current_states = list(saved_states)
+    for position in [0, 8, 63, 64, 69]:
+        current_states[position] = not current_states[position]
+
+    differences = DisplayStateEncoding.bits_from_states(saved_states) ^ \
+        DisplayStateEncoding.bits_from_states(current_states)
+
+    assert list(DisplayStateEncoding.iter_set_bits(differences)) == [0, 8, 63, 64, 69]
+
+
+def test_diff_only_restore_from_bitset(design):
+    fusion_standin.build_assembly(design, 100)
+    occurrences = list(design.rootComponent.allOccurrences)
+    occurrences[3].isLightBulbOn = False
+
+    display_state_object = capture()
+    with Fusion360Utilities.AppObjectsScope():
+        occurrence_index = OccurrenceIndex.get_occurrence_index()
+        bits = SaveViewCommand.get_usable_display_state_bits(display_state_object, occurrence_index)
+
+    assert bits == DisplayStateEncoding.bits_from_states([i != 3 for i in range(100)])
+
+    occurrences[3].isLightBulbOn = True
+    occurrences[50].isLightBulbOn = False
+
+    start_writes = fusion_standin.get_light_bulb_writes(design)
+    steps = SaveViewCommand.iter_set_display_state_bits(bits, occurrence_index, True)
+    result = SaveViewCommand.run_steps(steps)
+
+    assert result == {'written': 2, 'skipped': 98}
+    assert fusion_standin.get_light_bulb_writes(design) - start_writes == 2
+    assert [occurrence.isLightBulbOn for occurrence in occurrences] == [i != 3 for i in range(100)]
+
+
+# A bitset saved for another occurrence ordering is not used, the sparse states are restored instead
+def test_restore_with_other_ordering_fingerprint(design):
+    fusion_standin.build_assembly(design, 100)
+    occurrences = list(design.rootComponent.allOccurrences)
+    occurrences[3].isLightBulbOn = False
+
+    display_state_object = capture()
+
+    # Bits that would hide every occurrence if they were used
+    display_state_object['bitset'] = DisplayStateEncoding.encode_display_state_bits(
+        'other ordering', 100, DisplayStateEncoding.bits_from_states([False] * 100))
+
+    with Fusion360Utilities.AppObjectsScope():
+        assert SaveViewCommand.get_usable_display_state_bits(
+            display_state_object, OccurrenceIndex.get_occurrence_index()) is None
+
+    occurrences[3].isLightBulbOn = True
+    occurrences[50].isLightBulbOn = False
+
+    result = restore(display_state_object, True)
+
+    assert result == {'written': 2, 'skipped': 98}
+    assert [occurrence.isLightBulbOn for occurrence in occurrences] == [i != 3 for i in range(100)]
+
+
+# Views saved before the sparse format store {fullPathName: isLightBulbOn} and leave unlisted occurrences alone
+def test_restore_legacy_view(design):
+    fusion_standin.build_assembly(design, 100)
+    occurrences = list(design.rootComponent.allOccurrences)
+    legacy_state = {occurrences[i].fullPathName: i != 1 for i in [0, 1, 2]}
+
+    assert DisplayStateEncoding.decode_display_state(legacy_state) == (None, legacy_state)
+
+    design.parentDocument.attributes.add('displayer_custom_views', 'Custom View 1',
+                                         json.dumps({'name': 'Legacy', 'display_state': legacy_state}))
+
+    occurrences[0].isLightBulbOn = False
+    occurrences[50].isLightBulbOn = False
+
+    command = fusion_standin.open_command(SaveViewCommand.SetViewCommand(
+        {'cmd_id': 'cmdID_LegacySetViewCommand', 'custom_view_number': 1}, False))
+    command._ok()
+
+    assert [occurrence.isLightBulbOn for occurrence in occurrences] == [i not in [1, 50] for i in range(100)]
+
+
+# The change key only reads counts, a rename leaves it and the cached occurrence index as they are
+def test_change_key_reads_no_component_names(design):
+    sub_comp, part_comp = fusion_standin.build_assembly(design, 100)
+    change_key = OccurrenceIndex.get_design_change_key(design)
+
+    Fusion360CallCounter.reset_call_counts()
+    Fusion360CallCounter.enable_call_counting()
+
+    try:
+        with Fusion360Utilities.AppObjectsScope():
+            occurrence_index = OccurrenceIndex.get_occurrence_index()
+            part_comp.name = 'Renamed Part'
+            assert OccurrenceIndex.get_occurrence_index() is occurrence_index
+
+        counted_members = set((type_name, member) for type_name, member, count, total_ms
+                              in Fusion360CallCounter.get_call_counts())
+    finally:
+        Fusion360CallCounter.disable_call_counting()
+        Fusion360CallCounter.reset_call_counts()
+
+    assert ('Component', 'name') not in counted_members
+    assert ('Design', 'allComponents') not in counted_members
+    assert OccurrenceIndex.get_design_change_key(design) == change_key
+
+
+# A restore that looks up a path the cached index does not know yet finds it by its entity token
+def test_restore_of_paths_renamed_after_the_index_was_built(design):
+    sub_comp, part_comp = fusion_standin.build_assembly(design, 100)
+    capture()
+
+    part_comp.name = 'Renamed Part'
+    occurrences = list(design.rootComponent.allOccurrences)
+    tokens = {occurrence.fullPathName: occurrence.entityToken for occurrence in occurrences}
+
+    # Saved without a bitset, by a copy of the add-in that saw the rename
+    display_state_object = DisplayStateEncoding.encode_display_state(
+        {occurrence.fullPathName: i != 1 for i, occurrence in enumerate(occurrences)}, tokens.get)
+
+    restore(display_state_object, True)
+
+    assert get_hidden_paths(design) == ['Sub Assembly:1+Renamed Part:1']
@@ -0,0 +1,80 @@
+import adsk.core
+
+import fusion_standin
+from fusion_standin import load_addin_module
+
+SaveViewCommand = load_addin_module('SaveViewCommand')
+Fusion360Utilities = load_addin_module('Fusion360Utilities.Fusion360Utilities')
+
+
+# Every other parameter depends on the one before it
+def add_parameters(design, parameter_count):
+    for i in range(parameter_count):
+        if i % 2 == 1:
+            expression = 'width_{} + 1 mm'.format(i - 1)
+        else:
+            expression = '{} mm'.format(i + 1)
+
+        design.userParameters.add('width_{}'.format(i), adsk.core.ValueInput.createByString(expression), 'mm', '')
+
+
+def get_changed_parameter_object():
+    with Fusion360Utilities.AppObjectsScope():
+        parameter_object = SaveViewCommand.build_parameter_object(False)
+
+    return {name: dict(parameter, expression=parameter['expression'] + ' * 2')
+            for name, parameter in parameter_object.items()}
+
+
+def set_parameters(parameter_object, batched):
+    with Fusion360Utilities.AppObjectsScope():
+        return SaveViewCommand.set_parameters(parameter_object, batched)
+
+
+def get_values(design):
+    return {parameter.name: round(parameter.value, 6) for parameter in design.userParameters}
+
+
+def test_batched_parameters_compute_once(design):
+    add_parameters(design, 10)
+    parameter_object = get_changed_parameter_object()
+
+    start_computes = fusion_standin.get_compute_count(design)
+    result = set_parameters(parameter_object, True)
+
+    assert result['changed'] == 10
+    assert fusion_standin.get_compute_count(design) - start_computes == 1
+    assert design.userParameters.itemByName('width_1').expression == 'width_0 + 1 mm * 2'
+    assert get_values(design)['width_1'] == 0.4
+
+
+def test_batched_and_unbatched_parameters_match(design):
+    add_parameters(design, 10)
+    parameter_object = get_changed_parameter_object()
+
+    start_computes = fusion_standin.get_compute_count(design)
+    result = set_parameters(parameter_object, False)
+    unbatched_values = get_values(design)
+
+    assert result['changed'] == 10
+    assert fusion_standin.get_compute_count(design) - start_computes == 10
+
+    fusion_standin.reset()
+    design = fusion_standin.new_design()
+    add_parameters(design, 10)
+    set_parameters(parameter_object, True)
+
+    assert get_values(design) == unbatched_values
+
+
+def test_unchanged_parameters_are_not_applied(design):
+    add_parameters(design, 4)
+
+    with Fusion360Utilities.AppObjectsScope():
+        parameter_object = SaveViewCommand.build_parameter_object(False)
+
+    start_computes = fusion_standin.get_compute_count(design)
+    result = set_parameters(parameter_object, True)
+
+    assert result['changed'] == 0
+    assert fusion_standin.get_compute_count(design) == start_computes
@@ -0,0 +1,80 @@
+import json
+
+import fusion_standin
+from fusion_standin import load_addin_module
+
+SaveViewCommand = load_addin_module('SaveViewCommand')
+Fusion360PerfHistory = load_addin_module('Fusion360Utilities.Fusion360PerfHistory')
+
+
+# The model size is read once when a dialog is created, not for every sample the dialog records
+def test_model_size_is_read_once_per_dialog(design, tmp_path):
+    fusion_standin.build_assembly(design, 100)
+    model_size_reads = []
+
+    def get_model_size():
+        model_size_reads.append(SaveViewCommand.get_model_size())
+        return model_size_reads[-1]
+
+    file_name = str(tmp_path / 'PerfHistory.jsonl')
+    Fusion360PerfHistory.enable_perf_history(file_name, '1.0.0', get_model_size)
+
+    try:
+        command = fusion_standin.open_command(SaveViewCommand.CaptureViewCommand(
+            {'cmd_id': 'cmdID_HistoryCaptureViewCommand'}, False))
+        command._preview()
+        command._change_input(command.commandInputs.itemById('view_name_id'))
+        command._preview()
+        command._ok()
+
+    finally:
+        Fusion360PerfHistory.disable_perf_history()
+
+    with open(file_name) as f:
+        samples = [json.loads(line) for line in f]
+
+    assert model_size_reads == [100]
+    assert len(samples) > 5
+    assert all(sample['size'] == 100 and sample['version'] == '1.0.0' for sample in samples)
+
+
+# Records ten samples of each {(cmd_id, metric): value}
+def record_samples(version, values, file_name):
+    Fusion360PerfHistory.enable_perf_history(file_name, version)
+
+    try:
+        for (cmd_id, metric), value in values.items():
+            for i in range(10):
+                Fusion360PerfHistory.record_perf_sample(cmd_id, metric, value)
+    finally:
+        Fusion360PerfHistory.disable_perf_history()
+
+
+# Times and counts each have their own noise threshold, a count that grew by one is not a regression
+def test_regressions_of_times_and_counts(tmp_path):
+    file_name = str(tmp_path / 'PerfHistory.jsonl')
+
+    record_samples('1.0.0', {('cmdID_Test', 'execute'): 0.010, ('cmdID_Test', 'preview'): 0.001,
+                             ('cmdID_Test', 'previews'): 2, ('cmdID_Other', 'previews'): 3}, file_name)
+    Fusion360PerfHistory.enable_perf_history(file_name, '1.0.0')
+    Fusion360PerfHistory.save_perf_baseline()
+    Fusion360PerfHistory.disable_perf_history()
+
+    record_samples('1.1.0', {('cmdID_Test', 'execute'): 0.030, ('cmdID_Test', 'preview'): 0.003,
+                             ('cmdID_Test', 'previews'): 5, ('cmdID_Other', 'previews'): 4}, file_name)
+    Fusion360PerfHistory.enable_perf_history(file_name, '1.1.0')
+
+    try:
+        baseline = Fusion360PerfHistory.load_perf_baseline()
+        regressions = Fusion360PerfHistory.find_regressions(baseline)
+        report = Fusion360PerfHistory.format_perf_report(baseline, regressions)
+    finally:
+        Fusion360PerfHistory.disable_perf_history()
+
+    assert [(regression['cmd'], regression['metric'], regression['baseline_p95'], regression['p95'])
+            for regression in regressions] == \
+        [('cmdID_Test', 'execute', 0.010, 0.030), ('cmdID_Test', 'previews', 2, 5)]
+
+    assert report.splitlines()[1:] == [
+        'cmdID_Test execute (no model): p95 10.00 ms -> 30.00 ms, 3.0 x over 10 samples',
+        'cmdID_Test previews (no model): p95 2 -> 5, 2.5 x over 10 samples']
@@ -0,0 +1,109 @@
+import json
+
+import pytest
+
+from fusion_standin import load_addin_module
+
+Fusion360Profiler = load_addin_module('Fusion360Utilities.Fusion360Profiler')
+
+
+@pytest.fixture
+def profiler():
+    Fusion360Profiler.reset()
+    Fusion360Profiler.enable(record_trace=True)
+    yield Fusion360Profiler.get_profiler()
+    Fusion360Profiler.disable()
+    Fusion360Profiler.reset()
+
+
+@Fusion360Profiler.profiled()
+def set_camera():
+    return 'camera'
+
+
+@Fusion360Profiler.profiled('restore states')
+def set_states():
+    with Fusion360Profiler.span('write'):
+        raise RuntimeError('Write failed')
+
+
+def restore_view():
+    with Fusion360Profiler.span('restore view'):
+        assert set_camera() == 'camera'
+        with Fusion360Profiler.span('display state'):
+            with Fusion360Profiler.span('write'):
+                pass
+            with Fusion360Profiler.span('write'):
+                pass
+
+
+def test_nested_spans(profiler):
+    restore_view()
+    restore_view()
+
+    with pytest.raises(RuntimeError):
+        set_states()
+
+    span_stats = Fusion360Profiler.get_span_stats()
+
+    assert {path: path_stats['count'] for path, path_stats in span_stats.items()} == {
+        'restore view': 2,
+        'restore view/set_camera': 2,
+        'restore view/display state': 2,
+        'restore view/display state/write': 4,
+        'restore states': 1,
+        'restore states/write': 1
+    }
+
+    assert profiler.stack == []
+    assert span_stats['restore view']['total_ms'] >= span_stats['restore view/display state']['total_ms'] >= \
+        span_stats['restore view/display state/write']['total_ms']
+    assert all(path_stats['max_ms'] <= path_stats['total_ms'] for path_stats in span_stats.values())
+
+
+def test_chrome_trace(profiler, tmp_path):
+    restore_view()
+
+    file_name = str(tmp_path / 'trace.json')
+    assert Fusion360Profiler.export_chrome_trace(file_name) == 5
+
+    with open(file_name) as f:
+        trace = json.load(f)
+
+    assert trace['displayTimeUnit'] == 'ms'
+
+    events = trace['traceEvents']
+    assert [(event['name'], event['args']['depth']) for event in events] == [
+        ('set_camera', 1), ('write', 2), ('write', 2), ('display state', 1), ('restore view', 0)]
+
+    for event in events:
+        assert event['ph'] == 'X'
+        assert (event['pid'], event['tid']) == (1, 1)
+        assert event['ts'] >= 0 and event['dur'] >= 0
+
+    # Complete events of enclosed spans lie within the events of the spans around them
+    def encloses(outer, inner):
+        return outer['ts'] <= inner['ts'] + 1e-3 and inner['ts'] + inner['dur'] <= outer['ts'] + outer['dur'] + 1e-3
+
+    set_camera_event, first_write, second_write, display_state, restore_view_event = events
+    assert all(encloses(restore_view_event, event) for event in events[:4])
+    assert encloses(display_state, first_write) and encloses(display_state, second_write)
+    assert first_write['ts'] + first_write['dur'] <= second_write['ts'] + 1e-3
+    assert set_camera_event['ts'] + set_camera_event['dur'] <= display_state['ts'] + 1e-3
+
+
+def test_trace_event_limit(profiler, tmp_path):
+    profiler.max_trace_events = 3
+    restore_view()
+
+    assert Fusion360Profiler.export_chrome_trace(str(tmp_path / 'trace.json')) == 3
+    assert Fusion360Profiler.get_span_stats()['restore view']['count'] == 1
+
+
+def test_disabled_profiler_records_nothing(tmp_path):
+    Fusion360Profiler.reset()
+    restore_view()
+
+    assert not Fusion360Profiler.is_enabled()
+    assert Fusion360Profiler.get_span_stats() == {}
+    assert Fusion360Profiler.export_chrome_trace(str(tmp_path / 'trace.json')) == 0
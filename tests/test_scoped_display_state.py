@@ -0,0 +1,87 @@
+import fusion_standin
+from fusion_standin import load_addin_module
+
+SaveViewCommand = load_addin_module('SaveViewCommand')
+Fusion360Utilities = load_addin_module('Fusion360Utilities.Fusion360Utilities')
+
+
+def get_scope(design):
+    return [design.rootComponent.occurrences.item(1), design.rootComponent.occurrences.item(3)]
+
+
+def capture_scoped(scope_occurrences):
+    with Fusion360Utilities.AppObjectsScope():
+        return SaveViewCommand.encode_scoped_display_state(scope_occurrences)
+
+
+def restore(display_state_object, scope_occurrences=None):
+    with Fusion360Utilities.AppObjectsScope():
+        return SaveViewCommand.set_display_state(display_state_object, True, scope_occurrences)
+
+
+def get_states(design):
+    return {occurrence.fullPathName: occurrence.isLightBulbOn for occurrence in design.rootComponent.allOccurrences}
+
+
+def set_all(design, state):
+    for occurrence in design.rootComponent.allOccurrences:
+        occurrence.isLightBulbOn = state
+
+
+def test_scoped_restore_only_changes_the_scope(design):
+    fusion_standin.build_assembly(design, 100)
+    scope_occurrences = get_scope(design)
+    scope_occurrences[0].childOccurrences.item(2).isLightBulbOn = False
+
+    display_state_object = capture_scoped(scope_occurrences)
+    saved_states = get_states(design)
+
+    set_all(design, False)
+    result = restore(display_state_object)
+
+    restored_states = get_states(design)
+    in_scope = [path for path in saved_states if path.split('+')[0] in ('Sub Assembly:2', 'Sub Assembly:4')]
+
+    assert len(in_scope) == 20
+    assert result == {'written': 19, 'skipped': 1}
+    assert all(restored_states[path] == saved_states[path] for path in in_scope)
+    assert not any(state for path, state in restored_states.items() if path not in in_scope)
+
+
+# Renamed occurrences inside the scope are found by their entity token, which changes when the document is opened again
+def test_scoped_restore_after_rename_and_reopen(design):
+    sub_comp, part_comp = fusion_standin.build_assembly(design, 100)
+    scope_occurrences = get_scope(design)
+    scope_occurrences[0].childOccurrences.item(2).isLightBulbOn = False
+    scope_occurrences[1].isLightBulbOn = False
+
+    display_state_object = capture_scoped(scope_occurrences)
+
+    fusion_standin.reopen(design)
+    sub_comp.name = 'Renamed Assembly'
+    part_comp.name = 'Renamed Part'
+    set_all(design, True)
+
+    restore(display_state_object)
+
+    assert sorted(path for path, state in get_states(design).items() if not state) == [
+        'Renamed Assembly:2+Renamed Part:3', 'Renamed Assembly:4']
+
+
+
+# Renames do not rebuild the cached occurrence index, a scoped restore notices its saved paths have changed
+def test_scoped_restore_after_rename_with_cached_index(design):
+    sub_comp, part_comp = fusion_standin.build_assembly(design, 100)
+    scope_occurrences = get_scope(design)
+    scope_occurrences[0].childOccurrences.item(2).isLightBulbOn = False
+
+    display_state_object = capture_scoped(scope_occurrences)
+    restore(display_state_object)
+
+    part_comp.name = 'Renamed Part'
+    set_all(design, True)
+
+    restore(display_state_object)
+
+    assert sorted(path for path, state in get_states(design).items() if not state) == [
+        'Sub Assembly:2+Renamed Part:3']
@@ -0,0 +1,98 @@
+import pytest
+
+import fusion_standin
+from fusion_standin import load_addin_module
+
+SaveViewCommand = load_addin_module('SaveViewCommand')
+ViewStorage = load_addin_module('ViewStorage')
+Fusion360Utilities = load_addin_module('Fusion360Utilities.Fusion360Utilities')
+
+DROP_DOWN_ID = 'cmd_id_saved_views'
+
+
+# The Saved Views drop down with the refresh command in it and the custom view commands configured,
+# like FusionDisplayer.run sets it up
+@pytest.fixture
+def saved_views_drop_down():
+    drop_down_def = {
+        'cmd_resources': './resources',
+        'add_to_drop_down': True,
+        'drop_down_cmd_id': DROP_DOWN_ID,
+        'drop_down_name': 'Saved Views'
+    }
+
+    refresh_views_def = dict(drop_down_def, cmd_name='Refresh Views', cmd_id='cmdID_RefreshViewsCommand')
+    refresh_views_command = SaveViewCommand.RefreshViewsCommand(refresh_views_def, False)
+    refresh_views_command.on_run()
+
+    SaveViewCommand.configure_set_view_commands(dict(drop_down_def, **{'class': SaveViewCommand.SetViewCommand}),
+                                                False)
+    yield
+
+    SaveViewCommand.stop_set_view_commands()
+    SaveViewCommand.set_view_command_template.clear()
+    refresh_views_command.on_stop()
+
+
+def get_drop_down_control_ids():
+    panel = fusion_standin.get_ui().workspaces.itemById('FusionSolidEnvironment').toolbarPanels.itemById(
+        'SolidScriptsAddinsPanel')
+    return [control.id for control in panel.controls.itemById(DROP_DOWN_ID).controls]
+
+
+def get_set_view_command_ids():
+    return sorted(command_definition.id for command_definition in fusion_standin.get_ui().commandDefinitions
+                  if command_definition.id.startswith('cmdID_SetViewCommand_'))
+
+
+def save_view(view_number, name):
+    with Fusion360Utilities.AppObjectsScope():
+        SaveViewCommand.save_view(ViewStorage.view_id_from_number(view_number), {'name': name, 'visual_style': 1})
+
+
+# Commands are only created for slots that hold a view, and are listed in slot order whatever order they are made in
+def test_set_view_commands_are_created_on_demand_in_slot_order(design, saved_views_drop_down):
+    with Fusion360Utilities.AppObjectsScope():
+        SaveViewCommand.refresh_custom_views()
+
+    assert get_set_view_command_ids() == []
+    assert get_drop_down_control_ids() == ['cmdID_RefreshViewsCommand']
+
+    for view_number, name in [(5, 'Side'), (12, 'Detail'), (2, 'Front'), (7, 'Back'), (0, 'Top')]:
+        save_view(view_number, name)
+
+    assert sorted(SaveViewCommand.set_view_commands) == [0, 2, 5, 7, 12]
+    assert get_drop_down_control_ids() == ['cmdID_RefreshViewsCommand'] + \
+        ['cmdID_SetViewCommand_{}'.format(view_number) for view_number in [0, 2, 5, 7, 12]]
+
+    command_definition = fusion_standin.get_ui().commandDefinitions.itemById('cmdID_SetViewCommand_5')
+    assert command_definition.name == 'Custom View 5'
+    assert command_definition.tooltip == 'Side'
+    assert command_definition.controlDefinition.isEnabled
+
+    with Fusion360Utilities.AppObjectsScope():
+        assert SaveViewCommand.get_set_view_command(5) is SaveViewCommand.set_view_commands[5]
+
+        view_index = ViewStorage.get_view_index()
+        assert view_index.get_view_id('Side') == 'Custom View 5'
+        assert view_index.get_view_by_name('Side') is view_index.get_view('Custom View 5')
+        assert view_index.get_view('Custom View 5')['name'] == 'Side'
+        assert view_index.get_view_by_name('Missing') is None
+
+    assert len(get_set_view_command_ids()) == 5
+
+
+# Another document without views disables the commands but keeps them in the drop down
+def test_set_view_commands_of_another_document(design, saved_views_drop_down):
+    save_view(3, 'Front')
+    save_view(1, 'Back')
+
+    fusion_standin.new_design()
+    with Fusion360Utilities.AppObjectsScope():
+        SaveViewCommand.refresh_custom_views()
+
+    command_definitions = fusion_standin.get_ui().commandDefinitions
+    assert [command_definitions.itemById(command_id).controlDefinition.isEnabled
+            for command_id in get_set_view_command_ids()] == [False, False]
+    assert get_drop_down_control_ids() == ['cmdID_RefreshViewsCommand', 'cmdID_SetViewCommand_1',
+                                           'cmdID_SetViewCommand_3']
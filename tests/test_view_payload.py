@@ -0,0 +1,134 @@
+import json
+import random
+import string
+
+from fusion_standin import load_addin_module
+
+ViewPayload = load_addin_module('ViewPayload')
+
+
+# Stores facets in a dictionary and counts the facets loaded from it
+class FacetStore(object):
+
+    def __init__(self):
+        self.facets = {}
+        self.loads = []
+
+    def store_facet(self, encoded_facet):
+        reference = 'facet_{}'.format(len(self.facets))
+        self.facets[reference] = encoded_facet
+        return reference
+
+    def load_facet(self, reference):
+        self.loads.append(reference)
+        return self.facets.get(reference, None)
+
+
+def make_view():
+    return {
+        'name': 'Front',
+        'camera': {'eye': [1.0, 2.0, 3.0], 'view_extents': 10.5},
+        'visual_style': 2,
+        'display_state': {'paths': ['Sub Assembly:{}+Part:1'.format(i) for i in range(200)]}
+    }
+
+
+def test_round_trip_without_facet_store():
+    view_object = make_view()
+    value = ViewPayload.encode_view(view_object)
+
+    assert value.startswith(ViewPayload.PAYLOAD_HEADER)
+    assert ViewPayload.get_payload_version(value) == ViewPayload.PAYLOAD_VERSION
+    assert 'refs' not in json.loads(value.split(':', 1)[1])
+
+    assert ViewPayload.decode_view(value).to_dict() == view_object
+
+
+# Facets up to INLINE_FACET_SIZE characters stay in the envelope, larger ones are stored by reference
+def test_large_facets_are_stored_by_reference():
+    store = FacetStore()
+    view_object = make_view()
+    value = ViewPayload.encode_view(view_object, store.store_facet)
+
+    envelope = json.loads(value.split(':', 1)[1])
+    assert sorted(envelope['facets']) == ['camera', 'visual_style']
+    assert sorted(envelope['refs']) == ['display_state']
+    assert all(len(facet) <= ViewPayload.INLINE_FACET_SIZE for facet in envelope['facets'].values())
+    assert len(store.facets[envelope['refs']['display_state']]) > ViewPayload.INLINE_FACET_SIZE
+
+    assert ViewPayload.decode_view(value, store.load_facet).to_dict() == view_object
+
+
+# Text that does not compress well, so its encoded facet grows with its length
+def make_text(length):
+    letters = random.Random(0)
+    return ''.join(letters.choice(string.ascii_letters) for i in range(length))
+
+
+def test_inline_facet_size_threshold():
+    store = FacetStore()
+
+    length = 1
+    while len(ViewPayload.encode_facet(make_text(length + 1))) <= ViewPayload.INLINE_FACET_SIZE:
+        length += 1
+
+    inline_facet = ViewPayload.encode_facet(make_text(length))
+    stored_facet = ViewPayload.encode_facet(make_text(length + 1))
+    assert len(inline_facet) <= ViewPayload.INLINE_FACET_SIZE < len(stored_facet)
+
+    value = ViewPayload.encode_view({'name': 'Edge', 'inline': make_text(length), 'stored': make_text(length + 1)},
+                                    store.store_facet)
+    envelope = json.loads(value.split(':', 1)[1])
+
+    assert envelope['facets'] == {'inline': inline_facet}
+    assert store.facets[envelope['refs']['stored']] == stored_facet
+
+
+# Facets are only loaded and decoded when they are read
+def test_facets_are_loaded_lazily():
+    store = FacetStore()
+    view = ViewPayload.decode_view(ViewPayload.encode_view(make_view(), store.store_facet), store.load_facet)
+
+    assert view['name'] == 'Front'
+    assert list(view) == ['name', 'camera', 'visual_style', 'display_state']
+    assert 'display_state' in view
+    assert view.decoded_facets == {}
+    assert store.loads == []
+
+    assert view['camera'] == make_view()['camera']
+    assert store.loads == []
+
+    assert view['display_state'] == make_view()['display_state']
+    assert view['display_state'] is view['display_state']
+    assert len(store.loads) == 1
+
+
+# Facets that were never read are copied to the new value without loading or decoding them
+def test_mutation_and_encoding_again():
+    store = FacetStore()
+    view = ViewPayload.decode_view(ViewPayload.encode_view(make_view(), store.store_facet), store.load_facet)
+
+    view['name'] = 'Back'
+    view['visual_style'] = 3
+    del view['camera']
+
+    value = ViewPayload.encode_view(view, store.store_facet)
+    assert store.loads == []
+    assert len(store.facets) == 1
+
+    expected_view = make_view()
+    expected_view.update(name='Back', visual_style=3)
+    del expected_view['camera']
+
+    decoded_view = ViewPayload.decode_view(value, store.load_facet)
+    assert 'camera' not in decoded_view
+    assert decoded_view.to_dict() == expected_view
+
+
+def test_legacy_json_view():
+    view_object = make_view()
+    view = ViewPayload.decode_view(json.dumps(view_object))
+
+    assert ViewPayload.get_payload_version(json.dumps(view_object)) == 0
+    assert view.to_dict() == view_object
+    assert ViewPayload.decode_view(ViewPayload.encode_view(view)).to_dict() == view_object
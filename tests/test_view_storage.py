@@ -0,0 +1,257 @@
+import io
+import json
+import os
+import stat
+
+import pytest
+
+import fusion_standin
+from fusion_standin import load_addin_module
+
+SaveViewCommand = load_addin_module('SaveViewCommand')
+ViewStorage = load_addin_module('ViewStorage')
+Fusion360Utilities = load_addin_module('Fusion360Utilities.Fusion360Utilities')
+
+
+# A facet too large to be kept in the view attribute, so it is stored in its own attribute
+def make_display_state():
+    return {'paths': ['Sub Assembly:{}+Part:1'.format(i) for i in range(200)]}
+
+
+def save_view(view_number, view_object):
+    with Fusion360Utilities.AppObjectsScope():
+        SaveViewCommand.save_view(ViewStorage.view_id_from_number(view_number), view_object)
+
+
+def get_facet_refs(design):
+    return [attribute.name for attribute in
+            design.parentDocument.attributes.itemsByGroup(ViewStorage.FACET_ATTRIBUTE_GROUP)]
+
+
+# Deletes the views with the given names with the Manage Views dialog
+def delete_views(view_names):
+    command = fusion_standin.open_command(SaveViewCommand.ManageViewsCommand(
+        {'cmd_id': 'cmdID_TestManageViewsCommand'}, False))
+
+    for drop_down_input in command.commandInputs:
+        if drop_down_input.name in view_names:
+            list_items = drop_down_input.listItems
+            list_items.item(list_items.count - 1).isSelected = True
+
+    command._ok()
+
+
+# Views with the same facet share one attribute, it is deleted when the last view using it is deleted
+def test_shared_facet_is_collected_with_its_last_view(design):
+    save_view(1, {'name': 'Front', 'visual_style': 1, 'display_state': make_display_state()})
+    save_view(2, {'name': 'Back', 'visual_style': 2, 'display_state': make_display_state()})
+
+    facet_refs = get_facet_refs(design)
+    assert len(facet_refs) == 1
+    assert ViewStorage.get_facet_ref_counts(design.parentDocument) == {facet_refs[0]: 2}
+
+    delete_views(['Front'])
+
+    assert get_facet_refs(design) == facet_refs
+    with Fusion360Utilities.AppObjectsScope():
+        back_view = ViewStorage.get_view_index().get_view_by_name('Back')
+        assert back_view['display_state'] == make_display_state()
+        assert ViewStorage.get_view_index().get_view_by_name('Front') is None
+
+    delete_views(['Back'])
+
+    assert get_facet_refs(design) == []
+    assert ViewStorage.get_facet_ref_counts(design.parentDocument) == {}
+
+
+def test_delete_all_views_collects_facets(design):
+    save_view(1, {'name': 'Front', 'display_state': make_display_state()})
+    save_view(2, {'name': 'Back', 'display_state': make_display_state()})
+
+    command = fusion_standin.open_command(SaveViewCommand.DeleteAllViewsCommand(
+        {'cmd_id': 'cmdID_TestDeleteAllViewsCommand'}, False))
+    command._ok()
+
+    assert get_facet_refs(design) == []
+
+
+# Members of a JSON object are read across chunk boundaries, including numbers split between two chunks
+def test_json_object_items_in_small_chunks():
+    text = json.dumps({'a': 12345678, 'b': [1.5, {'c': 'd' * 20}], 'e': None, 'f': -0.25e-3, 'g': 'text'},
+                      indent=2)
+
+    for chunk_size in [1, 3, 7, 1 << 16]:
+        items = list(Fusion360Utilities.iter_json_object_items(io.StringIO(text), chunk_size))
+        assert items == list(json.loads(text).items())
+
+    assert list(Fusion360Utilities.iter_json_object_items(io.StringIO(' { } '))) == []
+
+
+def get_document_views(document):
+    return {view_id: view_object.to_dict() for view_id, view_object in ViewStorage.ViewIndex(document).views.items()}
+
+
+# Writes the views of a design in each export format, returns {format: file name}
+def write_export_files(design, directory):
+    document = design.parentDocument
+    records = list(ViewStorage.iter_export_records(document))
+
+    file_names = {
+        'legacy': str(directory / 'legacy.json'),
+        'v2': str(directory / 'v2.json'),
+        'v3': str(directory / 'v3.jsonl')
+    }
+
+    with open(file_names['legacy'], 'w') as f:
+        json.dump(get_document_views(document), f)
+
+    with open(file_names['v2'], 'w') as f:
+        json.dump({
+            ViewStorage.EXPORT_FORMAT_KEY: 2,
+            'facets': {record['facet']: record['value'] for record in records if 'facet' in record},
+            'views': {record['view']: record['value'] for record in records if 'view' in record}
+        }, f)
+
+    Fusion360Utilities.write_json_lines(file_names['v3'], ViewStorage.iter_export_records(document))
+
+    return file_names
+
+
+def import_views(file_name, document):
+    with open(file_name, encoding='utf-8') as f:
+        return ViewStorage.import_view_records(ViewStorage.iter_import_records(f), document)
+
+
+# Files of every format import the same views, importing them again skips every view that did not change
+def test_import_formats(design, tmp_path):
+    save_view(1, {'name': 'Front', 'visual_style': 1, 'display_state': make_display_state()})
+    save_view(2, {'name': 'Back', 'visual_style': 2, 'display_state': make_display_state()})
+    design.parentDocument.attributes.add(ViewStorage.VIEW_ATTRIBUTE_GROUP, ViewStorage.view_id_from_number(3),
+                                         json.dumps({'name': 'Legacy', 'visual_style': 3}))
+
+    source_views = get_document_views(design.parentDocument)
+    file_names = write_export_files(design, tmp_path)
+
+    for export_format, file_name in sorted(file_names.items()):
+        target_design = fusion_standin.new_design()
+        target_document = target_design.parentDocument
+
+        summary = import_views(file_name, target_document)
+        assert (summary['added'], summary['updated'], summary['skipped']) == (3, 0, 0), export_format
+        assert summary['views'] == {'Custom View 1': 'Front', 'Custom View 2': 'Back', 'Custom View 3': 'Legacy'}
+        assert get_document_views(target_document) == source_views
+        assert len(get_facet_refs(target_design)) == 1
+
+        values = [attribute.value for attribute in
+                  target_document.attributes.itemsByGroup(ViewStorage.VIEW_ATTRIBUTE_GROUP)]
+
+        summary = import_views(file_name, target_document)
+        assert (summary['added'], summary['updated'], summary['skipped']) == (0, 0, 3), export_format
+        assert summary['views'] == {}
+        assert [attribute.value for attribute in
+                target_document.attributes.itemsByGroup(ViewStorage.VIEW_ATTRIBUTE_GROUP)] == values
+
+        target_document.attributes.add(ViewStorage.VIEW_ATTRIBUTE_GROUP, ViewStorage.view_id_from_number(2),
+                                       ViewStorage.encode_document_view({'name': 'Changed'}, target_document))
+        ViewStorage.collect_unused_facets(target_document)
+
+        summary = import_views(file_name, target_document)
+        assert (summary['added'], summary['updated'], summary['skipped']) == (0, 1, 2), export_format
+        assert summary['views'] == {'Custom View 2': 'Back'}
+        assert get_document_views(target_document) == source_views
+
+
+def iter_failing_records():
+    yield {'view': 'Custom View 1', 'value': 'new'}
+    raise RuntimeError('Export failed')
+
+
+# A failed export leaves the previous file as it was and no temporary file behind
+def test_failed_write_keeps_previous_file(tmp_path):
+    file_name = str(tmp_path / 'views.jsonl')
+    Fusion360Utilities.write_json_lines(file_name, [{'view': 'Custom View 1', 'value': 'old'}])
+
+    with pytest.raises(RuntimeError):
+        Fusion360Utilities.write_json_lines(file_name, iter_failing_records())
+
+    with open(file_name) as f:
+        assert list(Fusion360Utilities.iter_json_lines(f)) == [{'view': 'Custom View 1', 'value': 'old'}]
+
+    assert os.listdir(str(tmp_path)) == ['views.jsonl']
+
+
+# Exported files get the same mode as a file written with open()
+def test_written_file_mode_follows_umask(tmp_path):
+    umask = os.umask(0o027)
+
+    try:
+        file_name = str(tmp_path / 'views.jsonl')
+        assert Fusion360Utilities.write_json_lines(file_name, [{'a': 1}]) == (1, 8)
+        assert stat.S_IMODE(os.stat(file_name).st_mode) == 0o640
+
+        os.umask(0o002)
+        Fusion360Utilities.write_json_lines(file_name, [{'a': 1}])
+        assert stat.S_IMODE(os.stat(file_name).st_mode) == 0o664
+
+    finally:
+        os.umask(umask)
+
+
+# Calls of get_view_index since start that read the document and that were answered from memory
+def get_cache_misses_and_hits(start):
+    view_cache_stats = ViewStorage.get_view_cache_stats()
+    return view_cache_stats['misses'] - start['misses'], view_cache_stats['hits'] - start['hits']
+
+
+def get_view_names():
+    with Fusion360Utilities.AppObjectsScope():
+        return sorted(view_object['name'] for view_object in ViewStorage.get_view_index().views.values())
+
+
+def set_view(view_number):
+    command = fusion_standin.open_command(SaveViewCommand.SetViewCommand(
+        {'cmd_id': 'cmdID_TestSetViewCommand_{}'.format(view_number), 'custom_view_number': view_number}, False))
+    command._ok()
+
+
+# The view index of a document is read once and read again after views are saved, deleted or imported
+def test_view_index_is_rebuilt_when_views_change(design, tmp_path, monkeypatch):
+    monkeypatch.setenv('HOME', str(tmp_path))
+    start = ViewStorage.get_view_cache_stats()
+
+    assert get_view_names() == []
+    assert get_view_names() == []
+    assert get_cache_misses_and_hits(start) == (1, 1)
+
+    save_view(1, {'name': 'Front', 'visual_style': 1})
+    save_view(2, {'name': 'Back', 'visual_style': 2})
+    assert get_cache_misses_and_hits(start) == (2, 2)
+
+    # Setting views with their hot keys reads the document once
+    assert get_view_names() == ['Back', 'Front']
+    set_view(1)
+    set_view(2)
+    set_view(1)
+    assert get_cache_misses_and_hits(start) == (3, 5)
+
+    file_name = str(tmp_path / 'views.jsonl')
+    with Fusion360Utilities.AppObjectsScope():
+        Fusion360Utilities.write_json_lines(file_name, ViewStorage.iter_export_records())
+
+    delete_views(['Front'])
+    misses, hits = get_cache_misses_and_hits(start)
+    assert get_view_names() == ['Back']
+    assert get_cache_misses_and_hits(start) == (misses + 1, hits)
+
+    fusion_standin.get_ui()._select_file(file_name)
+    command = fusion_standin.open_command(SaveViewCommand.ImportViewsCommand(
+        {'cmd_id': 'cmdID_TestImportViewsCommand'}, False))
+    command._ok()
+    assert fusion_standin.get_messages() == ['Imported views: 1 added, 0 updated, 1 skipped']
+    fusion_standin.get_messages().clear()
+
+    misses, hits = get_cache_misses_and_hits(start)
+    assert get_view_names() == ['Back', 'Front']
+    assert get_view_names() == ['Back', 'Front']
+    assert get_cache_misses_and_hits(start) == (misses + 1, hits + 1)
+    assert ViewStorage.get_view_cache_stats()['documents'] == 1